@@ -0,0 +1,731 @@
+"""
+Pages of the Python Adventure apps
+Each app picks its content pack, badges and playground examples, sets up the
+page and hands them to run_app(); everything on screen is drawn from here
+"""
+
+import json
+import time
+import uuid
+
+import streamlit as st
+from streamlit_ace import st_ace
+
+from exercise_tests import output_matches
+from lesson_build import demo_key
+from lesson_manager import get_code_executor, load_lesson_manager
+from output_sink import read_output_page, read_output_file
+from progress_tracker import ProgressTracker
+
+# Courses longer than this get a lesson menu of collapsible units, a page at a time
+FLAT_MENU_LESSONS = 30
+UNITS_PER_PAGE = 5
+
+# What the pages show; an app may pass its own to run_app()
+PAGE_OPTIONS = {
+    # Difficulty caption under each lesson's title
+    'show_difficulty': True,
+    # Charts, and a note when nothing was printed, under lesson demos
+    'demo_charts': True,
+    # Playground charts even when the code printed nothing
+    'charts_without_output': True,
+    # The warning for a wrong answer, when the exercise has no test cases
+    'expected_output_hint': "Almost there! Expected to see: `{expected_output}`",
+}
+
+# ===== CHARTS =====
+@st.cache_resource(show_spinner=False, max_entries=200)
+def load_figure(plot):
+    """The figure for a chart's stored JSON, built once per server
+
+    Given a dict, st.plotly_chart validates it into a Figure on every rerun
+    (about 20 ms a chart); given a Figure it only copies and serializes it
+    (about 2 ms). skip_invalid drops anything this plotly version would reject.
+    """
+    import plotly.graph_objects as go
+    return go.Figure(json.loads(plot), skip_invalid=True)
+
+# ===== SESSION STATE =====
+def get_lesson_manager():
+    """The lessons of this session's app, shared with every other session of it"""
+    return load_lesson_manager(st.session_state.lesson_pack)
+
+def init_session_state(lesson_pack, badges, page_options):
+    """Set up a new session's state (nothing is changed on later reruns)"""
+    if 'lesson_pack' not in st.session_state:
+        st.session_state.lesson_pack = lesson_pack
+        st.session_state.page_options = page_options
+    if 'user_name' not in st.session_state:
+        st.session_state.user_name = ""
+    if 'progress_tracker' not in st.session_state:
+        st.session_state.progress_tracker = ProgressTracker(badges)
+    if 'session_id' not in st.session_state:
+        # Code runs are scheduled and charged per session
+        st.session_state.session_id = uuid.uuid4().hex
+    if 'current_lesson_id' not in st.session_state:
+        st.session_state.current_lesson_id = 1
+    if 'current_page' not in st.session_state:
+        st.session_state.current_page = "home"
+    if 'playground_history' not in st.session_state:
+        st.session_state.playground_history = []
+    if 'demo_reruns' not in st.session_state:
+        st.session_state.demo_reruns = {}
+    if 'menu_page' not in st.session_state:
+        # Page of units the lesson menu shows, and the lesson it was last moved to
+        st.session_state.menu_page = 0
+        st.session_state.menu_lesson_id = None
+
+# ===== PAGE FUNCTIONS =====
+
+def display_lesson_content(lesson):
+    """Display the main lesson content"""
+    st.markdown(f"## {lesson['title']}")
+    st.markdown(f"**{lesson['description']}**")
+    if st.session_state.page_options['show_difficulty']:
+        st.caption(f"Difficulty: {lesson.get('difficulty', 'Unknown')}")
+    
+    # Lesson content sections
+    for section in lesson['content']:
+        if section['type'] == 'text':
+            st.markdown(section['content'])
+        elif section['type'] == 'code_example':
+            st.markdown("### 💡 Example:")
+            st.code(section['code'], language='python')
+            if section.get('explanation'):
+                st.markdown(f"**What this does:** {section['explanation']}")
+        elif section['type'] == 'interactive_demo':
+            st.markdown("### 🎯 Try it yourself:")
+            demo_code = section['code']
+            key = demo_key(demo_code)
+            demo = get_lesson_manager().get_demo_output(demo_code)
+            if demo is None:
+                result = get_code_executor().execute_code(demo_code, label=f"lesson-{lesson['id']}/demo", session_id=st.session_state.session_id)
+            else:
+                result = st.session_state.demo_reruns.get(key, demo['result'])
+            
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                st.code(demo_code, language='python')
+                # Demos with random numbers only re-run when asked
+                if demo is not None and not demo['deterministic']:
+                    if st.button("🔄 Run again", key=f"rerun_{key}"):
+                        result = get_code_executor().execute_code(demo_code, label=f"lesson-{lesson['id']}/demo", session_id=st.session_state.session_id)
+                        st.session_state.demo_reruns[key] = result
+            with col2:
+                st.markdown("**Output:**")
+                if result['success'] and not st.session_state.page_options['demo_charts']:
+                    st.success(result['output'])
+                elif result['success']:
+                    if result['output']:
+                        st.success(result['output'])
+                    else:
+                        st.info("Code ran with no text output.")
+                    if result.get('plots'):
+                        st.markdown("**Chart:**")
+                        for plot in result['plots']:
+                            st.plotly_chart(load_figure(plot), use_container_width=True)
+                elif result.get('busy'):
+                    st.warning(result['error'])
+                else:
+                    st.error(result['error'])
+
+def display_exercise(exercise):
+    """Display and handle lesson exercises"""
+    st.markdown("---")
+    st.markdown("### 🎮 Practice Exercise")
+    st.markdown(f"**{exercise['question']}**")
+    
+    if exercise['type'] == 'code_completion':
+        st.markdown("Complete the code below:")
+        user_code = st_ace(
+            value=exercise['template'],
+            language='python',
+            theme='github',
+            key=f"exercise_{st.session_state.current_lesson_id}_{exercise['id']}",
+            height=200,
+            auto_update=True
+        )
+        
+        if st.button("🔍 Check My Code", type="primary", key=f"check_{exercise['id']}"):
+            label = f"lesson-{st.session_state.current_lesson_id}/{exercise['id']}"
+            test_cases = exercise.get('test_cases')
+            if test_cases:
+                # All the hidden test cases are checked in one run
+                result = get_code_executor().run_tests(user_code, test_cases, label=label, session_id=st.session_state.session_id)
+            else:
+                result = get_code_executor().execute_code(user_code, label=label, session_id=st.session_state.session_id)
+            
+            if result.get('busy'):
+                st.warning(result['error'])
+            elif result['success']:
+                expected_output = exercise.get('expected_output', '')
+                if test_cases:
+                    passed = all(test['passed'] for test in result['tests'])
+                    show_test_results(result['tests'])
+                else:
+                    passed = output_matches(expected_output, result['output'])
+                if passed:
+                    st.success("🎉 Excellent work! You got it right!")
+                    st.balloons()
+                    st.session_state.progress_tracker.complete_exercise(
+                        st.session_state.current_lesson_id, 
+                        exercise['id']
+                    )
+                else:
+                    if test_cases:
+                        st.warning("Almost there! Some tests didn't pass yet - look at the ❌ ones above.")
+                    elif expected_output.strip():
+                        st.warning(st.session_state.page_options['expected_output_hint'].format(expected_output=expected_output))
+                    st.info(f"Your output: `{result['output']}`")
+            else:
+                st.error("Oops! There's an error in your code:")
+                st.error(result['error'])
+                if exercise.get('hint'):
+                    st.info(f"💡 Hint: {exercise['hint']}")
+    
+    elif exercise['type'] == 'multiple_choice':
+        options = exercise['options']
+        user_answer = st.radio("Choose the correct answer:", options, key=f"mc_{exercise['id']}")
+        
+        if st.button("Submit Answer", type="primary", key=f"submit_{exercise['id']}"):
+            if user_answer == exercise['correct_answer']:
+                st.success("🎉 Correct! Well done!")
+                st.balloons()
+                st.session_state.progress_tracker.complete_exercise(
+                    st.session_state.current_lesson_id, 
+                    exercise['id']
+                )
+            else:
+                st.error("Not quite right. Try again!")
+                if exercise.get('explanation'):
+                    st.info(f"💡 {exercise['explanation']}")
+
+def show_home_page():
+    """Display the home page"""
+    st.title("🐍 Python Adventure for Kids")
+    st.markdown("### Welcome to the most fun way to learn Python!")
+    
+    # User name input
+    if not st.session_state.user_name:
+        st.markdown("---")
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            st.markdown("#### 👋 What's your name, young coder?")
+            name = st.text_input("Enter your name:", placeholder="Type your name here...")
+            if st.button("Start My Python Adventure! 🚀", type="primary"):
+                if name:
+                    st.session_state.user_name = name
+                    st.session_state.progress_tracker.set_user(name)
+                    st.rerun()
+                else:
+                    st.error("Please enter your name to start!")
+    else:
+        # Welcome message
+        st.markdown(f"### 🎉 Welcome back, {st.session_state.user_name}!")
+        
+        # Progress overview
+        progress_data = st.session_state.progress_tracker.get_progress()
+        total_lessons = get_lesson_manager().lesson_count()
+        completed_lessons = len(progress_data.get('completed_lessons', []))
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("🏆 Lessons Completed", f"{completed_lessons}/{total_lessons}")
+        with col2:
+            st.metric("⭐ Total Stars", progress_data.get('total_stars', 0))
+        with col3:
+            st.metric("🏅 Badges Earned", len(progress_data.get('badges', [])))
+        with col4:
+            completion_rate = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
+            st.metric("📈 Progress", f"{completion_rate:.0f}%")
+        
+        # Progress bar
+        st.progress((completed_lessons / total_lessons) if total_lessons else 0)
+        
+        # Quick navigation
+        st.markdown("---")
+        st.markdown("### 🎯 What would you like to do today?")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.markdown("""
+            #### 📚 Learn Python
+            Start with lessons and learn Python step by step!
+            """)
+            if st.button("Go to Lessons 📖", key="lessons_btn", type="primary"):
+                st.session_state.current_page = "lessons"
+                st.rerun()
+        
+        with col2:
+            st.markdown("""
+            #### 🎮 Code Playground  
+            Experiment with Python code in a safe environment!
+            """)
+            if st.button("Open Playground 🎮", key="playground_btn", type="primary"):
+                st.session_state.current_page = "playground"
+                st.rerun()
+        
+        with col3:
+            st.markdown("""
+            #### 🏆 View Progress
+            See your achievements, badges, and completed lessons!
+            """)
+            if st.button("Check Progress 📊", key="progress_btn", type="primary"):
+                st.session_state.current_page = "progress"
+                st.rerun()
+
+def show_lesson_button(container, lesson, completed_lessons, unlocked_lessons):
+    """A lesson's button in the lesson menu, locked until its prerequisites are done"""
+    is_completed = lesson['id'] in completed_lessons
+    is_available = lesson['id'] in unlocked_lessons
+    
+    if is_completed:
+        emoji = "✅"
+    elif is_available:
+        emoji = "▶️"
+    else:
+        emoji = "🔒"
+    
+    button_label = f"{emoji} Lesson {lesson['id']}: {lesson['title']}"
+    
+    if is_available:
+        if container.button(button_label, key=f"lesson_{lesson['id']}"):
+            st.session_state.current_lesson_id = lesson['id']
+            st.rerun()
+    else:
+        container.button(button_label, disabled=True, key=f"lesson_{lesson['id']}_disabled")
+
+def show_lesson_units(lesson_manager, completed_lessons, unlocked_lessons):
+    """The lesson menu of a long course: one page of units, only the current lesson's unit open"""
+    units = lesson_manager.get_units()
+    pages = (len(units) + UNITS_PER_PAGE - 1) // UNITS_PER_PAGE
+    current_unit = lesson_manager.unit_of(st.session_state.current_lesson_id) or 0
+    current_page = current_unit // UNITS_PER_PAGE
+    
+    # The menu follows the current lesson whenever it changes
+    if st.session_state.menu_lesson_id != st.session_state.current_lesson_id:
+        st.session_state.menu_lesson_id = st.session_state.current_lesson_id
+        st.session_state.menu_page = current_page
+    page = min(st.session_state.menu_page, pages - 1)
+    
+    col1, col2, col3 = st.sidebar.columns([1, 2, 1])
+    with col1:
+        if st.button("◀️", key="menu_previous", disabled=page == 0):
+            st.session_state.menu_page = page - 1
+            st.rerun()
+    with col2:
+        st.caption(f"Units {page * UNITS_PER_PAGE + 1}-{min((page + 1) * UNITS_PER_PAGE, len(units))} of {len(units)}")
+    with col3:
+        if st.button("▶️", key="menu_next", disabled=page >= pages - 1):
+            st.session_state.menu_page = page + 1
+            st.rerun()
+    if page != current_page:
+        if st.sidebar.button("📍 Back to my lesson", key="menu_current"):
+            st.session_state.menu_page = current_page
+            st.rerun()
+    
+    # Only this page's lessons become widgets, however long the course is
+    for index in range(page * UNITS_PER_PAGE, min((page + 1) * UNITS_PER_PAGE, len(units))):
+        title, group = units[index]
+        done = sum(lesson['id'] in completed_lessons for lesson in group)
+        unit = st.sidebar.expander(f"{title} ({done}/{len(group)} done)", expanded=index == current_unit)
+        for lesson in group:
+            show_lesson_button(unit, lesson, completed_lessons, unlocked_lessons)
+
+def show_lessons_page():
+    """Display the lessons page"""
+    st.title("📚 Python Lessons")
+    
+    # Navigation
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("🏠 Home"):
+            st.session_state.current_page = "home"
+            st.rerun()
+    
+    # Get all lessons
+    lesson_manager = get_lesson_manager()
+    lessons = lesson_manager.get_all_lessons()
+    progress_tracker = st.session_state.progress_tracker
+    completed_lessons = progress_tracker.get_completed_lessons()
+    unlocked_lessons = progress_tracker.get_unlocked_lessons(lesson_manager)
+    
+    # Sidebar for lesson navigation
+    st.sidebar.title("📋 Lesson Menu")
+    
+    query = st.sidebar.text_input("🔎 Search lessons", key="lesson_search", placeholder="loops, lists, print...")
+    if query.strip():
+        results = lesson_manager.search(query)
+        if not results:
+            st.sidebar.caption("No lessons found - try another word!")
+        for lesson, result in results:
+            is_available = lesson['id'] in unlocked_lessons
+            button_label = f"{'🔎' if is_available else '🔒'} Lesson {lesson['id']}: {lesson['title']}"
+            if st.sidebar.button(button_label, disabled=not is_available, key=f"search_{lesson['id']}"):
+                st.session_state.current_lesson_id = lesson['id']
+                st.rerun()
+        st.sidebar.markdown("---")
+    
+    if len(lessons) > FLAT_MENU_LESSONS:
+        show_lesson_units(lesson_manager, completed_lessons, unlocked_lessons)
+    else:
+        for lesson in lessons:
+            show_lesson_button(st.sidebar, lesson, completed_lessons, unlocked_lessons)
+    
+    # Display current lesson
+    current_lesson = lesson_manager.get_lesson(st.session_state.current_lesson_id)
+    
+    if current_lesson:
+        # Progress indicator
+        lesson_number = lesson_manager.lesson_number(current_lesson['id'])
+        st.progress((lesson_number - 1) / lesson_manager.lesson_count())
+        st.markdown(f"**Progress: Lesson {lesson_number} of {lesson_manager.lesson_count()}**")
+        
+        # Display lesson content
+        display_lesson_content(current_lesson)
+        
+        # Display exercises
+        if 'exercises' in current_lesson:
+            for exercise in current_lesson['exercises']:
+                display_exercise(exercise)
+        
+        # Lesson completion
+        st.markdown("---")
+        if st.session_state.current_lesson_id not in completed_lessons:
+            if st.button("✨ I've completed this lesson!", type="primary", key="complete_lesson"):
+                progress_tracker.complete_lesson(st.session_state.current_lesson_id, lesson_manager)
+                st.success("🎉 Lesson completed! You earned a star! ⭐")
+                st.balloons()
+                
+                # Check for badges
+                badges = st.session_state.progress_tracker.check_badges()
+                for badge in badges:
+                    st.success(f"🏅 New Badge Earned: {badge['name']} - {badge['description']}")
+                
+                st.rerun()
+        else:
+            st.success("✅ You've completed this lesson!")
+
+def show_full_output(result):
+    """Page through a long output log and offer it as a download"""
+    st.warning(f"Wow, that's a lot of output - {result.get('output_lines', 0):,} lines! Above are the first and last parts.")
+    path = result.get('output_file')
+    if not path:
+        return
+    
+    page_size = 500
+    pages = max(1, -(-result.get('output_lines', 0) // page_size))
+    with st.expander("📜 See all the output"):
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, key="output_page")
+        lines = read_output_page(path, page - 1, page_size)
+        st.text_area(
+            f"Page {page} of {pages}:",
+            value='\n'.join(lines),
+            height=300,
+            disabled=True
+        )
+    st.download_button(
+        "⬇️ Download all the output",
+        data=lambda: read_output_file(path),
+        file_name="output.txt",
+        mime="text/plain"
+    )
+
+def show_cell_results(cells):
+    """Show each cell's output in Cell mode, and which cells ran this time"""
+    ran = sum(cell['ran'] for cell in cells)
+    st.caption(f"📓 {ran} of {len(cells)} cells ran this time - the others kept their last results")
+    for number, cell in enumerate(cells, 1):
+        if cell['skipped']:
+            st.markdown(f"**Cell {number}** ⏭️ Not run - fix the cell above it first!")
+            continue
+        if cell['ran']:
+            status = f"🔄 ran in {cell.get('metrics', {}).get('exec_seconds', 0) * 1000:.0f} ms"
+        else:
+            status = "♻️ kept from last time"
+        if cell.get('busy'):
+            st.warning(cell['error'])
+            continue
+        st.markdown(f"**Cell {number}** {status}")
+        if cell['success']:
+            if cell['output']:
+                st.code(cell['output'], language='text')
+            for index, plot in enumerate(cell['plots']):
+                st.plotly_chart(load_figure(plot), use_container_width=True, key=f"cell_plot_{number}_{index}")
+        else:
+            st.error("❌ Oops! There's an error in this cell:")
+            st.code(cell['error'], language='text')
+
+def show_test_results(tests):
+    """Show which of an exercise's test cases passed (without giving away the answers)"""
+    passed = sum(test['passed'] for test in tests)
+    st.markdown(f"**🧪 Tests passed: {passed} of {len(tests)}**")
+    for test in tests:
+        mark = "✅" if test['passed'] else "❌"
+        st.markdown(f"{mark} {test['name']} ({test['seconds'] * 1000:.0f} ms)")
+        if test['error']:
+            st.caption(test['error'])
+
+def show_playground_page(examples):
+    """Display the playground page, with the app's example snippets (title -> code) in the sidebar"""
+    st.title("🎮 Code Playground")
+    st.markdown("### 🚀 Experiment with Python code safely!")
+    
+    # Navigation
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("🏠 Home"):
+            st.session_state.current_page = "home"
+            st.rerun()
+    
+    # Code examples in sidebar
+    st.sidebar.title("📚 Code Examples")
+    st.sidebar.markdown("Click on any example to try it!")
+    
+    
+    for title, code in examples.items():
+        if st.sidebar.button(title, key=f"example_{title}"):
+            st.session_state.current_code = code
+            st.rerun()
+    
+    # Main playground area
+    col1, col2 = st.columns([3, 2])
+    
+    with col1:
+        st.markdown("#### ✏️ Write your Python code here:")
+        
+        # Get initial code
+        initial_code = st.session_state.get('current_code', '''# Welcome to the Python Playground! 🎮
+# Write your code here and click "Run Code" to see what happens!
+
+print("Hello, young coder! 👋")
+print("Let's have some fun with Python!")
+
+# Try changing this message:
+message = "Python is awesome!"
+print(message)
+''')
+        
+        # Code editor
+        user_code = st_ace(
+            value=initial_code,
+            language='python',
+            theme='github',
+            key="playground_editor",
+            height=400,
+            auto_update=True,
+            wrap=True,
+            font_size=14
+        )
+        
+        # Control buttons
+        col_a, col_b = st.columns([1, 1])
+        
+        with col_a:
+            run_button = st.button("🚀 Run Code", type="primary")
+        
+        with col_b:
+            if st.button("🗑️ Clear"):
+                st.session_state.current_code = "# Start coding here! 🎉\n"
+                st.rerun()
+        
+        cell_mode = st.toggle(
+            "📓 Cell mode",
+            key="cell_mode",
+            help="Split your code into cells with `# %%` lines. Your variables are kept between runs, so only the cells you changed (and the cells that use them) run again!"
+        )
+    
+    with col2:
+        st.markdown("#### 📺 Output:")
+        
+        if run_button and user_code.strip() and cell_mode:
+            if 'cell_session' not in st.session_state:
+                st.session_state.cell_session = get_code_executor().new_cell_session()
+            with st.spinner("Running your cells... 🔄"):
+                result = get_code_executor().run_cells(
+                    user_code,
+                    st.session_state.cell_session,
+                    label="playground",
+                    session_id=st.session_state.session_id
+                )
+            st.session_state.playground_result = {'code': user_code, 'result': result}
+        
+        elif run_button and user_code.strip():
+            # Execute the code, showing its output live while it runs
+            live_output = st.empty()
+            printed = ''
+            last_refresh = 0
+            with st.spinner("Running your code... 🔄"):
+                for kind, value in get_code_executor().stream_code(user_code, label="playground", session_id=st.session_state.session_id):
+                    if kind == 'output':
+                        printed += value
+                        # Redraw at most five times a second
+                        if time.monotonic() - last_refresh >= 0.2:
+                            live_output.code(printed[-5000:], language='text')
+                            last_refresh = time.monotonic()
+                    else:
+                        result = value
+            live_output.empty()
+            # Keep the result so paging through long output still shows it
+            st.session_state.playground_result = {'code': user_code, 'result': result}
+        
+        last_run = st.session_state.get('playground_result')
+        if last_run and user_code.strip() and last_run['code'] == user_code:
+            result = last_run['result']
+            
+            if 'cells' in result:
+                show_cell_results(result['cells'])
+            elif result['success']:
+                if result['output']:
+                    st.success("✅ Code ran successfully!")
+                    st.text_area("Output:", value=result['output'], height=300, disabled=True)
+                    if result.get('truncated'):
+                        show_full_output(result)
+                else:
+                    st.info("Code ran successfully, but no output to display.")
+                
+                # Check if there are any plots to display
+                if result.get('plots') and (result['output'] or st.session_state.page_options['charts_without_output']):
+                    st.markdown("#### 📊 Plots:")
+                    for plot in result['plots']:
+                        st.plotly_chart(load_figure(plot), use_container_width=True)
+            elif result.get('busy'):
+                st.warning(result['error'])
+            else:
+                st.error("❌ Oops! There's an error in your code:")
+                st.code(result['error'], language='text')
+                
+                # Provide helpful hints for common errors
+                error_msg = result['error'].lower()
+                if 'indentationerror' in error_msg:
+                    st.info("💡 **Hint:** Check your indentation! Python is picky about spaces and tabs.")
+                elif 'syntaxerror' in error_msg:
+                    st.info("💡 **Hint:** Check your syntax! Make sure parentheses, quotes, and colons are balanced.")
+                elif 'nameerror' in error_msg:
+                    st.info("💡 **Hint:** Make sure all variable names are spelled correctly and defined before use.")
+        
+        elif not user_code.strip():
+            st.info("✏️ Write some code and click 'Run Code' to see the magic happen!")
+        
+        else:
+            st.info("👆 Click 'Run Code' to execute your Python code!")
+
+def show_progress_page():
+    """Display the progress page"""
+    st.title("🏆 My Python Learning Progress")
+    
+    # Navigation
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("🏠 Home"):
+            st.session_state.current_page = "home"
+            st.rerun()
+    
+    # Check if user has started learning
+    progress_data = st.session_state.progress_tracker.get_progress()
+    
+    if not progress_data.get('user_name'):
+        st.warning("👋 You haven't started your Python journey yet!")
+        if st.button("🚀 Go to Home Page"):
+            st.session_state.current_page = "home"
+            st.rerun()
+        return
+    
+    st.markdown(f"### Welcome back, {progress_data['user_name']}! 👋")
+    
+    # Overall statistics
+    lessons = get_lesson_manager().get_all_lessons()
+    completed_lessons = progress_data.get('completed_lessons', [])
+    total_stars = progress_data.get('total_stars', 0)
+    badges = progress_data.get('badges', [])
+    
+    # Main metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        completion_rate = (len(completed_lessons) / len(lessons) * 100) if lessons else 0
+        st.metric(
+            label="📚 Course Progress", 
+            value=f"{completion_rate:.1f}%",
+            delta=f"{len(completed_lessons)}/{len(lessons)} lessons"
+        )
+    
+    with col2:
+        st.metric(
+            label="⭐ Total Stars", 
+            value=total_stars,
+            delta="Keep learning!"
+        )
+    
+    with col3:
+        st.metric(
+            label="🏅 Badges Earned", 
+            value=len(badges),
+            delta="Unlock more!"
+        )
+    
+    with col4:
+        streak = progress_data.get('current_streak', 0)
+        st.metric(
+            label="🔥 Learning Streak", 
+            value=f"{streak} days",
+            delta="Keep it up!"
+        )
+    
+    # Badges section
+    if badges:
+        st.markdown("---")
+        st.markdown("### 🏅 My Badge Collection")
+        
+        # Display badges in a grid
+        badge_cols = st.columns(min(len(badges), 4))
+        
+        for i, badge in enumerate(badges):
+            with badge_cols[i % 4]:
+                st.markdown(f"""
+                <div style="text-align: center; padding: 20px; border: 2px solid #FFD700; border-radius: 10px; margin: 10px;">
+                    <div style="font-size: 3em;">{badge['emoji']}</div>
+                    <div style="font-weight: bold; margin-top: 10px;">{badge['name']}</div>
+                    <div style="font-size: 0.9em; color: #666;">{badge['description']}</div>
+                </div>
+                """, unsafe_allow_html=True)
+
+# ===== MAIN APPLICATION =====
+
+def main(playground_examples):
+    """Main application logic"""
+    # Sidebar navigation
+    st.sidebar.title("🐍 Navigation")
+    
+    # Page navigation buttons
+    if st.sidebar.button("🏠 Home", key="nav_home"):
+        st.session_state.current_page = "home"
+        st.rerun()
+    
+    if st.sidebar.button("📚 Lessons", key="nav_lessons"):
+        st.session_state.current_page = "lessons"
+        st.rerun()
+    
+    if st.sidebar.button("🎮 Playground", key="nav_playground"):
+        st.session_state.current_page = "playground"
+        st.rerun()
+    
+    if st.sidebar.button("🏆 Progress", key="nav_progress"):
+        st.session_state.current_page = "progress"
+        st.rerun()
+    
+    # Display current page
+    if st.session_state.current_page == "home":
+        show_home_page()
+    elif st.session_state.current_page == "lessons":
+        show_lessons_page()
+    elif st.session_state.current_page == "playground":
+        show_playground_page(playground_examples)
+    elif st.session_state.current_page == "progress":
+        show_progress_page()
+
+def run_app(lesson_pack, badges, playground_examples, page_options=PAGE_OPTIONS):
+    """Draw the app for this session: lessons from lesson_pack, the given badges and playground examples"""
+    init_session_state(lesson_pack, badges, page_options)
+    main(playground_examples)
@@ -0,0 +1,104 @@
+"""
+Shared base namespace for kids' code
+One mapping of safe built-ins and modules is built once, and every run gets a
+copy of it as its __builtins__. Modules are imported the first time some code
+names them, so `print("hi")` never has to touch pandas. Modules are shared by
+every run, so runs only get read-only stand-ins of them.
+"""
+
+import importlib
+import threading
+import types
+
+
+class ReadOnlyModule(types.ModuleType):
+    """Stand-in for a module whose attributes kids' code can read but not change
+
+    Without it `math.pi = 3` in one run would be seen by every later run in
+    the same process. Attributes are looked up on the module the first time
+    and then kept, so later reads are plain attribute reads; submodules come
+    back read-only too.
+    """
+
+    def __init__(self, module):
+        super().__init__(module.__name__, module.__doc__)
+        self.__dict__['_module'] = module
+
+    def __getattr__(self, name):
+        value = self._wrap(name, getattr(self.__dict__['_module'], name))
+        if isinstance(value, types.ModuleType) and not isinstance(value, ReadOnlyModule):
+            value = ReadOnlyModule(value)
+        self.__dict__[name] = value
+        return value
+
+    def _wrap(self, name, value):
+        """Hook for stand-ins that change what an attribute gives back"""
+        return value
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__name__}.{name} can't be changed here")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{self.__name__}.{name} can't be changed here")
+
+    def __dir__(self):
+        return dir(self.__dict__['_module'])
+
+
+def lazy_module(name, attribute=None):
+    """Loader that imports a module (read-only) or one attribute of it when first called"""
+    def load():
+        module = importlib.import_module(name)
+        return getattr(module, attribute) if attribute else ReadOnlyModule(module)
+    return load
+
+
+def _names_used(code):
+    """Every global or built-in name a code object (or any code nested in it) looks up"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _names_used(const)
+    return names
+
+
+class BaseNamespace:
+    """Built-ins shared by every run, with modules loaded the first time code needs them
+
+    prepare(code) loads the modules the code uses and returns a plain dict copy
+    of the built-ins for one run: name lookups stay on CPython's fast path, and
+    a run that replaces or deletes a built-in changes only its own copy.
+    per_run values are made fresh for each run that uses them (like a
+    random.Random, so random.seed(42) cannot make other runs predictable).
+    """
+
+    def __init__(self, values, lazy=None, per_run=None):
+        self.builtins = dict(values)
+        self._lazy = dict(lazy or {})
+        self._per_run = dict(per_run or {})
+        self._load_lock = threading.Lock()
+
+    def prepare(self, code, previous=None):
+        """Load any not-yet-loaded modules the compiled code refers to; returns the run's copy of the built-ins
+
+        previous is the built-ins of an earlier run in the same namespace (the
+        cells before), whose per-run values are carried on.
+        """
+        missing = [name for name in self._lazy if name not in self.builtins]
+        used = _names_used(code) if missing or self._per_run else ()
+        for name in missing:
+            if name in used:
+                with self._load_lock:
+                    if name not in self.builtins:
+                        self.builtins[name] = self._lazy[name]()
+        prepared = dict(self.builtins)
+        for name, make in self._per_run.items():
+            if previous is not None and name in previous:
+                prepared[name] = previous[name]
+            elif name in used:
+                prepared[name] = make()
+        return prepared
+
+    def names(self):
+        """Every name in the namespace, loaded or not"""
+        return set(self.builtins) | set(self._lazy) | set(self._per_run)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Overhead of the in-process instruction budget
+Runs every lesson snippet and a few loop-heavy programs with and without the
+budget and reports how much slower the guarded runs are (the target is < 2x)
+
+Usage: python benchmarks/budget_overhead.py [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import CodeExecutor
+from lesson_code import iter_snippets
+
+# Worst cases: nothing but tight loops of kids' code
+LOOP_PROGRAMS = {
+    'counting loop': "total = 0\nfor i in range(20000):\n    total = total + i\n",
+    'while loop': "n = 0\nwhile n < 20000:\n    n += 1\n",
+    'one-line loop': "for i in range(20000): pass\n",
+    'function calls': "def double(x):\n    return x * 2\nfor i in range(5000):\n    double(i)\n",
+}
+
+
+def time_run(executor, compiled_code, repeat):
+    """Best wall time of repeated in-process runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = executor._execute_in_process(compiled_code)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help="runs per snippet (the best one counts)")
+    args = parser.parse_args()
+
+    executor = CodeExecutor(use_sandbox=False)
+
+    snippets = [(name, code) for kind, name, lesson_id, code in iter_snippets()]
+    snippets += list(LOOP_PROGRAMS.items())
+
+    print(f"{'snippet':<40} {'plain ms':>9} {'budget ms':>10} {'ratio':>6}")
+    ratios = []
+    for name, code in snippets:
+        prepared = executor._check_and_compile(code)
+        if prepared['code'] is None:
+            continue
+        # The same code compiled as-is runs without any step counting
+        plain_ms, _ = time_run(executor, compile(code, '<user_code>', 'exec'), args.repeat)
+        budget_ms, result = time_run(executor, prepared['code'], args.repeat)
+        ratio = budget_ms / plain_ms if plain_ms else 1.0
+        ratios.append(ratio)
+        flag = "" if result['success'] else "  (failed)"
+        print(f"{name[:40]:<40} {plain_ms:>9.2f} {budget_ms:>10.2f} {ratio:>5.2f}x{flag}")
+
+    ratios.sort()
+    print(f"\n{len(ratios)} snippets, median {ratios[len(ratios) // 2]:.2f}x, worst {ratios[-1]:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
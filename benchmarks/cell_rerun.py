@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Cell mode re-run benchmark
+Times editing the last cell of a pandas + Plotly notebook two ways: running
+the whole program again (the Playground's normal Run Code), and Cell mode,
+where only the edited cell runs in the namespace kept from the last run.
+
+Usage: python benchmarks/cell_rerun.py [--edits 10] [--rows 50000] [--in-process]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import CodeExecutor
+
+SETUP_CELLS = '''# %% Make a big table of pretend game scores
+players = pd.DataFrame({{'turn': range({rows})}})
+players['player'] = 'kid' + (players['turn'] % 500).astype(str)
+players['level'] = players['turn'] % 20
+players['score'] = players['turn'] * 37 % 1000
+print(len(players), "scores")
+
+# %% Work out some new columns
+players['bonus'] = players['score'] * 2 + players['level']
+players['rank'] = players['score'].rank(ascending=False)
+totals = players.groupby('player')['bonus'].sum().reset_index()
+
+# %% Chart the best players
+best = totals.sort_values('bonus', ascending=False).head(20)
+fig = px.bar(best, x='player', y='bonus')
+'''
+
+LAST_CELL = '''
+# %% Look at one level
+print(players[players['level'] == {level}]['score'].mean())
+'''
+
+
+def edited_code(rows, edit):
+    return SETUP_CELLS.format(rows=rows) + LAST_CELL.format(level=edit % 20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--edits', type=int, default=10, help="edits of the last cell to time")
+    parser.add_argument('--rows', type=int, default=50_000, help="rows in the pretend scores table")
+    parser.add_argument('--in-process', action='store_true', help="run code in this process instead of the sandbox pool")
+    args = parser.parse_args()
+
+    executor = CodeExecutor(use_sandbox=not args.in_process)
+    # Import pandas and plotly (and start the workers) before timing anything
+    executor.execute_code("print(pd.DataFrame({'a': [1]}), px.bar(x=[1], y=[1]))")
+
+    full = []
+    for edit in range(args.edits):
+        start = time.perf_counter()
+        result = executor.execute_code(edited_code(args.rows, edit), timeout=30)
+        full.append((time.perf_counter() - start) * 1000)
+        assert result['success'], result['error']
+
+    session = executor.new_cell_session()
+    executor.run_cells(edited_code(args.rows, -1), session, timeout=30)
+    cells = []
+    for edit in range(args.edits):
+        start = time.perf_counter()
+        result = executor.run_cells(edited_code(args.rows, edit), session, timeout=30)
+        cells.append((time.perf_counter() - start) * 1000)
+        assert result['success'], [cell['error'] for cell in result['cells']]
+        assert [cell['ran'] for cell in result['cells']] == [False, False, False, True]
+    session.close()
+
+    full_ms = sorted(full)[len(full) // 2]
+    cells_ms = sorted(cells)[len(cells) // 2]
+    print(f"{args.rows:,} rows, {'in-process' if args.in_process else 'sandbox'}, median of {args.edits} edits")
+    print(f"  whole program  {full_ms:9.2f} ms")
+    print(f"  cell mode      {cells_ms:9.2f} ms  ({full_ms / cells_ms:.1f}x faster)")
+
+    if not args.in_process:
+        CodeExecutor.get_pool().shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Content pack loading cost
+Writes a synthetic pack of many lessons (copies of the adventure lessons) and
+compares opening it with reading every lesson up front: time and memory to
+open the pack, then to open a few lessons. Also checks that a lesson edited
+on disk is picked up on its next use.
+
+Usage: python benchmarks/content_pack_load.py [--lessons 1000] [--open 10]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_packs import ContentPack, pack_path
+
+
+def write_pack(directory, count):
+    """A pack of count lessons, cycling through the adventure lessons"""
+    source = ContentPack(pack_path('adventure'))
+    originals = [source.lesson(entry['id']) for entry in source.lessons()]
+    os.makedirs(os.path.join(directory, 'lessons'))
+    entries = []
+    for lesson_id in range(1, count + 1):
+        lesson = dict(originals[(lesson_id - 1) % len(originals)], id=lesson_id)
+        lesson['exercises'] = [dict(exercise, id=f"ex_{lesson_id}_{number}") for number, exercise in enumerate(lesson.get('exercises', []), 1)]
+        file = f"lessons/lesson_{lesson_id:04d}.json"
+        with open(os.path.join(directory, file), 'w', encoding='utf-8') as out:
+            json.dump(lesson, out, ensure_ascii=False)
+        entries.append({
+            'id': lesson_id,
+            'title': f"{lesson['title']} ({lesson_id})",
+            'description': lesson['description'],
+            'difficulty': lesson['difficulty'],
+            'file': file,
+            'exercises': [exercise['id'] for exercise in lesson['exercises']],
+        })
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as out:
+        json.dump({'name': 'Synthetic', 'lessons': entries}, out, ensure_ascii=False)
+
+
+def measure(load):
+    """Seconds and traced bytes that load() takes; returns (result, seconds, bytes)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load()
+    seconds = time.perf_counter() - started
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, seconds, size
+
+
+def read_everything(directory):
+    with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as source:
+        entries = json.load(source)['lessons']
+    lessons = []
+    for entry in entries:
+        with open(os.path.join(directory, entry['file']), encoding='utf-8') as source:
+            lessons.append(json.load(source))
+    return lessons
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lessons', type=int, default=1000, help="lessons in the synthetic pack")
+    parser.add_argument('--open', type=int, default=10, help="lessons a session opens")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_pack(directory, args.lessons)
+
+        _, eager_seconds, eager_bytes = measure(lambda: read_everything(directory))
+        pack, open_seconds, open_bytes = measure(lambda: ContentPack(directory))
+
+        def open_lessons():
+            return [pack.lesson(lesson_id) for lesson_id in range(1, args.open + 1)]
+        _, lessons_seconds, lessons_bytes = measure(open_lessons)
+
+        # A lesson edited on disk is read again on its next use
+        path = os.path.join(directory, pack.entry(1)['file'])
+        with open(path, encoding='utf-8') as source:
+            lesson = json.load(source)
+        lesson['title'] = 'Edited!'
+        with open(path, 'w', encoding='utf-8') as out:
+            json.dump(lesson, out)
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        reloaded = pack.lesson(1)['title'] == 'Edited!'
+
+    print(f"{args.lessons:,} lessons, a session opens {args.open}")
+    print(f"  read every lesson    {eager_seconds * 1000:8.1f} ms  {eager_bytes / 1024:8.0f} KiB")
+    print(f"  open the pack        {open_seconds * 1000:8.1f} ms  {open_bytes / 1024:8.0f} KiB")
+    print(f"  open {args.open:<4} lessons     {lessons_seconds * 1000:8.1f} ms  {lessons_bytes / 1024:8.0f} KiB")
+    print(f"  lessons read         {pack.loaded_count()}")
+    print(f"  edit picked up       {'yes' if reloaded else 'NO'}")
+    return 0 if reloaded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+CodeExecutor benchmark over every lesson snippet
+Runs each interactive demo, code example, exercise template and Playground
+example through CodeExecutor cold (empty caches) and warm, and reports
+p50/p95/p99 latency and peak memory. Results can be saved as a baseline and
+later runs compared against it, failing when they regress past a threshold.
+
+Usage: python benchmarks/executor_bench.py [--repeat 5] [--in-process]
+           [--save-baseline benchmarks/baseline.json]
+           [--baseline benchmarks/baseline.json] [--threshold 0.25]
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import CodeExecutor
+from lesson_code import iter_snippets
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(values):
+    return {f"p{percent}": percentile(values, percent) for percent in PERCENTILES}
+
+
+def clear_caches():
+    CodeExecutor._code_cache.clear()
+    CodeExecutor._result_cache.clear()
+
+
+def timed_run(executor, code):
+    """Wall time of one execute_code call in milliseconds, and its result"""
+    start = time.perf_counter()
+    result = executor.execute_code(code, label='benchmark')
+    return (time.perf_counter() - start) * 1000, result
+
+
+def peak_memory(executor, code):
+    """Peak memory of one in-process run, in bytes (None if the code does not compile)"""
+    prepared = executor._check_and_compile(code)
+    if prepared['code'] is None:
+        return None
+    return executor._execute_in_process(prepared['code'], measure_memory=True)['metrics']['peak_memory_bytes']
+
+
+def bench_snippet(executor, memory_executor, code, repeat):
+    cold = []
+    for _ in range(repeat):
+        clear_caches()
+        elapsed, result = timed_run(executor, code)
+        cold.append(elapsed)
+
+    # The first run fills the caches; the rest are warm
+    timed_run(executor, code)
+    warm = [timed_run(executor, code)[0] for _ in range(repeat)]
+
+    return {
+        'success': result['success'],
+        'cold_ms': sorted(cold)[len(cold) // 2],
+        'warm_ms': sorted(warm)[len(warm) // 2],
+        'peak_memory_bytes': peak_memory(memory_executor, code),
+    }
+
+
+def run_benchmark(repeat, use_sandbox):
+    executor = CodeExecutor(use_sandbox=use_sandbox)
+    memory_executor = CodeExecutor(use_sandbox=False)
+    if use_sandbox:
+        # Start the workers before timing anything
+        executor.execute_code("print('warming up')")
+
+    snippets = {}
+    for kind, name, lesson_id, code in iter_snippets():
+        stats = bench_snippet(executor, memory_executor, code, repeat)
+        snippets[f"{kind}: {name}"] = dict(stats, kind=kind, lesson_id=lesson_id)
+        print(f"  {kind:<12} {name[:36]:<36} cold {stats['cold_ms']:8.2f} ms  warm {stats['warm_ms']:8.2f} ms"
+              f"{'' if stats['success'] else '  (error)'}")
+
+    memory = [stats['peak_memory_bytes'] for stats in snippets.values() if stats['peak_memory_bytes'] is not None]
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'sandbox': use_sandbox,
+        'repeat': repeat,
+        'summary': {
+            'cold_ms': summarize([stats['cold_ms'] for stats in snippets.values()]),
+            'warm_ms': summarize([stats['warm_ms'] for stats in snippets.values()]),
+            'peak_memory_bytes': summarize(memory),
+        },
+        'snippets': snippets,
+    }
+
+
+def compare(report, baseline, threshold, min_delta_ms):
+    """List every summary percentile or snippet that got slower than the baseline allows"""
+    regressions = []
+
+    def check(name, now, before, unit, min_delta):
+        if now is None or before is None:
+            return
+        if now > before * (1 + threshold) and now - before > min_delta:
+            regressions.append(f"{name}: {before:,.2f} -> {now:,.2f} {unit} (+{(now / before - 1) * 100 if before else math.inf:.0f}%)")
+
+    for metric, unit, min_delta in (('cold_ms', 'ms', min_delta_ms), ('warm_ms', 'ms', min_delta_ms), ('peak_memory_bytes', 'bytes', 0)):
+        for percent_name, value in report['summary'][metric].items():
+            check(f"{metric} {percent_name}", value, baseline['summary'].get(metric, {}).get(percent_name), unit, min_delta)
+
+    for name, stats in report['snippets'].items():
+        before = baseline['snippets'].get(name)
+        if before is not None:
+            check(f"{name} cold", stats['cold_ms'], before['cold_ms'], 'ms', min_delta_ms)
+    return regressions
+
+
+def print_summary(report):
+    print(f"\n{len(report['snippets'])} snippets, {'sandbox' if report['sandbox'] else 'in-process'}, "
+          f"median of {report['repeat']} runs each")
+    for metric, unit in (('cold_ms', 'ms'), ('warm_ms', 'ms'), ('peak_memory_bytes', 'bytes')):
+        values = report['summary'][metric]
+        cells = '  '.join(f"{name} {value:>12,.2f}" for name, value in values.items() if value is not None)
+        print(f"  {metric:<18} {cells} {unit}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="runs per snippet in each phase (the median counts)")
+    parser.add_argument('--in-process', action='store_true', help="run code in this process instead of the sandbox pool")
+    parser.add_argument('--save-baseline', metavar='PATH', help="write the results to a baseline JSON file")
+    parser.add_argument('--baseline', metavar='PATH', help="compare against a baseline JSON file")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help="ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.repeat, use_sandbox=not args.in_process)
+    print_summary(report)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as out:
+            json.dump(report, out, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as source:
+            baseline = json.load(source)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regressions past {args.threshold:.0%} of {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions past {args.threshold:.0%} of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
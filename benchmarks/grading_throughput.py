@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Bulk grading throughput
+Makes a synthetic class export (right answers, wrong answers, errors and a
+few endless loops, each with a student comment so no two are the same
+source) and grades it with grading.Grader, reporting submissions per minute.
+Copies of the same program share one run; --distinct makes every submission
+a different program, to measure the raw sandbox throughput.
+
+Usage: python benchmarks/grading_throughput.py [--submissions 3000] [--distinct] [--workers N] [--out results.csv]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import CodeExecutor
+from grading import Grader, read_submissions, write_results
+from scheduler import PRIORITY_LESSON, PRIORITY_PLAYGROUND
+
+# exercise id -> (a right answer, a wrong answer, code that fails)
+ANSWERS = {
+    'ex_1_1': ('print("Hello, my name is Sam!")', 'print("Hi")', 'print(Hello)'),
+    'ex_3_1': ('total_cost = 2.50 + 3.00 + 1.75\nprint(f"Total cost: ${total_cost}")', 'print(2.5 + 3)', 'print(2.5 + "3")'),
+    'ex_5_1': ('for i in range(10, 0, -1):\n    print(i)\nprint("Blast off!")', 'for i in range(10):\n    print(i)', 'for i in range(10)\n    print(i)'),
+    'ex_6_1': ('num = 7\nprint("even" if num % 2 == 0 else "odd")', 'print("even")', 'print(num)'),
+    'ex_8_1': ('def square(n):\n    print(n * n)\n\nsquare(5)', 'def square(n):\n    print(n + n)\n\nsquare(5)', 'square(5)'),
+    'ex_10_1': ('i = 1\nwhile i <= 5:\n    print(i)\n    i += 1', 'i = 1\nwhile i < 5:\n    print(i)\n    i += 1', 'i = 1\nwhile i <= 5:\n    print(i)'),
+}
+
+
+def make_submissions(count, distinct=False, seed=7):
+    """Synthetic submissions: mostly right, some wrong, some failing (including endless loops)"""
+    rng = random.Random(seed)
+    exercise_ids = sorted(ANSWERS)
+    for number in range(count):
+        exercise_id = exercise_ids[number % len(exercise_ids)]
+        right, wrong, failing = ANSWERS[exercise_id]
+        code = rng.choices([right, wrong, failing], weights=[70, 20, 10])[0]
+        if rng.random() < 0.5:
+            # The same program in another quote style
+            code = code.replace('"', "'")
+        header = f"submission = {number}" if distinct else f"# submission {number}"
+        yield {'student': f"student{number % 300:03d}", 'exercise_id': exercise_id, 'code': f"{header}\n{code}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--submissions', type=int, default=3000, help="synthetic submissions to grade")
+    parser.add_argument('--distinct', action='store_true', help="make every submission a different program")
+    parser.add_argument('--workers', type=int, help="sandbox worker processes (default: one per CPU)")
+    parser.add_argument('--out', help="also keep the results here (.csv or .jsonl)")
+    args = parser.parse_args()
+
+    if args.workers:
+        CodeExecutor.configure_pool(min_size=args.workers, max_size=args.workers)
+    CodeExecutor.configure_scheduler(cpu_quota=None, max_wait={PRIORITY_LESSON: 3600, PRIORITY_PLAYGROUND: 3600}, max_queue=10_000)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'submissions.jsonl')
+        with open(path, 'w', encoding='utf-8') as out:
+            for submission in make_submissions(args.submissions, args.distinct):
+                out.write(json.dumps(submission) + '\n')
+
+        grader = Grader()
+        # Start the workers before timing anything
+        CodeExecutor().execute_code("print('warming up')")
+
+        started = time.perf_counter()
+        counts = write_results(grader.grade_all(read_submissions(path)), args.out or os.path.join(directory, 'results.jsonl'))
+        elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    print(f"{total:,} submissions, {CodeExecutor.get_pool().max_size} workers, {grader.workers} grading threads")
+    print(f"  {elapsed:.2f} s, {total / elapsed * 60:,.0f} submissions per minute")
+    print(f"  {grader.distinct_programs():,} distinct programs ran")
+    for status, count in sorted(counts.items()):
+        print(f"  {status:<16} {count:,}")
+    CodeExecutor.get_pool().shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
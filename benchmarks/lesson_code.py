@@ -0,0 +1,63 @@
+"""
+Every piece of runnable code in the apps' lesson content
+Reads the lesson content packs, and the playground examples straight from the
+app files' syntax trees, so benchmarks can run them without importing Streamlit
+"""
+
+import ast
+import os
+
+from content_packs import ContentPack, pack_path
+from exec_cache import source_key
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILES = ('python_adventure_kids.py', 'app.py')
+LESSON_PACKS = ('adventure', 'starter')
+
+
+def _load_tree(filename):
+    with open(os.path.join(ROOT, filename), encoding='utf-8') as source:
+        return ast.parse(source.read(), filename)
+
+
+def load_lessons(name):
+    """Every lesson of a content pack, in course order"""
+    pack = ContentPack(pack_path(name))
+    return [pack.lesson(entry['id']) for entry in pack.lessons()]
+
+
+def load_playground_examples(filename):
+    """The playground's example snippets of an app file, by title"""
+    for node in _load_tree(filename).body:
+        if isinstance(node, ast.Assign) and getattr(node.targets[0], 'id', None) == 'PLAYGROUND_EXAMPLES':
+            return ast.literal_eval(node.value)
+    return {}
+
+
+def iter_snippets(filenames=APP_FILES, packs=LESSON_PACKS):
+    """Yield (kind, name, lesson_id, code) for every unique snippet in the apps
+
+    kind is one of 'demo', 'code_example', 'exercise' or 'playground'.
+    """
+    seen = set()
+
+    def fresh(code):
+        key = source_key(code)
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    for name in packs:
+        for lesson in load_lessons(name):
+            for number, section in enumerate(lesson.get('content', []), 1):
+                kind = {'interactive_demo': 'demo', 'code_example': 'code_example'}.get(section.get('type'))
+                if kind and fresh(section['code']):
+                    yield kind, f"lesson {lesson['id']} section {number}", lesson['id'], section['code']
+            for number, exercise in enumerate(lesson.get('exercises', []), 1):
+                if exercise.get('type') == 'code_completion' and fresh(exercise['template']):
+                    yield 'exercise', f"lesson {lesson['id']} exercise {number}", lesson['id'], exercise['template']
+    for filename in filenames:
+        for title, code in load_playground_examples(filename).items():
+            if fresh(code):
+                yield 'playground', title, None, code
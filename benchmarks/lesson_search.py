@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Lesson search speed
+Writes a synthetic pack of many lessons (copies of the adventure lessons, so
+common words like "print" appear in every one of them, the slowest case) and
+times building, saving and loading its search index, then the queries kids
+might type: whole words, prefixes, typos and several words at once.
+
+Usage: python benchmarks/lesson_search.py [--lessons 5000] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pack_load import write_pack
+from content_packs import ContentPack
+from lesson_search import load_search_index
+
+QUERIES = ['loop', 'lists', 'func', 'fucntion', 'dictionry', 'random dice', 'print', 'pr', 'if else', 'while loops count', 'chart plot data', 'zebra']
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(int(percent / 100 * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lessons', type=int, default=5000, help="lessons in the synthetic pack")
+    parser.add_argument('--repeat', type=int, default=20, help="times each query is timed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_pack(directory, args.lessons)
+        pack = ContentPack(directory)
+        index, build_seconds = timed(lambda: load_search_index(pack))
+        index, load_seconds = timed(lambda: load_search_index(ContentPack(directory)))
+        index_size = os.path.getsize(os.path.join(directory, 'search_index.json'))
+
+    print(f"{args.lessons:,} lessons, {len(index.postings):,} words indexed ({index_size / 1024:,.0f} KiB saved)")
+    print(f"  build and save index  {build_seconds * 1000:8.1f} ms (lessons kept in memory: {pack.loaded_count()})")
+    print(f"  load saved index      {load_seconds * 1000:8.1f} ms")
+    everything = []
+    for query in QUERIES:
+        times = []
+        for _ in range(args.repeat):
+            results, seconds = timed(lambda: index.search(query))
+            times.append(seconds * 1000)
+        everything.extend(times)
+        top = f"lesson {results[0].lesson_id}" if results else "nothing"
+        print(f"  {query!r:<22} p50 {percentile(times, 50):6.2f} ms  max {max(times):6.2f} ms  -> {top}")
+    print(f"  all queries           p50 {percentile(everything, 50):6.2f} ms  p95 {percentile(everything, 95):6.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
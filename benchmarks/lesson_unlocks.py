@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Lesson unlock cost
+Builds a branching course (a shared core, then tracks that split off and
+join again) and times building its prerequisite graph, working out a
+learner's open lessons from scratch, keeping them up to date one completed
+lesson at a time, and the sidebar's per-lesson checks.
+
+Usage: python benchmarks/lesson_unlocks.py [--lessons 2000] [--tracks 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lesson_graph import LessonGraph
+
+
+def make_entries(count, tracks, seed=3):
+    """A core of lessons, then tracks that each need the core and sometimes a lesson of another track"""
+    rng = random.Random(seed)
+    core = max(count // 10, 1)
+    entries = [{'id': lesson_id} for lesson_id in range(1, core + 1)]
+    last = {track: core for track in range(tracks)}
+    for lesson_id in range(core + 1, count + 1):
+        track = lesson_id % tracks
+        prerequisites = [last[track]]
+        if rng.random() < 0.1:
+            other = rng.randrange(tracks)
+            if last[other] != last[track]:
+                prerequisites.append(last[other])
+        entries.append({'id': lesson_id, 'prerequisites': prerequisites})
+        last[track] = lesson_id
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lessons', type=int, default=2000, help="lessons in the course")
+    parser.add_argument('--tracks', type=int, default=3, help="tracks after the shared core")
+    args = parser.parse_args()
+
+    entries = make_entries(args.lessons, args.tracks)
+    started = time.perf_counter()
+    graph = LessonGraph(entries)
+    build_seconds = time.perf_counter() - started
+
+    # A learner completes lessons in course order
+    completed = set()
+    unlocked = graph.unlocked(completed)
+    full_times, step_times = [], []
+    for lesson_id in graph.order:
+        completed.add(lesson_id)
+        started = time.perf_counter()
+        unlocked |= graph.newly_unlocked(lesson_id, completed)
+        step_times.append(time.perf_counter() - started)
+        if len(completed) % 100 == 0:
+            started = time.perf_counter()
+            assert graph.unlocked(completed) == unlocked
+            full_times.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for entry in entries:
+        entry['id'] in unlocked
+    sidebar_seconds = time.perf_counter() - started
+
+    print(f"{args.lessons:,} lessons in {args.tracks} tracks")
+    print(f"  build graph            {build_seconds * 1000:8.2f} ms")
+    print(f"  open lessons, full     {sum(full_times) / len(full_times) * 1000:8.3f} ms each")
+    print(f"  open lessons, one step {sum(step_times) / len(step_times) * 1e6:8.2f} us each")
+    print(f"  sidebar checks         {sidebar_seconds * 1000:8.3f} ms for every lesson")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
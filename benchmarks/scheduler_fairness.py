@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Fair-share scheduler check
+One session spams heavy Playground runs from several threads while another
+session runs lesson demos. Reports the lesson runs' queue waits, how many of
+the spammer's runs were turned away as busy, and the scheduler's stats.
+
+Usage: python benchmarks/scheduler_fairness.py [--seconds 20] [--spammers 4] [--cpu-quota 5]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import CodeExecutor
+from lesson_code import iter_snippets
+
+HEAVY_CODE = '''total = sum(i * i for i in range(2_000_000 // 40))
+numbers = pd.Series(range(2_000_000))
+print(total, (numbers * 3 % 7).sum())
+'''
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(int(percent / 100 * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def spam(executor, stop, outcomes):
+    edit = 0
+    while not stop.is_set():
+        # A new comment each time, so the result cache cannot answer
+        result = executor.execute_code(f"# edit {edit}\n{HEAVY_CODE}", timeout=10, label="playground")
+        edit += 1
+        outcomes.append('busy' if result.get('busy') else 'ran')
+        if result.get('busy'):
+            time.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=20, help="how long the spammer runs")
+    parser.add_argument('--spammers', type=int, default=4, help="threads spamming Run Code in one session")
+    parser.add_argument('--cpu-quota', type=float, default=5, help="CPU-seconds a session may use per minute")
+    args = parser.parse_args()
+
+    CodeExecutor.configure_scheduler(cpu_quota=args.cpu_quota)
+    spammer = CodeExecutor(session_id='spammer')
+    student = CodeExecutor(session_id='student')
+    student.execute_code("print('warming up')")
+
+    demos = [code for kind, _, _, code in iter_snippets() if kind == 'demo']
+    stop = threading.Event()
+    outcomes = []
+    threads = [threading.Thread(target=spam, args=(spammer, stop, outcomes)) for _ in range(args.spammers)]
+    for thread in threads:
+        thread.start()
+
+    waits, totals, busy = [], [], 0
+    deadline = time.monotonic() + args.seconds
+    run = 0
+    while time.monotonic() < deadline:
+        code = f"# run {run}\n{demos[run % len(demos)]}"
+        run += 1
+        result = student.execute_code(code, label="lesson-demo")
+        busy += bool(result.get('busy'))
+        waits.append(result['metrics']['queue_wait_seconds'] * 1000)
+        totals.append(result['metrics']['total_seconds'] * 1000)
+        time.sleep(0.1)
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"{args.spammers} spamming threads, {args.seconds:.0f} s, quota {args.cpu_quota} CPU-s/min")
+    print(f"  lesson runs      {len(waits)} ({busy} busy)")
+    print(f"  lesson wait      p50 {percentile(waits, 50):7.1f} ms  p95 {percentile(waits, 95):7.1f} ms")
+    print(f"  lesson total     p50 {percentile(totals, 50):7.1f} ms  p95 {percentile(totals, 95):7.1f} ms")
+    print(f"  spammer runs     {outcomes.count('ran')} ran, {outcomes.count('busy')} turned away")
+    print(f"  scheduler        {CodeExecutor.get_scheduler_stats()}")
+    CodeExecutor.get_pool().shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Per-session memory
+Opens many simulated browser sessions of an app with Streamlit's AppTest (each
+one loads the home page, then a lesson) and measures the objects each session
+keeps in st.session_state. An object reachable from several sessions is
+counted once, for the first session that reaches it, so the figure for later
+sessions is what one more session costs the server.
+
+Usage: python benchmarks/session_memory.py [--sessions 500] [--app python_adventure_kids.py]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import types
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Code and classes belong to the server, not to a session
+SHARED_TYPES = (types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType, types.CodeType)
+
+
+def new_bytes(roots, seen):
+    """Bytes of the objects reachable from roots that are not in seen yet (they are added to it)"""
+    total = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+
+def open_session(path):
+    """One simulated browser session: the home page, then the first lesson"""
+    session = AppTest.from_file(path, default_timeout=60).run()
+    session.session_state.user_name = 'Sam'
+    session.session_state.current_page = 'lessons'
+    session.run()
+    if session.exception:
+        raise RuntimeError(session.exception[0].message)
+    return session
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=500, help="simulated browser sessions")
+    parser.add_argument('--app', default='python_adventure_kids.py', help="app file to open")
+    args = parser.parse_args()
+
+    path = os.path.join(ROOT, args.app)
+    started = time.perf_counter()
+    sessions = [open_session(path) for _ in range(args.sessions)]
+    elapsed = time.perf_counter() - started
+
+    seen = set()
+    sizes = []
+    for session in sessions:
+        state = session.session_state.to_dict()
+        sizes.append(new_bytes([state[key] for key in sorted(state)], seen))
+    services = sorted(key for key, value in sessions[-1].session_state.items() if not isinstance(value, (str, int, float, bool, list, dict)))
+
+    later = sizes[1:] or sizes
+    print(f"{args.sessions} sessions of {args.app} opened in {elapsed:.1f} s")
+    print(f"  objects per session  {', '.join(services)}")
+    print(f"  first session        {sizes[0] / 1024:8.1f} KiB (includes anything the sessions share)")
+    print(f"  each later session   {sum(later) / len(later) / 1024:8.1f} KiB")
+    print(f"  all sessions         {sum(sizes) / 1024:8.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Lesson menu render time
+Writes synthetic packs of more and more lessons (copies of the adventure
+lessons), points an app at each one through PYTHON_ADVENTURE_PACK and times
+reruns of the lessons page with Streamlit's AppTest, counting the lesson
+buttons the sidebar draws. Past FLAT_MENU_LESSONS the menu shows one page of
+units, so both should stay flat as the course grows.
+
+Usage: python benchmarks/sidebar_render.py [--lessons 12 200 2000] [--repeat 10] [--app python_adventure_kids.py]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from content_pack_load import write_pack
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(int(percent / 100 * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def lesson_buttons(session):
+    """How many lesson buttons the sidebar drew"""
+    return sum(1 for button in session.sidebar.button if button.key.startswith('lesson_'))
+
+
+def time_reruns(path, repeat):
+    """Rerun times (ms) of the lessons page, after a first run that loads the pack; returns (times, buttons)"""
+    session = AppTest.from_file(path, default_timeout=120).run()
+    session.session_state.user_name = 'Sam'
+    session.session_state.current_page = 'lessons'
+    session.run()
+    if session.exception:
+        raise RuntimeError(session.exception[0].message)
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        session.run()
+        times.append((time.perf_counter() - started) * 1000)
+    return times, lesson_buttons(session)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lessons', type=int, nargs='+', default=[12, 200, 2000], help="lessons in each synthetic pack")
+    parser.add_argument('--repeat', type=int, default=10, help="reruns timed per pack")
+    parser.add_argument('--app', default='python_adventure_kids.py', help="app file to open")
+    args = parser.parse_args()
+
+    path = os.path.join(ROOT, args.app)
+    print(f"Lessons page of {args.app}, {args.repeat} reruns per pack")
+    for count in args.lessons:
+        with tempfile.TemporaryDirectory() as directory:
+            write_pack(directory, count)
+            os.environ['PYTHON_ADVENTURE_PACK'] = directory
+            times, buttons = time_reruns(path, args.repeat)
+        print(f"  {count:6,} lessons  {buttons:4} lesson buttons  p50 {percentile(times, 50):7.1f} ms  max {max(times):7.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
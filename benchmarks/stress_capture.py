@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Stress check for per-execution output capture
+Runs hundreds of executions at the same time and checks that every result
+holds exactly its own output and nothing from the others
+
+Usage: python benchmarks/stress_capture.py [--runs 500] [--threads 50] [--sandbox]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import CodeExecutor
+
+LINES_PER_RUN = 200
+
+
+def make_code(run_id):
+    """Code that prints its own run id many times, yielding the GIL as it goes"""
+    return (
+        f"for i in range({LINES_PER_RUN}):\n"
+        f"    print('run {run_id}', i)\n"
+    )
+
+
+def expected_output(run_id):
+    return ''.join(f"run {run_id} {i}\n" for i in range(LINES_PER_RUN))
+
+
+def check_run(executor, run_id):
+    """Run one submission and return an error message, or None if it was clean"""
+    result = executor.execute_code(make_code(run_id), timeout=30)
+    if not result['success']:
+        return f"run {run_id} failed: {result['error']}"
+    if result['output'] != expected_output(run_id):
+        return f"run {run_id} got mixed-up output"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=500, help="number of executions")
+    parser.add_argument('--threads', type=int, default=50, help="executions in flight at once")
+    parser.add_argument('--sandbox', action='store_true', help="use the process pool instead of running in-process")
+    args = parser.parse_args()
+
+    # Switch threads as often as possible so any sharing of output shows up
+    sys.setswitchinterval(1e-6)
+    executor = CodeExecutor(use_sandbox=args.sandbox)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        failures = [error for error in pool.map(lambda run_id: check_run(executor, run_id), range(args.runs)) if error]
+    elapsed = time.perf_counter() - start
+
+    mode = "sandbox" if args.sandbox else "in-process"
+    print(f"{args.runs} {mode} runs on {args.threads} threads in {elapsed:.2f}s, {len(failures)} failures")
+    for failure in failures[:10]:
+        print(f"  {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""
+Cell dependencies for notebook-style runs
+Playground code can be split into cells with `# %%` lines. Each cell's AST
+tells which names it defines, reads and changes in place (itself, or through
+the functions it calls), so after an edit only the changed cells and the
+cells that depend on them are run again.
+"""
+
+import ast
+import functools
+from collections import namedtuple
+
+# A line starting with this begins a new cell
+CELL_MARKER = '# %%'
+
+# Methods that change the object they are called on
+MUTATING_METHODS = {
+    'append', 'extend', 'insert', 'pop', 'remove', 'clear', 'sort', 'reverse',
+    'update', 'setdefault', 'popitem', 'add', 'discard',
+    'insert_column', 'add_trace', 'add_traces',
+}
+# Prefixes of methods that change figures (fig.update_layout(), fig.add_bar(), ...)
+MUTATING_PREFIXES = ('update_', 'add_')
+
+# functions holds (name, mutates, uses) for each function the cell defines:
+# what its body changes in place happens in the cells that call it
+CellNames = namedtuple('CellNames', 'defs uses mutates functions')
+# One cell as last run: its source (None if it failed part way), names and result
+CellRun = namedtuple('CellRun', 'source names result')
+
+_NO_NAMES = CellNames(frozenset(), frozenset(), frozenset(), ())
+
+
+def split_cells(code):
+    """Split code into cell sources at CELL_MARKER lines (text before the first marker is a cell too)"""
+    cells = [[]]
+    for line in code.splitlines(keepends=True):
+        if line.lstrip().startswith(CELL_MARKER) and any(cells[-1]):
+            cells.append([])
+        cells[-1].append(line)
+    return [''.join(lines) for lines in cells]
+
+
+def _root_name(node):
+    """The variable at the bottom of x.a[0].b(...), or None"""
+    while isinstance(node, (ast.Attribute, ast.Subscript, ast.Call, ast.Starred)):
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _local_names(function):
+    """Names a function (or lambda) assigns, which stay local to it"""
+    args = function.args
+    names = {arg.arg for arg in args.posonlyargs + args.args + args.kwonlyargs}
+    names.update(arg.arg for arg in (args.vararg, args.kwarg) if arg is not None)
+    body = function.body if isinstance(function.body, list) else [function.body]
+    declared = set()
+    for statement in body:
+        for node in ast.walk(statement):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+                names.add(node.id)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names.add(node.name)
+            elif isinstance(node, (ast.Global, ast.Nonlocal)):
+                declared.update(node.names)
+    return names - declared
+
+
+class _CellAnalyzer(ast.NodeVisitor):
+    """Collects the top-level names a cell defines, uses and mutates"""
+
+    def __init__(self):
+        self.defs = set()
+        self.uses = set()
+        self.mutates = set()
+        # Per top-level function: the names its body changes in place and reads
+        self.functions = {}
+        self._function = None
+        self._class_depth = 0
+        self._scopes = []
+
+    def _is_local(self, name):
+        return any(name in scope for scope in self._scopes)
+
+    def _mutate(self, node):
+        name = _root_name(node)
+        if name is not None and not self._is_local(name):
+            if self._function is not None:
+                self.functions[self._function][0].add(name)
+            else:
+                self.mutates.add(name)
+            self.uses.add(name)
+
+    def visit_Name(self, node):
+        if self._is_local(node.id):
+            return
+        if isinstance(node.ctx, ast.Load):
+            self.uses.add(node.id)
+            if self._function is not None:
+                self.functions[self._function][1].add(node.id)
+        else:
+            self.defs.add(node.id)
+
+    def _visit_target(self, target):
+        if isinstance(target, (ast.Attribute, ast.Subscript)):
+            # df['total'] = ..., player.score = ...
+            self._mutate(target)
+        self.visit(target)
+
+    def visit_Assign(self, node):
+        self.visit(node.value)
+        for target in node.targets:
+            self._visit_target(target)
+
+    def visit_AnnAssign(self, node):
+        if node.value is not None:
+            self.visit(node.value)
+        self._visit_target(node.target)
+
+    def visit_AugAssign(self, node):
+        # score += 1 depends on what score was, so running it twice is not the same as once
+        self.visit(node.value)
+        self._mutate(node.target)
+        if not isinstance(node.target, ast.Name):
+            self.visit(node.target)
+
+    def visit_Delete(self, node):
+        for target in node.targets:
+            self._visit_target(target)
+
+    def visit_For(self, node):
+        self.visit(node.iter)
+        self._visit_target(node.target)
+        for statement in node.body + node.orelse:
+            self.visit(statement)
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Attribute):
+            method = node.func.attr
+            inplace = any(
+                keyword.arg == 'inplace' and isinstance(keyword.value, ast.Constant) and keyword.value.value is True
+                for keyword in node.keywords
+            )
+            if inplace or method in MUTATING_METHODS or method.startswith(MUTATING_PREFIXES):
+                self._mutate(node.func.value)
+        self.generic_visit(node)
+
+    def _visit_function(self, node):
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        for default in node.args.defaults + [d for d in node.args.kw_defaults if d is not None]:
+            self.visit(default)
+        self._scopes.append(_local_names(node))
+        for statement in node.body if isinstance(node.body, list) else [node.body]:
+            self.visit(statement)
+        self._scopes.pop()
+
+    def visit_FunctionDef(self, node):
+        if self._function is None and not self._class_depth:
+            # Its body runs when it is called, so its effects belong to the callers
+            self._function = node.name
+            self.functions.setdefault(node.name, (set(), set()))
+            try:
+                self._visit_function(node)
+            finally:
+                self._function = None
+        else:
+            self._visit_function(node)
+        self.defs.add(node.name)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        self._visit_function(node)
+
+    def visit_ClassDef(self, node):
+        # Methods are called through objects, not by name: their effects stay with this cell
+        self._class_depth += 1
+        self.generic_visit(node)
+        self._class_depth -= 1
+        self.defs.add(node.name)
+
+    def _visit_comprehension(self, node):
+        targets = set()
+        for generator in node.generators:
+            targets.update(n.id for n in ast.walk(generator.target) if isinstance(n, ast.Name))
+        # The first iterable is evaluated outside the comprehension
+        self.visit(node.generators[0].iter)
+        self._scopes.append(targets)
+        for index, generator in enumerate(node.generators):
+            if index:
+                self.visit(generator.iter)
+            for condition in generator.ifs:
+                self.visit(condition)
+        for element in ('elt', 'key', 'value'):
+            if hasattr(node, element):
+                self.visit(getattr(node, element))
+        self._scopes.pop()
+
+    visit_ListComp = visit_SetComp = visit_GeneratorExp = visit_DictComp = _visit_comprehension
+
+    def visit_Global(self, node):
+        # Names declared global in a function are top-level names
+        for scope in self._scopes:
+            scope.difference_update(node.names)
+
+
+@functools.lru_cache(maxsize=1024)
+def cell_names(source):
+    """CellNames(defs, uses, mutates) of one cell's source (all empty if it does not parse)"""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return _NO_NAMES
+    analyzer = _CellAnalyzer()
+    analyzer.visit(tree)
+    functions = tuple(
+        (name, frozenset(mutates), frozenset(uses)) for name, (mutates, uses) in analyzer.functions.items()
+    )
+    return CellNames(frozenset(analyzer.defs), frozenset(analyzer.uses), frozenset(analyzer.mutates), functions)
+
+
+def _definer(cells, name, before):
+    """Index of the last cell before `before` that defines name, or None"""
+    for index in range(min(before, len(cells)) - 1, -1, -1):
+        if name in cells[index].names.defs:
+            return index
+    return None
+
+
+def _function_mutates(entries):
+    """{function: every name calling it changes in place}, through the functions it calls too"""
+    mutates, uses = {}, {}
+    for entry in entries:
+        for name, changed, used in entry.names.functions:
+            mutates.setdefault(name, set()).update(changed)
+            uses.setdefault(name, set()).update(used)
+    grown = True
+    while grown:
+        grown = False
+        for name, called in uses.items():
+            for other in called & mutates.keys():
+                if not mutates[other] <= mutates[name]:
+                    mutates[name] |= mutates[other]
+                    grown = True
+    return mutates
+
+
+def dropped_names(previous, cells):
+    """Names cells that ran before defined and no current cell defines
+
+    They linger in the namespace after their cell is removed (or stops
+    defining them), so a cell using them would still work where a fresh run
+    would fail; the namespace has to be rebuilt from the first cell.
+    """
+    defined = set()
+    for cell in cells:
+        defined |= cell.names.defs
+    dropped = set()
+    for entry in previous:
+        if entry is not None:
+            dropped |= entry.names.defs - defined
+    return dropped
+
+
+def plan_reruns(previous, cells):
+    """Indices of the cells to run, in order, so the namespace matches a run of every cell
+
+    previous holds what the namespace has seen, one entry per cell with
+    .source and .names (None where a cell never ran, and a source of None
+    where it failed part way); cells holds the current ones. Changed cells
+    run again, and so does every later cell that uses or mutates a name a
+    re-run cell defines or mutates. A name that was changed in place
+    (`df['x'] = ...`, `score += 1`, or `add(1)` where add's body does
+    `lst.append(v)`) by a cell that is re-run or was edited away has its
+    defining cell re-run first, so in-place changes are never applied twice.
+    Names only removed cells defined are not handled here (see dropped_names).
+    """
+    def unchanged(index):
+        return index < len(previous) and previous[index] is not None and previous[index].source == cells[index].source
+
+    function_mutates = _function_mutates([entry for entry in previous if entry is not None] + list(cells))
+
+    def mutates(names):
+        changed = set(names.mutates)
+        for name in names.uses & function_mutates.keys():
+            changed |= function_mutates[name]
+        return changed
+
+    dirty = {index for index in range(len(cells)) if not unchanged(index)}
+
+    # In-place changes the namespace still holds from cells that were edited or removed
+    stale = [
+        (index, mutates(entry.names))
+        for index, entry in enumerate(previous)
+        if entry is not None and (index >= len(cells) or entry.source != cells[index].source)
+    ]
+    cell_mutates = [mutates(cell.names) for cell in cells]
+
+    changed = True
+    while changed:
+        changed = False
+        resets = stale + [
+            (index, cell_mutates[index] - cells[index].names.defs) for index in sorted(dirty)
+        ]
+        for before, names in resets:
+            for name in names:
+                definer = _definer(cells, name, before)
+                if definer is not None and definer not in dirty:
+                    dirty.add(definer)
+                    changed = True
+
+        dirty_names = set()
+        for index, cell in enumerate(cells):
+            if index in dirty:
+                dirty_names |= cell.names.defs | cell_mutates[index]
+            elif (cell.names.uses | cell_mutates[index]) & dirty_names:
+                dirty.add(index)
+                dirty_names |= cell.names.defs | cell_mutates[index]
+                changed = True
+    return sorted(dirty)
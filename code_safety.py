@@ -0,0 +1,181 @@
+"""
+Safety check for kids' code
+One pass over the syntax tree that finds imports, dunder and private access,
+forbidden names and attributes, and notes whether the code is deterministic
+"""
+
+import ast
+import string
+
+# Names and attributes whose results change from run to run
+NONDETERMINISTIC_NAMES = {'random', 'datetime'}
+NONDETERMINISTIC_ATTRIBUTES = {
+    'now', 'today', 'utcnow', 'random', 'randint', 'choice', 'choices',
+    'shuffle', 'sample', 'uniform',
+}
+
+# Built-ins that reach outside the sandbox (most are not even in the safe builtins)
+FORBIDDEN_NAMES = {
+    'open', 'file', 'exec', 'eval', 'compile', 'globals', 'locals', 'vars',
+    'input', 'raw_input', 'breakpoint', 'help', 'exit', 'quit', 'memoryview',
+}
+
+# Attributes that lead to the operating system, the interpreter or the disk
+FORBIDDEN_ATTRIBUTES = {
+    'os', 'sys', 'subprocess', 'builtins', 'system', 'popen', 'spawn', 'sleep',
+    'modules', 'io', 'f_globals', 'f_locals', 'f_back', 'gi_frame', 'cr_frame',
+    'tb_frame', 'Formatter', 'renderers',
+}
+
+# Attribute prefixes for reading and writing files (pd.read_csv, fig.write_html, ...)
+FORBIDDEN_ATTRIBUTE_PREFIXES = ('read_', 'write_', '_')
+
+# Exporters only ever return a value, so any use is fine (anything else
+# starting with to_, like to_csv or to_clipboard, is off limits)
+IN_MEMORY_EXPORTERS = {
+    'to_dict', 'to_list', 'to_numpy', 'to_frame', 'to_records', 'to_series',
+    'to_datetime', 'to_numeric', 'to_timedelta', 'to_period', 'to_timestamp',
+    'to_pydatetime', 'to_flat_index', 'to_plotly_json',
+}
+
+# Exporters that return text when called without a path or buffer; only
+# direct calls with keyword arguments (none of them a path) are allowed
+TEXT_EXPORTERS = {'to_string', 'to_json', 'to_html', 'to_latex', 'to_markdown', 'to_xml'}
+PATH_KEYWORDS = {'buf', 'path_or_buf', 'path', 'file', 'excel_writer'}
+
+# str.format walks attributes and indexes written in the string ('{0.__class__}'),
+# out of sight of the attribute check; only direct calls on a string in quotes
+# are allowed, and their fields must be plain names or positions
+FORMAT_METHODS = {'format', 'format_map'}
+
+# Built-ins that look up an attribute by name; only direct calls naming it in quotes are allowed
+ATTRIBUTE_FUNCTIONS = {'getattr', 'hasattr'}
+
+
+class SafetyChecker(ast.NodeVisitor):
+    """Collect every problem in a syntax tree in a single pass
+
+    shared_names are the modules and built-ins every run shares; setting or
+    deleting anything reached through them (math.pi = 3, pd.DataFrame.sum = f)
+    would change it for every later run too.
+    """
+
+    def __init__(self, shared_names=()):
+        self.shared_names = frozenset(shared_names)
+        self.problems = []
+        self.deterministic = True
+
+    def _problem(self, node, message):
+        self.problems.append((getattr(node, 'lineno', 0), message))
+
+    def visit_Import(self, node):
+        self._problem(node, "importing modules isn't allowed here (pd, px, math and random are ready to use)")
+        self.generic_visit(node)
+
+    visit_ImportFrom = visit_Import
+
+    def visit_Name(self, node):
+        if node.id.startswith('__'):
+            self._problem(node, f"`{node.id}` is off limits")
+        elif node.id in FORBIDDEN_NAMES:
+            self._problem(node, f"`{node.id}` isn't available here")
+        elif node.id in ATTRIBUTE_FUNCTIONS:
+            # Direct calls are checked (and skip this) in visit_Call; any other
+            # use, like `g = getattr`, would hide the attribute name from the check
+            self._problem(node, f"`{node.id}` can only be called directly, like {node.id}(thing, 'name')")
+        if node.id in NONDETERMINISTIC_NAMES:
+            self.deterministic = False
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node):
+        attr = node.attr
+        if not isinstance(node.ctx, ast.Load):
+            root = node.value
+            while isinstance(root, (ast.Attribute, ast.Subscript)):
+                root = root.value
+            if isinstance(root, ast.Name) and root.id in self.shared_names:
+                self._problem(node, f"`{root.id}` is shared, so its parts can't be changed")
+        if _forbidden_attribute(attr):
+            self._problem(node, f"`.{attr}` is off limits")
+        elif attr in TEXT_EXPORTERS:
+            # Direct calls are checked (and skip this) in visit_Call
+            self._problem(node, f"`.{attr}` can only be called directly, like df.{attr}()")
+        elif attr in FORMAT_METHODS:
+            self._problem(node, f"`.{attr}` can only be called directly on a string in quotes")
+        if attr in NONDETERMINISTIC_ATTRIBUTES:
+            self.deterministic = False
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr in TEXT_EXPORTERS | FORMAT_METHODS | {'show'}:
+            self._check_method_call(node, func)
+            return
+        if not (isinstance(func, ast.Name) and func.id in ATTRIBUTE_FUNCTIONS):
+            self.generic_visit(node)
+            return
+        # getattr(x, '__class__') would get around the attribute check, so the
+        # name must be written in quotes and pass the same check as `.name`
+        name = node.func.id
+        args = node.args
+        if len(args) < 2 or node.keywords or any(isinstance(arg, ast.Starred) for arg in args):
+            self._problem(node, f"`{name}` needs a thing and an attribute name, like {name}(thing, 'name')")
+        elif not (isinstance(args[1], ast.Constant) and isinstance(args[1].value, str)):
+            self._problem(node, f"`{name}` needs the attribute name written in quotes")
+        elif _forbidden_attribute(args[1].value) or args[1].value in TEXT_EXPORTERS | FORMAT_METHODS:
+            self._problem(node, f"`.{args[1].value}` is off limits")
+        for arg in args:
+            self.visit(arg)
+        for keyword in node.keywords:
+            self.visit(keyword)
+
+    def _check_method_call(self, node, func):
+        """Check a direct call of an exporter, a format method or show()"""
+        attr = func.attr
+        if attr in TEXT_EXPORTERS:
+            if node.args or any(keyword.arg is None or keyword.arg in PATH_KEYWORDS for keyword in node.keywords):
+                self._problem(node, f"`.{attr}()` can't save to a file here; call it without a path to get the text")
+        elif attr == 'show':
+            # fig.show(renderer='browser') would open a browser on the server
+            if node.args or node.keywords:
+                self._problem(node, "`.show()` doesn't take any settings here")
+        elif not (isinstance(func.value, ast.Constant) and isinstance(func.value.value, str)):
+            self._problem(node, f"`.{attr}` can only be called directly on a string in quotes")
+        else:
+            for field in _format_fields(func.value.value):
+                if field.startswith('_') or '.' in field or '[' in field:
+                    self._problem(node, f"`{{{field}}}` can only name a value to fill in, like {{0}} or {{name}}")
+        self.visit(func.value)
+        for arg in node.args:
+            self.visit(arg)
+        for keyword in node.keywords:
+            self.visit(keyword)
+
+
+def _forbidden_attribute(attr):
+    """Whether an attribute is off limits wherever it is used"""
+    if attr.startswith('to_') and attr not in IN_MEMORY_EXPORTERS | TEXT_EXPORTERS:
+        return True
+    return attr in FORBIDDEN_ATTRIBUTES or attr.startswith(FORBIDDEN_ATTRIBUTE_PREFIXES)
+
+
+def _format_fields(text):
+    """Every field name in a format string, including those nested in format specs"""
+    fields = []
+    try:
+        for _, field, spec, _ in string.Formatter().parse(text):
+            if field is not None:
+                fields.append(field)
+            if spec:
+                fields.extend(_format_fields(spec))
+    except ValueError:
+        # A broken format string fails when called, but only after the fields before the break
+        pass
+    return fields
+
+
+def check_tree(tree, shared_names=()):
+    """Check a parsed tree; returns the SafetyChecker holding problems and the deterministic flag"""
+    checker = SafetyChecker(shared_names)
+    checker.visit(tree)
+    return checker
@@ -0,0 +1,156 @@
+"""
+Lesson content packs
+A pack is a folder holding a manifest.json and one JSON file per lesson. The
+manifest lists the lessons in course order, each with its id, title,
+description, difficulty, exercise ids, the file holding the whole lesson
+(relative to the pack, so packs can share lesson files) and optionally its
+prerequisites (see lesson_graph) and the unit it belongs to in the lesson
+menu. Opening a pack reads
+only the manifest; a lesson's file is read the first time the lesson is asked
+for and then kept. Files that change on disk are read again on their next use,
+so new content shows up without restarting the server.
+"""
+
+import json
+import logging
+import os
+import threading
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content')
+
+logger = logging.getLogger(__name__)
+
+
+class ContentPackError(Exception):
+    """Raised when a pack's manifest or one of its lesson files cannot be read"""
+
+
+def pack_path(name):
+    """Folder of a pack shipped in content/"""
+    return os.path.join(CONTENT_DIR, name)
+
+
+def _modified(path):
+    """A file's modification time in nanoseconds, or None if it is missing"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as source:
+            return json.load(source)
+    except (OSError, ValueError) as e:
+        raise ContentPackError(f"Cannot read {path}: {e}") from e
+
+
+class ContentPack:
+    """The lessons of one pack, loaded lazily and reloaded when their files change
+
+    Safe to share between sessions. version goes up each time the manifest is
+    read again, so callers can tell when to rebuild anything derived from it.
+    If a changed file cannot be read (say, it is half saved), the last good
+    copy is kept until the file changes again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.manifest_path = os.path.join(path, 'manifest.json')
+        self.name = os.path.basename(path)
+        self.version = 0
+        self._lock = threading.Lock()
+        self._manifest_modified = None
+        self._entries = []
+        self._by_id = {}
+        # lesson id -> (file, modified, lesson)
+        self._loaded = {}
+        with self._lock:
+            self._read_manifest(_modified(self.manifest_path))
+
+    def _read_manifest(self, modified):
+        manifest = _read_json(self.manifest_path)
+        entries = manifest.get('lessons', [])
+        self.name = manifest.get('name', self.name)
+        self._entries = entries
+        self._by_id = {entry['id']: entry for entry in entries}
+        self._manifest_modified = modified
+        # Lessons that left the manifest are forgotten
+        self._loaded = {lesson_id: loaded for lesson_id, loaded in self._loaded.items() if lesson_id in self._by_id}
+        self.version += 1
+
+    def refresh(self):
+        """Read the manifest again if it changed on disk; returns whether it did"""
+        modified = _modified(self.manifest_path)
+        if modified == self._manifest_modified:
+            return False
+        with self._lock:
+            if modified == self._manifest_modified:
+                return False
+            try:
+                self._read_manifest(modified)
+            except (ContentPackError, KeyError) as e:
+                logger.warning(f"Keeping the last good manifest of {self.path}: {e}")
+                # Tried again once the file changes
+                self._manifest_modified = modified
+                return False
+            return True
+
+    def lessons(self):
+        """The manifest entries in course order (the lessons themselves are not read)"""
+        self.refresh()
+        return self._entries
+
+    def entry(self, lesson_id):
+        """The manifest entry of a lesson, or None"""
+        self.refresh()
+        return self._by_id.get(lesson_id)
+
+    def lesson_path(self, lesson_id):
+        """Path of the file holding a lesson, or None if unknown"""
+        entry = self.entry(lesson_id)
+        if entry is None:
+            return None
+        return os.path.normpath(os.path.join(self.path, entry['file']))
+
+    def lesson(self, lesson_id):
+        """The whole lesson, read on first use and again after its file changes; None if unknown"""
+        path = self.lesson_path(lesson_id)
+        if path is None:
+            return None
+        modified = _modified(path)
+        loaded = self._loaded.get(lesson_id)
+        if loaded is not None and loaded[:2] == (path, modified):
+            return loaded[2]
+
+        with self._lock:
+            loaded = self._loaded.get(lesson_id)
+            if loaded is not None and loaded[:2] == (path, modified):
+                return loaded[2]
+            try:
+                lesson = _read_json(path)
+            except ContentPackError as e:
+                if loaded is None:
+                    raise
+                logger.warning(f"Keeping the last good copy of lesson {lesson_id}: {e}")
+                self._loaded[lesson_id] = (path, modified, loaded[2])
+                return loaded[2]
+            # The manifest says which lesson this is
+            lesson = dict(lesson, id=lesson_id)
+            self._loaded[lesson_id] = (path, modified, lesson)
+            return lesson
+
+    def read_lesson(self, lesson_id):
+        """Read a lesson without keeping it (for building indexes over the whole pack); None if unknown"""
+        path = self.lesson_path(lesson_id)
+        if path is None:
+            return None
+        loaded = self._loaded.get(lesson_id)
+        if loaded is not None and loaded[:2] == (path, _modified(path)):
+            return loaded[2]
+        return dict(_read_json(path), id=lesson_id)
+
+    def loaded_count(self):
+        """How many lessons have been read so far"""
+        return len(self._loaded)
@@ -0,0 +1,113 @@
+"""
+Process-wide caches for kids' code
+Every student runs the same lesson demos and playground examples, so compiled
+code and deterministic results are worth keeping around between sessions
+"""
+
+import ast
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_source(code):
+    """Normalize line endings and trailing spaces so equivalent code shares a key"""
+    lines = code.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).rstrip()
+
+
+def source_key(code):
+    """Hash of the normalized source, used as the cache key"""
+    return hashlib.sha256(normalize_source(code).encode('utf-8')).hexdigest()
+
+
+class _Canonicalizer(ast.NodeTransformer):
+    """Drops statements that are only a constant (docstrings, stray strings)"""
+
+    def generic_visit(self, node):
+        node = super().generic_visit(node)
+        for field in ('body', 'orelse', 'finalbody'):
+            statements = getattr(node, field, None)
+            if isinstance(statements, list) and statements and isinstance(statements[0], ast.stmt):
+                kept = [
+                    statement for statement in statements
+                    if not (isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant))
+                ]
+                # A block cannot be empty
+                setattr(node, field, kept or [ast.Pass()])
+        return node
+
+
+def fingerprint(tree):
+    """Hash of parsed code with comments, spacing, quote style and no-op strings left out
+
+    Two programs with the same fingerprint run the same way, so they can share
+    one result. The tree is not changed.
+    """
+    canonical = _Canonicalizer().visit(copy.deepcopy(tree))
+    dump = ast.dump(canonical, annotate_fields=False, include_attributes=False)
+    return hashlib.sha256(dump.encode('utf-8')).hexdigest()
+
+
+class ExecutionCache:
+    """A thread-safe LRU cache with a time-to-live and hit/miss counters"""
+
+    def __init__(self, max_entries=512, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+        }
+
+    def get(self, key):
+        """Get a cached value, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries when full"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Get the cache size and counters"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hit_rate': (self._counters['hits'] / lookups) if lookups else 0.0,
+                **self._counters,
+            }
@@ -0,0 +1,987 @@
+"""
+Code executor shared by the Python Adventure apps
+Checks kids' code, runs it in the sandbox process pool and turns errors into
+kid-friendly messages
+"""
+
+import ast
+import contextlib
+import json
+import marshal
+import queue
+import threading
+import time
+import tracemalloc
+import types
+import random
+import math
+import uuid
+
+from sandbox import SandboxPool, SandboxError, SandboxTimeout
+from exec_cache import ExecutionCache, source_key, fingerprint
+from code_safety import check_tree
+from output_sink import OutputSink, capture_stdout
+from instruction_budget import InstructionBudget, InstructionBudgetExceeded, add_step_checks
+from run_metrics import empty_metrics, registry as metrics_registry
+from base_namespace import BaseNamespace, ReadOnlyModule, lazy_module
+from figure_tracking import FigureTracker, tracked_module
+from cell_deps import CellRun, split_cells, cell_names, dropped_names, plan_reruns
+from scheduler import FairScheduler, SchedulerBusy, priority_for
+from exercise_tests import case_name, case_passes, shown
+
+
+# Safe built-in functions
+SAFE_BUILTINS = {
+    'len': len,
+    'range': range,
+    'str': str,
+    'int': int,
+    'float': float,
+    'list': list,
+    'dict': dict,
+    'tuple': tuple,
+    'set': set,
+    'bool': bool,
+    'abs': abs,
+    'max': max,
+    'min': min,
+    'sum': sum,
+    'sorted': sorted,
+    'reversed': reversed,
+    'enumerate': enumerate,
+    'zip': zip,
+    'map': map,
+    'filter': filter,
+    'round': round,
+    'type': type,
+    'isinstance': isinstance,
+    'hasattr': hasattr,
+    'getattr': getattr,
+    'all': all,
+    'any': any,
+    'pow': pow,
+    'math': ReadOnlyModule(math),
+}
+
+# Made fresh for each run (and carried on through a session's cells), so
+# random.seed(42) in one run cannot make what other runs draw predictable
+PER_RUN_VALUES = {
+    'random': random.Random,
+}
+
+# Safe modules, imported the first time kids' code uses them; px and go are
+# stand-ins that register every figure they make
+SAFE_MODULES = {
+    'pd': lazy_module('pandas'),
+    'pandas': lazy_module('pandas'),
+    'px': tracked_module('plotly.express'),
+    'go': tracked_module('plotly.graph_objects'),
+    'plotly': lambda: ReadOnlyModule(types.SimpleNamespace(
+        __name__='plotly',
+        __doc__=None,
+        graph_objects=tracked_module('plotly.graph_objects')(),
+        express=tracked_module('plotly.express')()
+    )),
+    'datetime': lazy_module('datetime', 'datetime'),
+    'json': lazy_module('json'),
+    'statistics': lazy_module('statistics'),
+}
+
+
+def _sandbox_runner():
+    """Build the function each sandbox worker uses to run code"""
+    executor = CodeExecutor(use_sandbox=False)
+    # Workers forked from one server would otherwise all sample the same runs
+    _memory_sampler.seed()
+    # The cell namespace of the session this worker belongs to, by state id
+    cell_namespaces = {}
+    
+    def run(kind, payload, time_limit=None, emit=None):
+        # Code arrives already checked and compiled by the parent. A worker runs
+        # one job at a time, so it can also catch library output (e.g.
+        # DataFrame.info()) by redirecting sys.stdout, and measure peak memory
+        if kind == 'cells':
+            state_id, reset, cells = payload
+            if reset:
+                cell_namespaces.clear()
+                cell_namespaces[state_id] = {}
+            elif state_id not in cell_namespaces:
+                # A fresh worker: the parent has to run every cell again
+                return {'stale': True}
+            return executor._run_cells_in_process(
+                cell_namespaces[state_id],
+                [(index, marshal.loads(code_bytes)) for index, code_bytes in cells],
+                redirect_stdout=True,
+                time_limit=time_limit
+            )
+        if kind == 'tests':
+            code_bytes, cases = payload
+            return executor._run_tests_in_process(
+                marshal.loads(code_bytes), cases, redirect_stdout=True, time_limit=time_limit
+            )
+        return executor._execute_in_process(
+            marshal.loads(payload),
+            redirect_stdout=True,
+            emit=emit,
+            time_limit=time_limit,
+            measure_memory=_memory_sampler.random() < executor.memory_sample_rate
+        )
+    return run
+
+
+# Kept apart from the random module kids' code can seed
+_memory_sampler = random.Random()
+
+
+def _make_print(buffer):
+    """Build a print() that writes to one execution's output buffer
+
+    Its closure holds only the buffer's write method: no module, no real
+    print, nothing a format string or attribute could walk from to the server.
+    """
+    write = buffer.write
+
+    def print(*values, sep=' ', end='\n', file=None, flush=False):
+        if sep is None:
+            sep = ' '
+        if end is None:
+            end = '\n'
+        if not isinstance(sep, str) or not isinstance(end, str):
+            raise TypeError("sep and end must be None or a string")
+        write(sep.join(map(str, values)) + end)
+
+    return print
+
+
+def _stdout_to(sink, whole_process):
+    """Capture sys.stdout writes into sink: the whole process's in a sandbox
+    worker, only the running thread's when running in the app's process"""
+    if whole_process:
+        return contextlib.redirect_stdout(sink)
+    return capture_stdout(sink)
+
+
+class _OutputStreamer:
+    """Batch printed text into chunks and pass them on at most every interval seconds"""
+    
+    def __init__(self, emit, interval=0.1, max_chars=100_000):
+        self.emit = emit
+        self.interval = interval
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_size = 0
+        self._sent = 0
+        self._last_emit = 0
+        self._timer = None
+    
+    def write(self, text):
+        with self._lock:
+            # Past max_chars the final result's head and tail take over
+            if self._sent + self._pending_size >= self.max_chars:
+                return
+            self._pending.append(text)
+            self._pending_size += len(text)
+            wait = self.interval - (time.monotonic() - self._last_emit)
+            if wait <= 0 or self._pending_size >= 8192:
+                self._send()
+            elif self._timer is None:
+                # Send whatever is waiting even if the code goes quiet
+                self._timer = threading.Timer(wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def flush(self):
+        with self._lock:
+            self._send()
+    
+    def close(self):
+        """Send the last chunk and stop the timer"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._send()
+    
+    def _send(self):
+        self._timer = None
+        if self._pending:
+            chunk = ''.join(self._pending)
+            self._pending = []
+            self._pending_size = 0
+            self._sent += len(chunk)
+            self._last_emit = time.monotonic()
+            self.emit(chunk)
+
+
+class _Flight:
+    """One run of a program that identical requests arriving meanwhile wait for"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class CellSession:
+    """The cells one Playground session has run, and where their names live
+    
+    In sandbox mode the namespace lives in a worker kept for this session;
+    otherwise it is a dict here. Get one from CodeExecutor.new_cell_session().
+    """
+    
+    def __init__(self):
+        self.cells = []
+        self.state_id = None
+        self.namespace = {}
+        self.sandbox = None
+        self.lock = threading.Lock()
+    
+    def reset(self):
+        """Forget every cell; the next run starts from an empty namespace"""
+        self.cells = []
+        self.state_id = uuid.uuid4().hex
+        self.namespace = {}
+    
+    def close(self):
+        """Stop the worker holding this session's namespace"""
+        if self.sandbox is not None:
+            self.sandbox.close()
+            self.sandbox = None
+        self.reset()
+
+
+class CodeExecutor:
+    # One pool of worker processes is shared by every session in the server
+    _pool = None
+    _pool_lock = threading.Lock()
+    pool_options = {}
+    
+    # Fair-share scheduler in front of the pool, shared the same way
+    _scheduler = None
+    scheduler_options = {}
+    
+    # OutputSink caps (max_chars, max_lines, max_spill_chars)
+    output_limits = {}
+    
+    # Steps (loop rounds and function calls) kids' code may take before it is
+    # stopped (None for no limit). A backstop for runaway loops, set well above
+    # what lesson code needs; slow loops are caught by step_time_share below
+    instruction_budget = 20_000_000
+    
+    # Share of the run timeout after which the step checks stop code that is
+    # still going. Rounds that print are slow enough that an endless loop would
+    # hit the timeout (and lose its output) long before the step budget
+    step_time_share = 0.6
+    
+    # Share of sandbox runs whose peak memory is measured with tracemalloc,
+    # which makes allocation-heavy code (like Plotly) several times slower
+    memory_sample_rate = 0.1
+    
+    # Names every run can use; runs only add print() and the step checks on top
+    base_namespace = BaseNamespace(SAFE_BUILTINS, lazy=SAFE_MODULES, per_run=PER_RUN_VALUES)
+    
+    # Safety verdicts with compiled code, and results of deterministic code,
+    # shared by every session
+    _code_cache = ExecutionCache(max_entries=256)
+    _result_cache = ExecutionCache(max_entries=512, ttl=3600)
+    
+    # Deterministic programs running right now, by fingerprint, so a class
+    # sending in the same answer at once costs one run
+    _flights = {}
+    _flights_lock = threading.Lock()
+    
+    def __init__(self, use_sandbox=True, session_id=None):
+        # use_sandbox=False runs code in this process (used inside the workers)
+        self.use_sandbox = use_sandbox
+        # Sandbox runs are scheduled and charged per session; passing session_id
+        # to a run instead lets one executor serve every session
+        self.session_id = session_id or uuid.uuid4().hex
+    
+    @classmethod
+    def configure_pool(cls, **options):
+        """Set SandboxPool options (min_size, max_size, max_runs_per_worker, ...) before the pool starts"""
+        with cls._pool_lock:
+            if cls._pool is not None:
+                raise RuntimeError("The sandbox pool is already running")
+            cls.pool_options = options
+    
+    @classmethod
+    def get_pool(cls):
+        """Get the shared sandbox pool, starting it on first use"""
+        with cls._pool_lock:
+            if cls._pool is None:
+                cls._pool = SandboxPool(_sandbox_runner, **cls.pool_options)
+            return cls._pool
+    
+    @classmethod
+    def configure_scheduler(cls, **options):
+        """Set FairScheduler options (window, cpu_quota, max_wait, max_queue) before it starts"""
+        with cls._pool_lock:
+            if cls._scheduler is not None:
+                raise RuntimeError("The scheduler is already running")
+            cls.scheduler_options = options
+    
+    @classmethod
+    def get_scheduler(cls):
+        """Get the shared scheduler, with one slot per sandbox worker"""
+        pool = cls.get_pool()
+        with cls._pool_lock:
+            if cls._scheduler is None:
+                cls._scheduler = FairScheduler(pool.max_size, **cls.scheduler_options)
+                metrics_registry.register_gauge(
+                    'queue_depth', "Runs waiting for a free run slot", cls._scheduler.queue_depth
+                )
+            return cls._scheduler
+    
+    @classmethod
+    def get_scheduler_stats(cls):
+        """Get scheduler queue depth and counters, or None if it has not started"""
+        with cls._pool_lock:
+            scheduler = cls._scheduler
+        return scheduler.stats() if scheduler is not None else None
+    
+    @classmethod
+    def get_pool_stats(cls):
+        """Get sandbox pool stats, or None if the pool has not started"""
+        with cls._pool_lock:
+            pool = cls._pool
+        return pool.stats() if pool is not None else None
+    
+    @classmethod
+    def get_metrics(cls):
+        """Get the process-wide run metrics (dump with .to_prometheus(), .snapshot() or .dump(path))"""
+        return metrics_registry
+    
+    @classmethod
+    def get_cache_stats(cls):
+        """Get hit/miss counters for the result and compiled-code caches"""
+        return {
+            'results': cls._result_cache.stats(),
+            'compiled': cls._code_cache.stats(),
+        }
+    
+    def execute_code(self, code, timeout=5, label=None, session_id=None):
+        """Execute Python code safely and return results
+        
+        The result's 'metrics' block holds timings, peak memory, output size and
+        figure count; label (a lesson or exercise id) groups its histograms.
+        session_id (default: the executor's) is who the run is charged to.
+        Deterministic programs with the same fingerprint (the same code up to
+        comments, spacing and quote style) share one run and its result; the
+        result's 'deterministic' flag says whether the code was one.
+        """
+        started = time.perf_counter()
+        key, prepared, result, metrics = self._check_before_run(code)
+        if result is not None:
+            return self._finish(result, metrics, label, started, prepared)
+        
+        flight = None
+        if prepared['deterministic']:
+            with self._flights_lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+            if not leader:
+                # The same program is already running: wait and share its result
+                flight.done.wait()
+                if flight.result is not None:
+                    metrics.update(flight.result.get('metrics', {}), cached=True)
+                    return self._finish(dict(flight.result, plots=list(flight.result['plots']), metrics={}), metrics, label, started, prepared)
+                flight = None
+        
+        result = None
+        try:
+            result = self._run_fresh(key, prepared, metrics, timeout, label, session_id)
+        finally:
+            if flight is not None:
+                # A busy result belongs to the session that got it
+                flight.result = result if result is not None and not result.get('busy') else None
+                with self._flights_lock:
+                    del self._flights[key]
+                flight.done.set()
+        return self._finish(result, metrics, label, started, prepared)
+    
+    def _run_fresh(self, key, prepared, metrics, timeout, label, session_id):
+        """Run prepared code here or in the sandbox, keeping the result if it can be reused"""
+        if not self.use_sandbox:
+            result = self._execute_in_process(prepared['code'], time_limit=self._time_limit(timeout))
+            self._remember_result(key, prepared, result)
+            return result
+        
+        try:
+            with self._scheduled(label, metrics, session_id) as ticket:
+                result = self.get_pool().run(
+                    'code', marshal.dumps(prepared['code']), self._time_limit(timeout), timeout=timeout
+                )
+                ticket.charge(result.get('metrics', {}).get('cpu_seconds'))
+        except SchedulerBusy as e:
+            metrics['busy'] = True
+            return self._busy_result(e)
+        except SandboxError as e:
+            return self._sandbox_failure(e, timeout)
+        
+        self._remember_result(key, prepared, result)
+        return result
+    
+    def stream_code(self, code, timeout=5, label=None, session_id=None):
+        """Execute Python code and yield its output while it runs
+        
+        Yields ('output', text) chunks as the code prints, then a single
+        ('result', result) with the same dict execute_code returns.
+        """
+        started = time.perf_counter()
+        key, prepared, result, metrics = self._check_before_run(code)
+        if result is not None:
+            if result['output']:
+                yield 'output', result['output']
+            yield 'result', self._finish(result, metrics, label, started, prepared)
+            return
+        
+        with contextlib.ExitStack() as scheduled:
+            if self.use_sandbox:
+                try:
+                    ticket = scheduled.enter_context(self._scheduled(label, metrics, session_id))
+                except SchedulerBusy as e:
+                    yield 'result', self._finish(self._busy_result(e), dict(metrics, busy=True), label, started, prepared)
+                    return
+                messages = self.get_pool().stream(
+                    'code', marshal.dumps(prepared['code']), self._time_limit(timeout), timeout=timeout
+                )
+            else:
+                ticket = None
+                messages = self._stream_in_thread(prepared['code'], self._time_limit(timeout))
+            
+            streamed = []
+            try:
+                for kind, value in messages:
+                    if kind == 'chunk':
+                        streamed.append(value)
+                        yield 'output', value
+                    else:
+                        result = value
+            except SandboxError as e:
+                # Keep what was printed before the code was stopped
+                result = dict(self._sandbox_failure(e, timeout), output=''.join(streamed))
+                yield 'result', self._finish(result, metrics, label, started, prepared)
+                return
+            if ticket is not None:
+                ticket.charge(result.get('metrics', {}).get('cpu_seconds'))
+        
+        self._remember_result(key, prepared, result)
+        yield 'result', self._finish(result, metrics, label, started, prepared)
+    
+    def run_tests(self, code, test_cases, timeout=5, label=None, session_id=None):
+        """Run code once and check it against an exercise's test cases
+        
+        The code is compiled once and every case is checked in the same
+        sandbox run (see exercise_tests for what a case can check). Returns
+        the execute_code result with 'tests', one entry per case with 'name',
+        'passed', 'error', 'seconds' and what it saw ('output', 'value').
+        """
+        started = time.perf_counter()
+        key, prepared, result, metrics = self._check_before_run(code, test_cases)
+        if result is not None:
+            return self._finish(dict(result, tests=result.get('tests') or self._unrun_tests(test_cases)), metrics, label, started, prepared)
+        
+        if not self.use_sandbox:
+            result = self._run_tests_in_process(prepared['code'], test_cases, time_limit=self._time_limit(timeout))
+        else:
+            try:
+                with self._scheduled(label, metrics, session_id) as ticket:
+                    result = self.get_pool().run(
+                        'tests', (marshal.dumps(prepared['code']), test_cases), self._time_limit(timeout), timeout=timeout
+                    )
+                    ticket.charge(result.get('metrics', {}).get('cpu_seconds'))
+            except SchedulerBusy as e:
+                result = dict(self._busy_result(e), tests=self._unrun_tests(test_cases))
+                return self._finish(result, dict(metrics, busy=True), label, started, prepared)
+            except SandboxError as e:
+                result = dict(self._sandbox_failure(e, timeout), tests=self._unrun_tests(test_cases))
+                return self._finish(result, metrics, label, started, prepared)
+        
+        self._remember_result(key, prepared, result)
+        return self._finish(result, metrics, label, started, prepared)
+    
+    def _unrun_tests(self, test_cases):
+        """Failed entries for test cases that never got to run"""
+        return [
+            {'name': case_name(case, index), 'passed': False, 'error': None, 'seconds': 0.0, 'output': '', 'value': None}
+            for index, case in enumerate(test_cases)
+        ]
+    
+    def _run_tests_in_process(self, compiled_code, test_cases, redirect_stdout=False, time_limit=None):
+        """Run compiled code, then check each test case against what it left behind"""
+        namespace = {}
+        result = self._execute_in_process(
+            compiled_code, redirect_stdout=redirect_stdout, namespace=namespace, time_limit=time_limit
+        )
+        if not result['success']:
+            result['tests'] = self._unrun_tests(test_cases)
+            return result
+        result['tests'] = [
+            self._run_test_case(case, index, compiled_code, namespace, result['output'], redirect_stdout, time_limit)
+            for index, case in enumerate(test_cases)
+        ]
+        return result
+    
+    def _run_test_case(self, case, index, compiled_code, namespace, program_output, redirect_stdout, time_limit):
+        """Check one test case: call a function the code defined, or look at a variable or the output"""
+        started = time.perf_counter()
+        value = None
+        output = program_output
+        error = None
+        
+        if 'call' in case:
+            function = namespace.get(case['call'])
+            if not callable(function):
+                error = f"Your code needs a function called {case['call']}()"
+            else:
+                # The call gets its own output buffer and step budget
+                sink = OutputSink(**self.output_limits)
+                budget = InstructionBudget(compiled_code, self.instruction_budget, time_limit)
+                namespace.update({'print': _make_print(sink), **budget.namespace()})
+                try:
+                    with contextlib.ExitStack() as guards:
+                        guards.enter_context(_stdout_to(sink, redirect_stdout))
+                        guards.enter_context(budget)
+                        guards.enter_context(FigureTracker())
+                        value = function(*case.get('args', []), **case.get('kwargs', {}))
+                except InstructionBudgetExceeded:
+                    error = self._budget_error()
+                except Exception as e:
+                    error = self._make_error_kid_friendly(f"{type(e).__name__}: {str(e)}")
+                finally:
+                    sink.close()
+                output = sink.getvalue()
+        elif 'variable' in case:
+            if case['variable'] not in namespace:
+                error = f"Your code needs a variable called {case['variable']}"
+            else:
+                value = namespace[case['variable']]
+        
+        return {
+            'name': case_name(case, index),
+            'passed': error is None and case_passes(case, value, output),
+            'error': error,
+            'seconds': time.perf_counter() - started,
+            'output': shown(output),
+            'value': shown(value) if value is not None else None,
+        }
+    
+    def new_cell_session(self):
+        """Start an empty CellSession for run_cells()"""
+        return CellSession()
+    
+    def run_cells(self, code, session, timeout=5, label=None, session_id=None):
+        """Run code split into `# %%` cells, running again only the cells an edit affects
+        
+        Names live on between calls in the session's namespace, so editing the
+        last cell does not redo the setup above it. Returns a result with one
+        entry per cell in 'cells'; each has 'ran' (False when the result of an
+        earlier run was reused) and 'skipped' (True when an earlier cell failed).
+        timeout covers all the cells that run.
+        """
+        started = time.perf_counter()
+        metrics = empty_metrics()
+        sources = split_cells(code)
+        
+        with session.lock:
+            prepared_cells = []
+            for source in sources:
+                key, prepared, fresh = self._prepare(source)
+                if fresh:
+                    metrics['parse_seconds'] += prepared['parse_seconds']
+                    metrics['compile_seconds'] += prepared['compile_seconds']
+                prepared_cells.append(prepared)
+            # Cells from the first one that does not compile on are not run
+            runnable = next((index for index, prepared in enumerate(prepared_cells) if prepared['error']), len(sources))
+            cells = [CellRun(source, cell_names(source), None) for source in sources]
+            
+            previous = session.cells
+            try:
+                with contextlib.ExitStack() as scheduled:
+                    if self.use_sandbox:
+                        ticket = scheduled.enter_context(self._scheduled(label, metrics, session_id))
+                    ran = self._run_planned_cells(session, cells, prepared_cells, runnable, timeout)
+                    if self.use_sandbox:
+                        ticket.charge(sum(result.get('metrics', {}).get('cpu_seconds', 0) for result in ran.values()))
+                results, session.cells = self._collect_cells(session.cells, cells, prepared_cells, ran)
+            except SchedulerBusy as e:
+                # Nothing ran; the namespace is as the last run left it
+                first = min((index for index in plan_reruns(previous, cells) if index < runnable), default=0)
+                ran = {}
+                results, _ = self._collect_cells(previous, cells, prepared_cells, {first: self._busy_result(e)})
+                metrics['busy'] = True
+            except SandboxError as e:
+                # The worker and the namespace in it are gone; the failure
+                # shows on the first cell that was to run
+                first = min((index for index in plan_reruns(previous, cells) if index < runnable), default=0)
+                ran = {first: self._sandbox_failure(e, timeout)}
+                results, _ = self._collect_cells(previous, cells, prepared_cells, ran)
+                session.reset()
+        
+        for result in ran.values():
+            for name in ('exec_seconds', 'cpu_seconds', 'output_bytes', 'figures'):
+                metrics[name] += result.get('metrics', {}).get(name, 0)
+        success = all(result['success'] for result in results)
+        return self._finish({'success': success, 'cells': results}, metrics, label, started)
+    
+    def _run_planned_cells(self, session, cells, prepared_cells, runnable, timeout):
+        """Run the cells the plan says need it; returns {index: result} for the ones that ran"""
+        if session.state_id is None:
+            session.reset()
+        if dropped_names(session.cells, cells):
+            # Names only removed cells defined would linger: rebuild from the first cell
+            session.cells = []
+        for attempt in range(2):
+            plan = [index for index in plan_reruns(session.cells, cells) if index < runnable]
+            jobs = [(index, prepared_cells[index]['code']) for index in plan]
+            reset = not session.cells
+            if not jobs:
+                return {}
+            if not self.use_sandbox:
+                if reset:
+                    session.namespace = {}
+                return dict(self._run_cells_in_process(session.namespace, jobs, time_limit=self._time_limit(timeout)))
+            
+            if session.sandbox is None:
+                session.sandbox = self.get_pool().session()
+            payload = (session.state_id, reset, [(index, marshal.dumps(code)) for index, code in jobs])
+            response = session.sandbox.run('cells', payload, self._time_limit(timeout), timeout=timeout)
+            if isinstance(response, dict) and response.get('stale'):
+                # The session got a new worker (the old one was stopped): start over
+                session.cells = []
+                continue
+            return dict(response)
+        raise SandboxError("The cell namespace could not be rebuilt")
+    
+    def _collect_cells(self, previous_cells, cells, prepared_cells, ran):
+        """Per-cell results for the UI, and the CellRun entries to remember for the next run"""
+        results = []
+        entries = []
+        failed = False
+        for index, cell in enumerate(cells):
+            previous = previous_cells[index] if index < len(previous_cells) else None
+            if failed:
+                # Not run because an earlier cell failed; whatever it did before is still in the namespace
+                results.append({'success': False, 'output': '', 'error': None, 'plots': [], 'ran': False, 'skipped': True})
+                entries.append(previous._replace(source=None) if previous is not None else None)
+            elif prepared_cells[index]['error']:
+                results.append({'success': False, 'output': '', 'error': prepared_cells[index]['error'],
+                                'plots': [], 'ran': False, 'skipped': False})
+                entries.append(previous._replace(source=None) if previous is not None else None)
+                failed = True
+            elif index in ran:
+                result = dict(ran[index], ran=True, skipped=False)
+                results.append(result)
+                entries.append(cell._replace(source=cell.source if result['success'] else None, result=result))
+                failed = not result['success']
+            else:
+                results.append(dict(previous.result, ran=False))
+                entries.append(previous)
+        return results, entries
+    
+    def _stream_in_thread(self, compiled_code, time_limit=None):
+        """Run code on a background thread, yielding its messages from a queue"""
+        messages = queue.Queue()
+        
+        def run():
+            result = self._execute_in_process(
+                compiled_code, emit=lambda text: messages.put(('chunk', text)), time_limit=time_limit
+            )
+            messages.put(('result', result))
+        
+        threading.Thread(target=run, daemon=True).start()
+        while True:
+            kind, value = messages.get()
+            yield kind, value
+            if kind == 'result':
+                return
+    
+    @contextlib.contextmanager
+    def _scheduled(self, label, metrics, session_id=None):
+        """Hold a scheduler slot for one sandbox run, noting the wait in metrics"""
+        with self.get_scheduler().slot(session_id or self.session_id, priority_for(label)) as ticket:
+            metrics['queue_wait_seconds'] = ticket.wait_seconds
+            yield ticket
+    
+    def _busy_result(self, busy):
+        """Result for a run the scheduler turned away"""
+        return {
+            'success': False,
+            'output': '',
+            'error': str(busy),
+            'plots': [],
+            'busy': True,
+            'retry_after': busy.retry_after
+        }
+    
+    def _sandbox_failure(self, error, timeout):
+        """Result for code the sandbox had to stop or could not run"""
+        if isinstance(error, SandboxTimeout):
+            message = f"Your code ran for more than {timeout} seconds, so we stopped it. ⏰ Check for a loop that never ends!"
+        else:
+            message = self._make_error_kid_friendly(str(error))
+        return {
+            'success': False,
+            'output': '',
+            'error': message,
+            'plots': []
+        }
+    
+    def _check_before_run(self, code, test_cases=None):
+        """Prepare code and return (key, prepared, result, metrics)
+        
+        key is the code's fingerprint (with the test cases, if any), which
+        results are cached under; result is set when no run is needed; metrics
+        holds the parse and compile times of this request (zero when the
+        compiled code was cached).
+        """
+        metrics = empty_metrics()
+        if not code.strip():
+            return None, None, {
+                'success': True,
+                'output': '',
+                'error': None,
+                'plots': []
+            }, metrics
+        
+        key, prepared, fresh = self._prepare(code)
+        if fresh:
+            metrics['parse_seconds'] = prepared['parse_seconds']
+            metrics['compile_seconds'] = prepared['compile_seconds']
+        if prepared['error']:
+            return key, prepared, {
+                'success': False,
+                'output': '',
+                'error': prepared['error'],
+                'plots': []
+            }, metrics
+        
+        # Results are shared by every program with the same fingerprint
+        key = prepared['fingerprint']
+        if test_cases is not None:
+            key = f"{key}:{source_key(json.dumps(test_cases, sort_keys=True))}"
+        cached = self._result_cache.get(key)
+        if cached is not None:
+            # Timings stay those of the run that was cached
+            metrics.update(cached['metrics'], cached=True)
+            return key, prepared, dict(cached, plots=list(cached['plots']), metrics={}), metrics
+        return key, prepared, None, metrics
+    
+    def _finish(self, result, metrics, label, started, prepared=None):
+        """Attach the full metrics block and the deterministic flag to a result and add it to the process-wide histograms"""
+        metrics = dict(metrics, **result.get('metrics', {}))
+        metrics['total_seconds'] = time.perf_counter() - started
+        result = dict(result, metrics=metrics, deterministic=prepared['deterministic'] if prepared else True)
+        metrics_registry.observe(label, metrics, result['success'])
+        return result
+    
+    def inspect(self, code):
+        """(fingerprint, deterministic) of some code, from the same cached check runs use
+
+        fingerprint is None for code that does not parse.
+        """
+        _, prepared, _ = self._prepare(code)
+        return prepared['fingerprint'], prepared['deterministic']
+    
+    def _prepare(self, code):
+        """Parse, check and compile code once; the verdict is cached by source hash
+        
+        Returns (key, prepared, fresh), where fresh means it was compiled just now.
+        """
+        key = source_key(code)
+        prepared = self._code_cache.get(key)
+        if prepared is not None:
+            return key, prepared, False
+        prepared = self._check_and_compile(code)
+        self._code_cache.put(key, prepared)
+        return key, prepared, True
+    
+    def _check_and_compile(self, code):
+        """Parse the code a single time, check the tree and compile that same tree
+        
+        Also records how long parsing (with the safety check) and compiling took.
+        """
+        prepared = {'code': None, 'error': None, 'deterministic': True, 'fingerprint': None,
+                    'parse_seconds': 0.0, 'compile_seconds': 0.0}
+        started = time.perf_counter()
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError) as e:
+            prepared['error'] = f"Syntax Error: {str(e)}"
+            prepared['parse_seconds'] = time.perf_counter() - started
+            return prepared
+        
+        checker = check_tree(tree, shared_names=self.base_namespace.names())
+        prepared['fingerprint'] = fingerprint(tree)
+        prepared['parse_seconds'] = time.perf_counter() - started
+        if checker.problems:
+            line, reason = checker.problems[0]
+            prepared['error'] = f"This code tries to do something that's not allowed here. Try simpler code without importing new modules or reading files.\n\nLine {line}: {reason}"
+            return prepared
+        
+        started = time.perf_counter()
+        try:
+            compiled_code = compile(add_step_checks(tree), '<user_code>', 'exec')
+        except (SyntaxError, ValueError) as e:
+            prepared['error'] = f"Syntax Error: {str(e)}"
+            return prepared
+        finally:
+            prepared['compile_seconds'] = time.perf_counter() - started
+        return dict(prepared, code=compiled_code, deterministic=checker.deterministic)
+    
+    def _remember_result(self, key, prepared, result):
+        """Cache the result if running the code again would give the same answer"""
+        # Truncated output points at a spill file that gets cleaned up later
+        if prepared['deterministic'] and not result.get('truncated'):
+            self._result_cache.put(key, dict(result, plots=list(result['plots'])))
+    
+    def _execute_in_process(self, compiled_code, redirect_stdout=False, emit=None, measure_memory=False,
+                            namespace=None, defer_plots=False, time_limit=None):
+        """Run compiled code in this process and capture its output and plots
+        
+        Output is captured through a print() bound to this run's buffer rather
+        than by swapping sys.stdout, so many threads can run code at once. The
+        buffer is bounded; long output is cut down to its head and tail. If emit
+        is given, printed text is also passed to it in throttled chunks. Plots
+        come back as compact JSON of the figures px and go made (or, with
+        defer_plots, as the FigureTracker, to be serialized later).
+        tracemalloc's peak is process-wide, so measure_memory is only set where
+        one run happens at a time (the sandbox workers).
+        namespace, if given, is a dict the code runs in and leaves its names
+        in, so later runs (the next cells) can use them. time_limit is the
+        seconds after which the step checks stop the code (see _time_limit).
+        """
+        streamer = _OutputStreamer(emit) if emit is not None else None
+        stdout_capture = OutputSink(**self.output_limits, listener=streamer.write if streamer else None)
+        
+        # A copy of the shared base namespace is the run's built-ins; the run's
+        # own globals only hold its print() and the step-check functions
+        budget = InstructionBudget(compiled_code, self.instruction_budget, time_limit)
+        safe_globals = {
+            '__builtins__': self.base_namespace.prepare(
+                compiled_code, previous=namespace.get('__builtins__') if namespace is not None else None
+            ),
+            'print': _make_print(stdout_capture),
+            **budget.namespace()
+        }
+        if namespace is not None:
+            namespace.update(safe_globals)
+            safe_globals = namespace
+        
+        figures = FigureTracker()
+        
+        if measure_memory:
+            tracemalloc.start()
+        exec_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        
+        try:
+            # Create a local namespace (cells share one namespace for both)
+            local_namespace = {} if namespace is None else namespace
+            
+            # Execute the code, stopping it if it runs too many steps and
+            # collecting every figure px and go make
+            with contextlib.ExitStack() as guards:
+                guards.enter_context(_stdout_to(stdout_capture, redirect_stdout))
+                guards.enter_context(budget)
+                guards.enter_context(figures)
+                exec(compiled_code, safe_globals, local_namespace)
+            
+            # Serialize the figures once, here, as compact JSON
+            plots_created = figures if defer_plots else figures.to_json()
+            
+            output = stdout_capture.getvalue()
+            
+            result = {
+                'success': True,
+                'output': output,
+                'error': None,
+                'plots': plots_created,
+                **stdout_capture.summary()
+            }
+                
+        except InstructionBudgetExceeded:
+            result = {
+                'success': False,
+                'output': stdout_capture.getvalue(),
+                'error': self._budget_error(),
+                'plots': [],
+                **stdout_capture.summary()
+            }
+        except Exception as e:
+            error_message = f"{type(e).__name__}: {str(e)}"
+            # Provide kid-friendly error messages
+            error_message = self._make_error_kid_friendly(error_message)
+            
+            result = {
+                'success': False,
+                'output': stdout_capture.getvalue(),
+                'error': error_message,
+                'plots': [],
+                **stdout_capture.summary()
+            }
+        finally:
+            stdout_capture.close()
+            if streamer is not None:
+                streamer.close()
+            peak_memory = tracemalloc.get_traced_memory()[1] if measure_memory else None
+            if measure_memory:
+                tracemalloc.stop()
+        
+        result['metrics'] = {
+            'exec_seconds': time.perf_counter() - exec_started,
+            'cpu_seconds': time.thread_time() - cpu_started,
+            'peak_memory_bytes': peak_memory,
+            'output_bytes': stdout_capture.total_bytes,
+            'figures': len(figures.figures) if result['success'] else 0,
+        }
+        return result
+    
+    def _run_cells_in_process(self, namespace, cells, redirect_stdout=False, time_limit=None):
+        """Run (index, compiled code) cells one after another in namespace
+        
+        Stops at the first cell that fails. Returns a list of (index, result).
+        Figures are serialized after the last cell, so changes later cells
+        make to them (fig.update_layout(...)) show up.
+        """
+        results = []
+        for index, compiled_code in cells:
+            result = self._execute_in_process(
+                compiled_code, redirect_stdout=redirect_stdout, namespace=namespace, defer_plots=True,
+                time_limit=time_limit
+            )
+            results.append((index, result))
+            if not result['success']:
+                break
+        for index, result in results:
+            if isinstance(result['plots'], FigureTracker):
+                result['plots'] = result['plots'].to_json()
+        return results
+    
+    def _time_limit(self, timeout):
+        """Seconds of running after which the step checks stop code with the given timeout"""
+        return timeout * self.step_time_share
+    
+    def _budget_error(self):
+        return "Your code took too many steps, so we stopped it. 🔁 Is there a loop that never ends? Make sure your while loop's condition becomes False at some point!"
+    
+    def _make_error_kid_friendly(self, error_message):
+        """Convert technical error messages to kid-friendly ones"""
+        friendly_messages = {
+            'NameError': "Oops! It looks like you're using a word that Python doesn't recognize. Make sure you've spelled everything correctly!",
+            'SyntaxError': "There's a small mistake in how you wrote your code. Check for missing quotes, parentheses, or colons!",
+            'IndentationError': "Python is very picky about spacing! Make sure your code lines up properly.",
+            'TypeError': "You're trying to mix different types of data in a way that doesn't work. Check if you're using numbers and text correctly!",
+            'ValueError': "The value you're using isn't quite right for what you're trying to do. Double-check your numbers and text!",
+            'ZeroDivisionError': "Whoops! You can't divide by zero - even computers can't do that math trick!",
+            'IndexError': "You're trying to access an item in a list that doesn't exist. Remember, lists start counting from 0!",
+            'KeyError': "That key isn't in your dictionary yet. Check the spelling or add it first!",
+        }
+        
+        for error_type, friendly_msg in friendly_messages.items():
+            if error_message.startswith(error_type):
+                return f"{friendly_msg}\n\nTechnical details: {error_message}"
+        
+        return f"Something went wrong, but don't worry - debugging is part of learning! 🐛\n\nTechnical details: {error_message}"
@@ -0,0 +1,76 @@
+"""
+Test cases for exercises
+An exercise can carry hidden test cases besides its expected_output. Each
+case checks one of:
+- the program's output:  {"expected_output": "Blast off"}
+- a variable it made:    {"variable": "total_cost", "expected_value": 7.25, "tolerance": 0.001}
+- a function it defined: {"call": "square", "args": [3], "expected_output": "9"}
+                     or  {"call": "add", "args": [2, 3], "expected_return": 5}
+Every case of a submission is checked in one sandbox run (see
+CodeExecutor.run_tests), after the code is compiled once.
+"""
+
+import math
+
+# Numbers closer than this count as equal unless a case sets its own tolerance
+DEFAULT_TOLERANCE = 1e-9
+
+# Longest shown value or output in a case result
+MAX_SHOWN_CHARS = 500
+
+
+def output_matches(expected_output, output):
+    """Whether a run's output shows what an exercise expects (case and outer spaces ignored)"""
+    expected_output = expected_output.strip().lower()
+    return bool(expected_output) and expected_output in output.strip().lower()
+
+
+def values_match(expected, value, tolerance=DEFAULT_TOLERANCE):
+    """Compare a value with the expected one, allowing float rounding (lists and dicts item by item)"""
+    if isinstance(expected, bool) or isinstance(value, bool):
+        return expected is value
+    if isinstance(expected, (int, float)) and isinstance(value, (int, float)):
+        return math.isclose(expected, value, rel_tol=0, abs_tol=tolerance)
+    if isinstance(expected, (list, tuple)) and isinstance(value, (list, tuple)):
+        return len(expected) == len(value) and all(
+            values_match(item, other, tolerance) for item, other in zip(expected, value)
+        )
+    if isinstance(expected, dict) and isinstance(value, dict):
+        return expected.keys() == value.keys() and all(
+            values_match(expected[key], value[key], tolerance) for key in expected
+        )
+    try:
+        return bool(expected == value)
+    except Exception:
+        # e.g. comparing with a DataFrame
+        return False
+
+
+def case_name(case, index):
+    """What to call a test case when showing it"""
+    if case.get('name'):
+        return case['name']
+    if 'call' in case:
+        args = ', '.join(repr(arg) for arg in case.get('args', []))
+        return f"{case['call']}({args})"
+    if 'variable' in case:
+        return f"the value of {case['variable']}"
+    return f"Test {index + 1}"
+
+
+def case_passes(case, value, output):
+    """Whether a case's checks hold for the value it looked at and the output it saw"""
+    tolerance = case.get('tolerance', DEFAULT_TOLERANCE)
+    if 'expected_return' in case and not values_match(case['expected_return'], value, tolerance):
+        return False
+    if 'expected_value' in case and not values_match(case['expected_value'], value, tolerance):
+        return False
+    if 'expected_output' in case and not output_matches(case['expected_output'], output):
+        return False
+    return True
+
+
+def shown(value):
+    """A short text form of a value for a case result"""
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= MAX_SHOWN_CHARS else text[:MAX_SHOWN_CHARS] + '…'
@@ -0,0 +1,359 @@
+"""
+Figure size limits for kids' charts
+Big line and scatter traces are switched to WebGL and cut down to a bounded
+number of points (LTTB-style), big histograms are binned here and sent as bar
+traces of their counts, big bar traces are cut to their first bars with a
+note on the chart, and numeric arrays are sent as Plotly's base64 typed
+arrays, so a chart of range(100000) stays small. Pies and boxes are sent
+whole: they summarize every point they are given
+"""
+
+import base64
+import re
+
+import numpy as np
+
+# Scatter traces with more points than this are drawn with WebGL
+WEBGL_THRESHOLD = 1_000
+# Points kept per trace, and per figure across all its traces
+MAX_TRACE_POINTS = 5_000
+MAX_FIGURE_POINTS = 20_000
+# Traces kept per figure
+MAX_TRACES = 50
+# Numeric arrays at least this long are sent as typed arrays
+TYPED_ARRAY_MIN_LENGTH = 16
+
+# The only trace types cut down to fewer points
+LINE_TYPES = {'scatter', 'scattergl'}
+
+# Histogram settings that have no meaning on the bar trace that replaces it
+HISTOGRAM_ONLY_KEYS = {
+    'histfunc', 'histnorm', 'nbinsx', 'nbinsy', 'xbins', 'ybins', 'autobinx',
+    'autobiny', 'bingroup', 'cumulative',
+}
+
+_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# NumPy dtypes and the typed array names plotly.js understands
+_TYPED_ARRAY_CODES = {
+    np.dtype('int8'): 'i1', np.dtype('uint8'): 'u1',
+    np.dtype('int16'): 'i2', np.dtype('uint16'): 'u2',
+    np.dtype('int32'): 'i4', np.dtype('uint32'): 'u4',
+    np.dtype('float32'): 'f4', np.dtype('float64'): 'f8',
+}
+_TYPED_ARRAY_DTYPES = {code: dtype for dtype, code in _TYPED_ARRAY_CODES.items()}
+
+
+def _decode(value):
+    """A trace array as a NumPy array (typed array specs included), or None if it is not an array"""
+    if isinstance(value, np.ndarray):
+        return value
+    if isinstance(value, (list, tuple)):
+        return np.asarray(value, dtype=object) if value and isinstance(value[0], (list, tuple, dict)) else np.asarray(value)
+    if isinstance(value, dict) and 'bdata' in value and value.get('dtype') in _TYPED_ARRAY_DTYPES:
+        return np.frombuffer(base64.b64decode(value['bdata']), dtype=_TYPED_ARRAY_DTYPES[value['dtype']])
+    return None
+
+
+def _point_count(trace):
+    for name in ('x', 'y', 'values', 'z'):
+        array = _decode(trace.get(name))
+        if array is not None and array.ndim == 1:
+            return len(array)
+    return 0
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points to keep when shrinking a series to threshold points
+
+    Largest-Triangle-Three-Buckets, vectorized: each bucket keeps the point
+    making the largest triangle with the means of the buckets on either side
+    (classic LTTB uses the previously picked point, which cannot be vectorized).
+    The first and last points are always kept.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = np.nan_to_num(y.astype(np.float64))
+    buckets = threshold - 2
+    edges = np.linspace(1, n - 1, buckets + 1).astype(np.int64)
+    counts = np.diff(edges)
+
+    inner_x, inner_y = x[1:n - 1], y[1:n - 1]
+    starts = edges[:-1] - 1
+    mean_x = np.add.reduceat(inner_x, starts) / counts
+    mean_y = np.add.reduceat(inner_y, starts) / counts
+
+    # Anchors: the previous and next bucket means (the end points at the edges)
+    prev_x = np.concatenate(([x[0]], mean_x[:-1]))
+    prev_y = np.concatenate(([y[0]], mean_y[:-1]))
+    next_x = np.concatenate((mean_x[1:], [x[-1]]))
+    next_y = np.concatenate((mean_y[1:], [y[-1]]))
+
+    bucket_of = np.repeat(np.arange(buckets), counts)
+    area = np.abs(
+        (prev_x[bucket_of] - next_x[bucket_of]) * (inner_y - prev_y[bucket_of])
+        - (prev_x[bucket_of] - inner_x) * (next_y[bucket_of] - prev_y[bucket_of])
+    )
+    # The first point of each bucket with the largest area
+    order = np.lexsort((-area, bucket_of))
+    firsts = order[np.r_[0, np.flatnonzero(np.diff(bucket_of[order])) + 1]]
+    return np.concatenate(([0], np.sort(firsts) + 1, [n - 1]))
+
+
+def _numeric_positions(array, n):
+    """Numbers to measure distances along an axis (the index when values are not numeric)"""
+    if array is None or len(array) != n:
+        return np.arange(n, dtype=np.float64)
+    if array.dtype.kind in 'iuf':
+        return array
+    if array.dtype.kind == 'M':
+        return array.astype('datetime64[ns]').astype(np.int64)
+    return np.arange(n, dtype=np.float64)
+
+
+def _take(value, indices, n):
+    """Keep only the chosen points of every per-point array in a trace (nested ones too)"""
+    if isinstance(value, dict) and 'bdata' not in value:
+        return {key: _take(item, indices, n) for key, item in value.items()}
+    array = _decode(value)
+    if array is None or array.ndim != 1 or len(array) != n:
+        return value
+    return array[indices]
+
+
+def _encode(value):
+    """Numeric arrays become typed arrays; other arrays become lists"""
+    if isinstance(value, dict) and 'bdata' not in value:
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and len(value) >= TYPED_ARRAY_MIN_LENGTH:
+        array = _decode(value)
+        return _encode(array) if array.dtype.kind in 'iuf' else value
+    if isinstance(value, np.ndarray):
+        if value.ndim == 1 and value.dtype.kind in 'iuf' and len(value) >= TYPED_ARRAY_MIN_LENGTH:
+            if value.dtype not in _TYPED_ARRAY_CODES:
+                # plotly.js has no 64-bit integers
+                fits = value.dtype.kind != 'f' and len(value) and np.abs(value).max() < 2 ** 31
+                value = value.astype(np.int32 if fits else np.float64)
+            data = np.ascontiguousarray(value, dtype=value.dtype.newbyteorder('<'))
+            return {'dtype': _TYPED_ARRAY_CODES[value.dtype], 'bdata': base64.b64encode(data.tobytes()).decode('ascii')}
+        return value.tolist()
+    return value
+
+
+def shrink_trace(trace, max_points):
+    """Switch a big scatter trace to WebGL and cut it down to at most max_points points
+
+    Other trace types come back unchanged.
+    """
+    n = _point_count(trace)
+    kind = trace.get('type', 'scatter')
+    if kind == 'scatter' and n > WEBGL_THRESHOLD:
+        trace['type'] = kind = 'scattergl'
+    if kind not in LINE_TYPES or n <= max_points:
+        return trace
+
+    x = _decode(trace.get('x'))
+    y = _decode(trace.get('y'))
+    if y is not None and len(y) == n and y.dtype.kind in 'iufb':
+        indices = lttb_indices(_numeric_positions(x, n), y, max_points)
+    else:
+        indices = np.linspace(0, n - 1, max_points).astype(np.int64)
+    return {key: _take(value, indices, n) for key, value in trace.items()}
+
+
+def _drop_per_point(value, n):
+    """Leave out every per-point array in a trace (nested ones too)"""
+    if isinstance(value, dict) and 'bdata' not in value:
+        return {key: _drop_per_point(item, n) for key, item in value.items() if not _is_per_point(item, n)}
+    return value
+
+
+def _is_per_point(value, n):
+    array = _decode(value)
+    return array is not None and array.ndim == 1 and len(array) == n
+
+
+def _bin_axis(trace):
+    """(axis the histogram bins along, axis its heights go up), like plotly.js picks them"""
+    if trace.get('orientation') == 'h' or (trace.get('x') is None and trace.get('y') is not None):
+        return 'y', 'x'
+    return 'x', 'y'
+
+
+def _positions(array):
+    """(numbers to bin, 'number' or 'date'), or (None, 'category') for values binned one bar per value"""
+    kind = array.dtype.kind
+    if kind in 'iuf':
+        return array.astype(np.float64), 'number'
+    if kind in 'UO' and len(array) and isinstance(array[0], str) and _ISO_DATE.match(array[0]):
+        try:
+            array = array.astype('datetime64[ns]')
+        except ValueError:
+            return None, 'category'
+        kind = 'M'
+    if kind == 'M':
+        positions = array.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+        positions[np.isnat(array)] = np.nan
+        return positions, 'date'
+    return None, 'category'
+
+
+def _bin_edges(values, trace, axis, max_bins):
+    """Bin edges for the numbers of a histogram (group), from its xbins/nbinsx settings if it has them"""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return np.array([0.0, 1.0])
+    bins = trace.get(f'{axis}bins') or {}
+    if all(isinstance(bins.get(key), (int, float)) for key in ('start', 'end', 'size')) and bins['size'] > 0:
+        edges = np.arange(bins['start'], bins['end'] + bins['size'], bins['size'], dtype=np.float64)
+        if 2 <= len(edges) <= max_bins + 1:
+            return edges
+    low, high = values.min(), values.max()
+    if not trace.get(f'nbins{axis}') and np.all(values == np.round(values)) and high - low < max_bins:
+        # Whole numbers get a bin each, centered on the number
+        return np.arange(low - 0.5, high + 1)
+    edges = np.histogram_bin_edges(values, bins=trace.get(f'nbins{axis}') or 'auto')
+    if len(edges) - 1 > max_bins:
+        edges = np.histogram_bin_edges(values, bins=max_bins)
+    return edges
+
+
+def _aggregate(trace, bins, weights, count):
+    """Bar heights for each bin from the histogram's histfunc, histnorm and cumulative settings"""
+    function = trace.get('histfunc', 'count')
+    if weights is None or function == 'count':
+        heights = np.bincount(bins, minlength=count).astype(np.float64)
+    elif function in ('min', 'max'):
+        heights = np.full(count, np.nan)
+        (np.fmin if function == 'min' else np.fmax).at(heights, bins, weights)
+    else:
+        heights = np.bincount(bins, weights=weights, minlength=count)
+        if function == 'avg':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                heights = heights / np.bincount(bins, minlength=count)
+    return heights
+
+
+def _normalize(trace, heights, widths):
+    norm = trace.get('histnorm') or ''
+    if norm in ('percent', 'probability', 'probability density'):
+        total = np.nansum(heights)
+        if total:
+            heights = heights / total
+    if norm == 'percent':
+        heights = heights * 100
+    if norm.endswith('density') and widths is not None:
+        heights = heights / widths
+    cumulative = trace.get('cumulative') or {}
+    if cumulative.get('enabled'):
+        heights = np.cumsum(heights[::-1])[::-1] if cumulative.get('direction') == 'decreasing' else np.cumsum(heights)
+    return heights
+
+
+def _bin_histograms(traces, max_bins):
+    """Histograms with their bins worked out here, as bar traces of the counts
+
+    Traces that plotly.js would bin together (same bingroup and axis) get the
+    same bins, so a histogram split by color still lines up. Numbers and dates
+    get at most max_bins bins; other values get a bar each.
+    """
+    groups = {}
+    for index, trace in enumerate(traces):
+        if trace.get('type') == 'histogram':
+            bin_axis, _ = _bin_axis(trace)
+            groups.setdefault((bin_axis, trace.get('bingroup'), trace.get(f'{bin_axis}axis')), []).append(index)
+
+    traces = list(traces)
+    for (bin_axis, _, _), indices in groups.items():
+        samples = [_decode(traces[index].get(bin_axis)) for index in indices]
+        if any(array is None or array.ndim != 1 for array in samples):
+            continue
+        if sum(len(array) for array in samples) <= max_bins:
+            continue
+        converted = [_positions(array) for array in samples]
+        kinds = {kind for _, kind in converted}
+        first = traces[indices[0]]
+
+        if kinds <= {'number'} or kinds <= {'date'}:
+            edges = _bin_edges(np.concatenate([positions for positions, _ in converted]), first, bin_axis, max_bins)
+            widths = np.diff(edges)
+            centers = edges[:-1] + widths / 2
+            labels = centers
+            if kinds == {'date'}:
+                labels = np.datetime_as_string(centers.astype(np.int64).astype('datetime64[ns]'), unit='ms')
+                widths = widths / 1e6  # plotly.js measures date bar widths in milliseconds
+            per_trace = []
+            for positions, _ in converted:
+                bins = np.searchsorted(edges, positions, side='right') - 1
+                bins[positions == edges[-1]] = len(edges) - 2
+                per_trace.append((bins, (bins >= 0) & (bins < len(edges) - 1) & ~np.isnan(positions)))
+            count = len(edges) - 1
+        else:
+            categories = {}
+            per_trace = []
+            for array in samples:
+                labels_of = array if array.dtype.kind == 'U' else array.astype(str)
+                values, firsts, inverse = np.unique(labels_of, return_index=True, return_inverse=True)
+                for value in values[np.argsort(firsts)]:
+                    categories.setdefault(value, len(categories))
+                mapping = np.array([categories[value] for value in values], dtype=np.int64)
+                per_trace.append((mapping[inverse.reshape(-1)], np.ones(len(array), dtype=bool)))
+            labels = np.array([str(value) for value in categories], dtype=object)
+            widths = None
+            count = len(categories)
+
+        for index, array, (bins, keep) in zip(indices, samples, per_trace):
+            trace = traces[index]
+            _, value_axis = _bin_axis(trace)
+            weights = _decode(trace.get(value_axis))
+            if weights is not None and (weights.ndim != 1 or len(weights) != len(array) or weights.dtype.kind not in 'iufb'):
+                weights = None
+            heights = _aggregate(trace, bins[keep], None if weights is None else weights[keep].astype(np.float64), count)
+            bar = _drop_per_point(
+                {key: value for key, value in trace.items() if key not in HISTOGRAM_ONLY_KEYS | {'x', 'y'}}, len(array)
+            )
+            bar.update({
+                'type': 'bar',
+                'orientation': 'h' if bin_axis == 'y' else 'v',
+                bin_axis: labels,
+                value_axis: _normalize(trace, heights, widths),
+            })
+            if widths is not None:
+                bar['width'] = widths
+            traces[index] = bar
+    return traces
+
+
+def _cap_bars(trace, max_bars):
+    """A bar trace cut down to its first max_bars bars, and how many it had"""
+    n = _point_count(trace)
+    if trace.get('type') != 'bar' or n <= max_bars:
+        return trace, n
+    indices = np.arange(max_bars)
+    return {key: _take(value, indices, n) for key, value in trace.items()}, n
+
+
+def shrink_figure(spec):
+    """Bound the size of a figure dict (as from fig.to_dict()) and encode its arrays"""
+    traces = spec.get('data', [])[:MAX_TRACES]
+    per_trace = max(min(MAX_TRACE_POINTS, MAX_FIGURE_POINTS // max(len(traces), 1)), 3)
+    traces = _bin_histograms(traces, per_trace)
+    data = []
+    cut_bars = 0
+    for trace in traces:
+        trace, bars = _cap_bars(trace, per_trace)
+        if bars > per_trace:
+            cut_bars = max(cut_bars, bars)
+        data.append(_encode(shrink_trace(trace, per_trace)))
+    spec['data'] = data
+    if cut_bars:
+        layout = spec.setdefault('layout', {})
+        layout['annotations'] = list(layout.get('annotations', ())) + [{
+            'text': f"Showing the first {per_trace:,} of {cut_bars:,} bars",
+            'xref': 'paper', 'yref': 'paper', 'x': 1, 'y': 1,
+            'xanchor': 'right', 'yanchor': 'bottom', 'showarrow': False,
+        }]
+    return spec
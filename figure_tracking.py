@@ -0,0 +1,115 @@
+"""
+Figure tracking for kids' code
+Kids' code gets stand-ins for px and go that register every figure they make
+with the run that is going on in this thread, so no namespace has to be
+searched for figures afterwards. Figures leave the run as compact JSON.
+"""
+
+import functools
+import importlib
+import threading
+
+from base_namespace import ReadOnlyModule
+
+# Charts beyond this many in one run are not shown
+MAX_FIGURES = 10
+
+_current = threading.local()
+
+
+def _track(figure):
+    tracker = getattr(_current, 'tracker', None)
+    if tracker is not None:
+        tracker.add(figure)
+
+
+def figure_json(figure):
+    """Compact, size-bounded JSON for a figure, ready for the UI (json.loads it for st.plotly_chart)"""
+    import plotly.io as pio
+    from figure_shrink import shrink_figure
+    return pio.to_json(shrink_figure(figure.to_dict()), validate=False, pretty=False, remove_uids=True)
+
+
+class FigureTracker:
+    """Collects the figures made during one run (use as a context manager around exec)"""
+
+    def __init__(self, max_figures=MAX_FIGURES):
+        self.max_figures = max_figures
+        self.figures = []
+        self._seen = set()
+
+    def add(self, figure):
+        if id(figure) in self._seen or len(self.figures) >= self.max_figures:
+            return
+        self._seen.add(id(figure))
+        self.figures.append(figure)
+
+    def to_json(self):
+        """The tracked figures, each serialized once as compact JSON"""
+        return [figure_json(figure) for figure in self.figures]
+
+    def __enter__(self):
+        self._previous = getattr(_current, 'tracker', None)
+        _current.tracker = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.tracker = self._previous
+        return False
+
+
+class _TrackedFigureType(type):
+    """Metaclass that lets isinstance(fig, go.Figure) accept figures px made too"""
+
+    def __instancecheck__(cls, instance):
+        return isinstance(instance, cls.__bases__[0])
+
+    def __subclasscheck__(cls, subclass):
+        return issubclass(subclass, cls.__bases__[0])
+
+
+def _tracked(value, figure_type):
+    """Wrap a module attribute so any figure it makes gets tracked"""
+    if isinstance(value, type):
+        if not issubclass(value, figure_type):
+            return value
+
+        def __init__(self, *args, **kwargs):
+            value.__init__(self, *args, **kwargs)
+            _track(self)
+
+        # A subclass keeps go.Figure(...) and isinstance() working as usual
+        return _TrackedFigureType(value.__name__, (value,), {'__init__': __init__, '__module__': value.__module__})
+
+    if not callable(value):
+        return value
+
+    @functools.wraps(value)
+    def make(*args, **kwargs):
+        result = value(*args, **kwargs)
+        if isinstance(result, figure_type):
+            _track(result)
+        return result
+    return make
+
+
+class TrackedModule(ReadOnlyModule):
+    """Read-only stand-in for a plotting module (px or go) that tracks the figures it makes"""
+
+    def _wrap(self, name, value):
+        from plotly.basedatatypes import BaseFigure
+        if name.startswith('_'):
+            return value
+        return _tracked(value, BaseFigure)
+
+
+_stand_ins = {}
+
+
+def tracked_module(name):
+    """Loader for the tracked stand-in of a plotting module (one per module)"""
+    def load():
+        if name not in _stand_ins:
+            _stand_ins[name] = TrackedModule(importlib.import_module(name))
+        return _stand_ins[name]
+    return load
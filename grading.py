@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Bulk grading of exercise submissions
+Grades a whole class's exported submissions in one pass: each JSONL line
+holds a student, an exercise_id and the code they wrote (or, for multiple
+choice exercises, their answer). Code runs across the sandbox process pool,
+and the results are written as JSONL or CSV. Answers that are the same
+program (see exec_cache.fingerprint) run once and share their verdict.
+
+Usage: python grading.py submissions.jsonl --out results.csv [--workers 4] [--timeout 5]
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import csv
+import json
+import sys
+import threading
+import time
+
+from content_packs import ContentPack, pack_path
+from executor import CodeExecutor
+from exercise_tests import output_matches
+from scheduler import PRIORITY_LESSON, PRIORITY_PLAYGROUND
+
+# The first pack that defines an exercise id wins
+LESSON_PACKS = ('adventure', 'starter')
+
+RESULT_FIELDS = ['student', 'exercise_id', 'passed', 'status', 'expected', 'output', 'error', 'tests', 'reused', 'seconds']
+
+# Longest output kept in a result row
+MAX_OUTPUT_CHARS = 2_000
+
+
+def load_exercises(packs=LESSON_PACKS):
+    """Every exercise in the lesson content packs by id"""
+    exercises = {}
+    for name in packs:
+        pack = ContentPack(pack_path(name))
+        for entry in pack.lessons():
+            for exercise in pack.lesson(entry['id']).get('exercises', []):
+                exercises.setdefault(exercise['id'], dict(exercise, lesson_id=entry['id']))
+    return exercises
+
+
+def read_submissions(path):
+    """Yield submissions from a JSONL file; lines that are not JSON objects come back as {'line': n}"""
+    with open(path, encoding='utf-8') as source:
+        for number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                submission = json.loads(line)
+            except ValueError:
+                submission = None
+            yield submission if isinstance(submission, dict) else {'line': number}
+
+
+class Grader:
+    """Grades submissions against the lesson exercises
+
+    Submissions are graded by `workers` threads, each waiting on one sandbox
+    run at a time, so the pool's worker processes stay busy. Results come back
+    in the order the submissions went in. Each distinct deterministic program
+    per exercise runs once; the other submissions of it reuse the verdict
+    (timeouts included), marked with reused=True.
+    """
+
+    def __init__(self, exercises=None, workers=None, timeout=5, use_sandbox=True):
+        self.exercises = load_exercises() if exercises is None else exercises
+        self.use_sandbox = use_sandbox
+        self.workers = workers or (2 * CodeExecutor.get_pool().max_size if use_sandbox else 1)
+        self.timeout = timeout
+        # Checks code with the same cached verdicts the runs use
+        self._inspector = CodeExecutor(use_sandbox=use_sandbox)
+        # (exercise id, fingerprint) -> Future of the verdict
+        self._verdicts = {}
+        self._verdicts_lock = threading.Lock()
+
+    def grade(self, submission):
+        """Grade one submission and return its result row"""
+        started = time.perf_counter()
+        student = submission.get('student')
+        exercise_id = submission.get('exercise_id')
+        row = {
+            'student': student,
+            'exercise_id': exercise_id,
+            'passed': False,
+            'status': 'invalid',
+            'expected': None,
+            'output': '',
+            'error': None,
+            'tests': None,
+            'reused': False,
+        }
+        exercise = self.exercises.get(exercise_id)
+
+        if 'line' in submission and len(submission) == 1:
+            row['error'] = f"Line {submission['line']} is not a JSON object"
+        elif exercise is None:
+            row['status'] = 'unknown_exercise'
+            row['error'] = f"No exercise with id {exercise_id!r}"
+        elif exercise['type'] == 'multiple_choice':
+            row['expected'] = exercise['correct_answer']
+            row['output'] = str(submission.get('answer', ''))
+            row['passed'] = row['output'] == exercise['correct_answer']
+            row['status'] = 'passed' if row['passed'] else 'wrong_answer'
+        elif not isinstance(submission.get('code'), str):
+            row['error'] = "The submission has no code"
+        else:
+            row.update(self._verdict(submission['code'], exercise, student))
+
+        row['seconds'] = round(time.perf_counter() - started, 4)
+        return row
+
+    def _verdict(self, code, exercise, student):
+        """The verdict for some code, run once per distinct deterministic program"""
+        code_fingerprint, deterministic = self._inspector.inspect(code)
+        if code_fingerprint is None or not deterministic:
+            return self._run(code, exercise, student)
+
+        key = (exercise['id'], code_fingerprint)
+        with self._verdicts_lock:
+            verdict = self._verdicts.get(key)
+            leader = verdict is None
+            if leader:
+                verdict = self._verdicts[key] = concurrent.futures.Future()
+        if not leader:
+            return dict(verdict.result(), reused=True)
+
+        try:
+            result = self._run(code, exercise, student)
+        except BaseException as e:
+            verdict.set_exception(e)
+            raise
+        if result['status'] == 'busy':
+            # Let the next submission of this program try again
+            with self._verdicts_lock:
+                del self._verdicts[key]
+        verdict.set_result(result)
+        return result
+
+    def _run(self, code, exercise, student):
+        expected_output = exercise.get('expected_output', '')
+        test_cases = exercise.get('test_cases')
+        # Each student is scheduled as a session of their own
+        executor = CodeExecutor(use_sandbox=self.use_sandbox, session_id=f"grading/{student}")
+        label = f"grading/{exercise['id']}"
+        if test_cases:
+            result = executor.run_tests(code, test_cases, timeout=self.timeout, label=label)
+        else:
+            result = executor.execute_code(code, timeout=self.timeout, label=label)
+        output = result['output']
+        tests = None
+        if result['success'] and test_cases:
+            passed_tests = sum(test['passed'] for test in result['tests'])
+            tests = f"{passed_tests}/{len(test_cases)}"
+            passed = passed_tests == len(test_cases)
+            status = 'passed' if passed else 'failed_tests'
+        elif result['success']:
+            passed = output_matches(expected_output, output)
+            status = 'passed' if passed else 'wrong_output'
+        else:
+            passed = False
+            status = 'busy' if result.get('busy') else 'error'
+        return {
+            'passed': passed,
+            'status': status,
+            'expected': expected_output,
+            'output': output if len(output) <= MAX_OUTPUT_CHARS else output[:MAX_OUTPUT_CHARS] + '…',
+            'error': result['error'],
+            'tests': tests,
+        }
+
+    def distinct_programs(self):
+        """How many distinct deterministic programs have been graded"""
+        with self._verdicts_lock:
+            return len(self._verdicts)
+
+    def grade_all(self, submissions):
+        """Grade many submissions, yielding result rows in input order
+
+        At most a few batches' worth of submissions are read ahead, so a huge
+        export never has to fit in memory.
+        """
+        window = self.workers * 4
+        with concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix='grader') as pool:
+            pending = collections.deque()
+            for submission in submissions:
+                pending.append(pool.submit(self.grade, submission))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+
+def write_results(rows, path):
+    """Write result rows to path (CSV for .csv, JSONL otherwise) and return a count per status"""
+    counts = collections.Counter()
+    with open(path, 'w', encoding='utf-8', newline='') as out:
+        writer = csv.DictWriter(out, fieldnames=RESULT_FIELDS) if path.endswith('.csv') else None
+        if writer is not None:
+            writer.writeheader()
+        for row in rows:
+            counts[row['status']] += 1
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                out.write(json.dumps(row, ensure_ascii=False) + '\n')
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('submissions', help="JSONL file with one {student, exercise_id, code} object per line")
+    parser.add_argument('--out', required=True, help="where to write the results (.csv or .jsonl)")
+    parser.add_argument('--workers', type=int, help="sandbox worker processes (default: one per CPU)")
+    parser.add_argument('--timeout', type=float, default=5, help="seconds each submission may run")
+    args = parser.parse_args()
+
+    if args.workers:
+        CodeExecutor.configure_pool(min_size=args.workers, max_size=args.workers)
+    # A batch job has the pool to itself: no CPU quota, and runs may queue for a while
+    CodeExecutor.configure_scheduler(cpu_quota=None, max_wait={PRIORITY_LESSON: 3600, PRIORITY_PLAYGROUND: 3600}, max_queue=10_000)
+
+    started = time.perf_counter()
+    grader = Grader(timeout=args.timeout)
+    counts = write_results(grader.grade_all(read_submissions(args.submissions)), args.out)
+    elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    print(f"Graded {total:,} submissions in {elapsed:.1f} s ({total / elapsed * 60 if elapsed else 0:,.0f} per minute)")
+    print(f"  {grader.distinct_programs():,} distinct programs ran once each; their copies reused the verdict")
+    for status, count in sorted(counts.items()):
+        print(f"  {status:<16} {count:,}")
+    print(f"Results written to {args.out}")
+    CodeExecutor.get_pool().shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
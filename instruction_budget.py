@@ -0,0 +1,203 @@
+"""
+Cheap in-process step limit for kids' code
+Counts the steps kids' code takes (loop rounds and function calls) and stops it
+once it goes over a budget, or has run for too long, so an endless while loop
+ends with a friendly message (and keeps its output) instead of a timeout. Uses sys.monitoring (Python 3.12+) on the user's
+code objects only. Older Pythons get step checks compiled into the code, since
+sys.settrace made typical snippets 5-10x slower.
+"""
+
+import ast
+import functools
+import itertools
+import operator
+import sys
+import threading
+import time
+import types
+
+TOOL_NAME = 'python-adventure-budget'
+
+# Names the compiled-in step checks call; kids' code cannot use dunder names
+STEP_NAME = '__step__'
+STEPS_NAME = '__steps__'
+
+# Steps between clock checks when the budget has a time limit
+CLOCK_INTERVAL = 1000
+
+
+class InstructionBudgetExceeded(BaseException):
+    """Raised inside kids' code when it runs too many steps
+
+    A BaseException so a kid's `except Exception:` cannot swallow it.
+    """
+
+
+def _code_objects(code):
+    """A code object and every function, lambda and class body nested in it"""
+    yield code
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _code_objects(const)
+
+
+class _Exceeded:
+    """An iterator that raises InstructionBudgetExceeded on every next()
+
+    A generator would be finished after raising once, so code that caught the
+    error (a bare `except:`) could then loop on with its steps going uncounted.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        raise InstructionBudgetExceeded(self.limit)
+
+
+def _timed_steps(limit, max_seconds):
+    """Runs of steps, checking the clock between runs, that end in _Exceeded
+    once `limit` steps were taken or `max_seconds` have passed since the first"""
+    deadline = time.monotonic() + max_seconds
+    while limit > 0:
+        run = min(limit, CLOCK_INTERVAL)
+        yield itertools.repeat(None, run)
+        limit -= run
+        if time.monotonic() > deadline:
+            break
+    yield _Exceeded(limit)
+
+
+def _step_counter(limit, max_seconds=None):
+    """An iterator that gives `limit` steps and then raises InstructionBudgetExceeded on every step
+
+    Built from C iterators so taking a step costs about as much as a next() call.
+    With max_seconds it also stops early once that long has passed, which
+    catches loops whose rounds are slow (a print in every round) long before
+    they use up their steps.
+    """
+    if limit is None:
+        return itertools.repeat(None)
+    if max_seconds is None:
+        return itertools.chain(itertools.repeat(None, limit), _Exceeded(limit))
+    # The chain keeps calling the _Exceeded it ends on, so it raises on every later step too
+    return itertools.chain.from_iterable(_timed_steps(limit, max_seconds))
+
+
+# sys.monitoring path (Python 3.12+)
+
+_monitoring = getattr(sys, 'monitoring', None)
+_tool_id = None
+_state = threading.local()
+
+
+def _spend(*args):
+    """Count one step for this thread's running budget, if there is one"""
+    steps = getattr(_state, 'steps', None)
+    if steps is not None:
+        next(steps)
+
+
+if _monitoring is not None:
+    for candidate in (3, 4, 2, 1):
+        try:
+            _monitoring.use_tool_id(candidate, TOOL_NAME)
+        except ValueError:
+            continue
+        _tool_id = candidate
+        # Backward jumps are loop rounds, PY_START is a function call
+        _monitoring.register_callback(_tool_id, _monitoring.events.JUMP, _spend)
+        _monitoring.register_callback(_tool_id, _monitoring.events.PY_START, _spend)
+        break
+
+MONITORING = _tool_id is not None
+
+
+def _watch(code):
+    """Turn on events for the user's code objects only (library code stays untouched)"""
+    for nested in _code_objects(code):
+        _monitoring.set_local_events(_tool_id, nested, _monitoring.events.JUMP | _monitoring.events.PY_START)
+
+
+# Compiled-in step checks (older Pythons)
+
+class StepCheckInserter(ast.NodeTransformer):
+    """Add a step check to every loop round and function call
+
+    While loops and function bodies start with `__step__()`; for loops and
+    comprehensions iterate over `__steps__(iterable)`, which takes a step per item.
+    """
+
+    def _step(self, node):
+        call = ast.Expr(ast.Call(ast.Name(STEP_NAME, ast.Load()), [], []))
+        return ast.copy_location(call, node)
+
+    def _steps(self, iterable):
+        call = ast.Call(ast.Name(STEPS_NAME, ast.Load()), [iterable], [])
+        return ast.copy_location(call, iterable)
+
+    def visit_While(self, node):
+        self.generic_visit(node)
+        node.body.insert(0, self._step(node))
+        return node
+
+    def visit_For(self, node):
+        self.generic_visit(node)
+        node.iter = self._steps(node.iter)
+        return node
+
+    visit_AsyncFor = visit_For
+
+    def visit_FunctionDef(self, node):
+        self.generic_visit(node)
+        node.body.insert(0, self._step(node))
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_comprehension(self, node):
+        self.generic_visit(node)
+        node.iter = self._steps(node.iter)
+        return node
+
+
+def add_step_checks(tree):
+    """Add step checks to a parsed tree when sys.monitoring is not available"""
+    if MONITORING:
+        return tree
+    return ast.fix_missing_locations(StepCheckInserter().visit(tree))
+
+
+class InstructionBudget:
+    """Context manager that limits how many steps the given code may take
+
+    Its namespace() holds the names the compiled-in step checks call, and must
+    be added to the globals the code runs with. A limit of None counts nothing.
+    max_seconds, if given, also stops the code at its first step after that
+    long (counted from its first step).
+    """
+
+    def __init__(self, code, limit, max_seconds=None):
+        self.code = code
+        self.limit = limit
+        self._steps = _step_counter(limit, max_seconds)
+
+    def namespace(self):
+        first = operator.itemgetter(0)
+        return {
+            STEP_NAME: functools.partial(next, self._steps),
+            STEPS_NAME: lambda iterable: map(first, zip(iterable, self._steps)),
+        }
+
+    def __enter__(self):
+        if MONITORING and self.limit is not None:
+            _state.steps = self._steps
+            _watch(self.code)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _state.steps = None
+        return False
@@ -0,0 +1,51 @@
+"""
+Lesson build step
+Runs every interactive demo once when lesson content is loaded, so lesson pages
+render stored output instead of re-running the demos on every Streamlit rerun
+"""
+
+import time
+
+from exec_cache import source_key
+from scheduler import BUILD_SESSION_ID
+# Longest wait before trying a demo the server was too busy for once more
+MAX_RETRY_WAIT = 5
+
+
+def demo_key(code):
+    """Key used to look up the stored output of a demo"""
+    return source_key(code)
+
+
+def build_demo_outputs(lessons, executor):
+    """Run every interactive_demo in the lessons and return the stored outputs
+
+    Each entry holds the result (plots already JSON) and a 'deterministic' flag. Demos that
+    use random (or the clock) are flagged so pages only re-run them on request. A demo
+    the server is still too busy for after one retry keeps its busy result, flagged
+    the same way, so the page offers to run it again instead of running it on every
+    rerun.
+    """
+    outputs = {}
+    for lesson in lessons:
+        for section in lesson.get('content', []):
+            if section.get('type') != 'interactive_demo':
+                continue
+
+            code = section['code']
+            key = demo_key(code)
+            if key in outputs:
+                continue
+
+            label = f"lesson-{lesson.get('id')}/demo"
+            result = executor.execute_code(code, label=label, session_id=BUILD_SESSION_ID)
+            if result.get('busy'):
+                time.sleep(min(result.get('retry_after') or 0, MAX_RETRY_WAIT))
+                result = executor.execute_code(code, label=label, session_id=BUILD_SESSION_ID)
+
+            outputs[key] = {
+                'lesson_id': lesson.get('id'),
+                'result': result,
+                'deterministic': result['deterministic'] and not result.get('busy'),
+            }
+    return outputs
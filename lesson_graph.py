@@ -0,0 +1,80 @@
+"""
+Lesson prerequisites
+Each lesson in a pack's manifest may list the lessons that must be completed
+before it opens ("prerequisites": [3, 5]); a lesson without the field needs
+the lesson listed before it, and "prerequisites": [] makes it a starting
+point. Together they form a graph that lets a course branch into separate
+tracks and join up again.
+
+The graph is built once per manifest. Finding what a learner can open means
+walking it once; after that, completing a lesson only looks at the lessons
+that depend on it.
+"""
+
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LessonGraph:
+    """Prerequisites of the lessons in a manifest, in an order that respects them
+
+    order lists every lesson after all of its prerequisites, keeping the
+    manifest's order wherever the prerequisites allow. Unknown prerequisites
+    are ignored, and lessons caught in a prerequisite cycle can never open
+    (both are logged).
+    """
+
+    def __init__(self, entries):
+        ids = [entry['id'] for entry in entries]
+        known = set(ids)
+        self.prerequisites = {}
+        for position, entry in enumerate(entries):
+            default = [ids[position - 1]] if position else []
+            prerequisites = entry.get('prerequisites', default)
+            unknown = [lesson_id for lesson_id in prerequisites if lesson_id not in known]
+            if unknown:
+                logger.warning(f"Lesson {entry['id']} needs lessons that do not exist: {unknown}")
+            self.prerequisites[entry['id']] = tuple(lesson_id for lesson_id in dict.fromkeys(prerequisites) if lesson_id in known)
+
+        self.dependents = {lesson_id: [] for lesson_id in ids}
+        for lesson_id, prerequisites in self.prerequisites.items():
+            for prerequisite in prerequisites:
+                self.dependents[prerequisite].append(lesson_id)
+        self.roots = frozenset(lesson_id for lesson_id in ids if not self.prerequisites[lesson_id])
+        self.order, self.blocked = self._sort(ids)
+
+    def _sort(self, ids):
+        """Kahn's algorithm, taking the earliest lesson in the manifest whenever there is a choice"""
+        position = {lesson_id: index for index, lesson_id in enumerate(ids)}
+        waiting_on = {lesson_id: len(prerequisites) for lesson_id, prerequisites in self.prerequisites.items()}
+        ready = [position[lesson_id] for lesson_id in ids if not waiting_on[lesson_id]]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            lesson_id = ids[heapq.heappop(ready)]
+            order.append(lesson_id)
+            for dependent in self.dependents[lesson_id]:
+                waiting_on[dependent] -= 1
+                if not waiting_on[dependent]:
+                    heapq.heappush(ready, position[dependent])
+        # What is left waits on a cycle
+        blocked = [lesson_id for lesson_id in ids if waiting_on[lesson_id]]
+        if blocked:
+            logger.warning(f"Lessons {blocked} wait on a prerequisite cycle and cannot be opened")
+        return order + blocked, frozenset(blocked)
+
+    def unlocked(self, completed):
+        """IDs of the lessons whose prerequisites are all in the set of completed lesson IDs"""
+        return {
+            lesson_id for lesson_id in self.order
+            if lesson_id not in self.blocked and all(prerequisite in completed for prerequisite in self.prerequisites[lesson_id])
+        }
+
+    def newly_unlocked(self, lesson_id, completed):
+        """IDs of the lessons that completing lesson_id opens (completed already includes it)"""
+        return {
+            dependent for dependent in self.dependents.get(lesson_id, ())
+            if dependent not in self.blocked and all(prerequisite in completed for prerequisite in self.prerequisites[dependent])
+        }
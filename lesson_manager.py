@@ -0,0 +1,196 @@
+"""
+Lessons shared by the Python Adventure apps
+The LessonManager of each content pack and the code executor are built once
+per server with st.cache_resource and read by every session
+"""
+
+import threading
+
+import streamlit as st
+
+from executor import CodeExecutor
+from content_packs import ContentPack
+from lesson_build import build_demo_outputs, demo_key
+from lesson_graph import LessonGraph
+from lesson_search import load_search_index, search_index_is_current
+
+# Lessons per unit of the lesson menu when the manifest does not group them
+UNIT_SIZE = 10
+
+# ===== LESSON MANAGER CLASS =====
+@st.cache_resource
+def load_content_pack(path):
+    """Open a content pack once per server (it reloads changed files by itself)"""
+    return ContentPack(path)
+
+@st.cache_resource(show_spinner="Getting the lesson ready... 📚", max_entries=500)
+def load_demo_outputs(lesson):
+    """Run a lesson's demos once per server (and again if the lesson changes) and keep the results"""
+    return build_demo_outputs([lesson], get_code_executor())
+
+class LessonManager:
+    """The lessons of a content pack, shared by every session (see load_lesson_manager)"""
+    
+    def __init__(self, path):
+        self.pack = load_content_pack(path)
+        self.demo_outputs = {}
+        # lesson id -> the copy of the lesson whose demo outputs are in demo_outputs
+        self._demo_lessons = {}
+        self._lock = threading.Lock()
+        self._indexed_version = None
+        self._refresh_indexes()
+    
+    def _refresh_indexes(self):
+        """Build the indexes again if the pack's manifest changed"""
+        lessons = self.pack.lessons()
+        if self.pack.version == self._indexed_version:
+            return
+        with self._lock:
+            if self.pack.version != self._indexed_version:
+                self._build_indexes(lessons)
+                self._indexed_version = self.pack.version
+    
+    def _build_indexes(self, entries):
+        """Index the manifest once, so page functions never have to scan the lessons"""
+        self.graph = LessonGraph(entries)
+        by_id = {lesson['id']: lesson for lesson in entries}
+        # Course order puts every lesson after its prerequisites
+        ids = self.graph.order
+        self.lessons = [by_id[lesson_id] for lesson_id in ids]
+        self._by_id = by_id
+        self._numbers = {lesson_id: number for number, lesson_id in enumerate(ids, 1)}
+        self._previous = dict(zip(ids[1:], ids))
+        self._next = dict(zip(ids, ids[1:]))
+        # exercise id -> lesson id; the first lesson with an id wins
+        self._exercise_lessons = {}
+        for lesson in self.lessons:
+            for exercise_id in lesson.get('exercises', []):
+                self._exercise_lessons.setdefault(exercise_id, lesson['id'])
+        self._build_units()
+        # Loaded by the first search, so starting up never waits on reading every lesson
+        self.search_index = None
+    
+    def _build_units(self):
+        """Group the lessons for the lesson menu: by their manifest "unit", else UNIT_SIZE at a time"""
+        units = []
+        if any('unit' in lesson for lesson in self.lessons):
+            # Neighbouring lessons of the same unit form one group
+            for lesson in self.lessons:
+                title = lesson.get('unit', "More lessons")
+                if not units or units[-1][0] != title:
+                    units.append((title, []))
+                units[-1][1].append(lesson)
+        else:
+            for start in range(0, len(self.lessons), UNIT_SIZE):
+                group = self.lessons[start:start + UNIT_SIZE]
+                units.append((f"Lessons {start + 1}-{start + len(group)}", group))
+        self.units = units
+        self._unit_of = {lesson['id']: index for index, (_, group) in enumerate(units) for lesson in group}
+    
+    def get_all_lessons(self):
+        """Get the manifest entries of all lessons (id, title, description, difficulty)"""
+        self._refresh_indexes()
+        return self.lessons
+    
+    def get_lesson(self, lesson_id):
+        """Get a specific lesson by ID, reading it from the pack the first time"""
+        self._refresh_indexes()
+        if lesson_id not in self._by_id:
+            return None
+        lesson = self.pack.lesson(lesson_id)
+        if self._demo_lessons.get(lesson_id) is not lesson:
+            demo_outputs = load_demo_outputs(lesson)
+            with self._lock:
+                self.demo_outputs.update(demo_outputs)
+                self._demo_lessons[lesson_id] = lesson
+        return lesson
+    
+    def lesson_count(self):
+        """How many lessons there are"""
+        return len(self.lessons)
+    
+    def lesson_number(self, lesson_id):
+        """Position of a lesson in the course, counting from 1 (None if there is no such lesson)"""
+        return self._numbers.get(lesson_id)
+    
+    def get_exercise(self, exercise_id):
+        """Get (lesson, exercise) for an exercise ID, or (None, None)"""
+        lesson = self.get_lesson(self._exercise_lessons.get(exercise_id))
+        for exercise in (lesson or {}).get('exercises', []):
+            if exercise['id'] == exercise_id:
+                return lesson, exercise
+        return None, None
+    
+    def previous_lesson_id(self, lesson_id):
+        """ID of the lesson before this one, or None for the first lesson"""
+        return self._previous.get(lesson_id)
+    
+    def next_lesson_id(self, lesson_id):
+        """ID of the lesson after this one, or None for the last lesson"""
+        return self._next.get(lesson_id)
+    
+    def get_units(self):
+        """The lessons grouped into units, as (title, manifest entries) pairs in course order"""
+        self._refresh_indexes()
+        return self.units
+    
+    def unit_of(self, lesson_id):
+        """Position of a lesson's unit in get_units(), or None if there is no such lesson"""
+        return self._unit_of.get(lesson_id)
+    
+    def get_prerequisites(self, lesson_id):
+        """IDs of the lessons that must be completed before this one opens"""
+        return self.graph.prerequisites.get(lesson_id, ())
+    
+    def unlocked_lessons(self, completed_lessons):
+        """IDs of the lessons open to someone who completed the given set of lessons"""
+        self._refresh_indexes()
+        return self.graph.unlocked(completed_lessons)
+    
+    def newly_unlocked_lessons(self, lesson_id, completed_lessons):
+        """IDs of the lessons that completing lesson_id opens (completed_lessons includes it)"""
+        return self.graph.newly_unlocked(lesson_id, completed_lessons)
+    
+    @property
+    def version(self):
+        """Goes up whenever the lessons or their prerequisites change"""
+        return self._indexed_version
+    
+    def search(self, query, limit=10):
+        """Lessons matching a search query, best first, as (manifest entry, SearchResult) pairs"""
+        self._refresh_indexes()
+        return [
+            (self._by_id[result.lesson_id], result)
+            for result in self._current_search_index().search(query, limit)
+            if result.lesson_id in self._by_id
+        ]
+    
+    def _current_search_index(self):
+        """The search index, loaded again if a lesson file changed since (hot-reloaded edits)
+
+        Lesson edits leave the manifest alone, so this checks every lesson
+        file's size and time; a stat per lesson, done only for searches.
+        """
+        index = self.search_index
+        if index is not None and search_index_is_current(index, self.pack):
+            return index
+        with self._lock:
+            if self.search_index is index:
+                self.search_index = load_search_index(self.pack)
+            return self.search_index
+    
+    def get_demo_output(self, code):
+        """Get the prebuilt output of an interactive demo, or None if it was not built"""
+        return self.demo_outputs.get(demo_key(code))
+
+# ===== SHARED SERVICES =====
+# Built once per server and used by every session; only per-user state lives in st.session_state
+@st.cache_resource
+def load_lesson_manager(path):
+    """One LessonManager per content pack and server"""
+    return LessonManager(path)
+
+@st.cache_resource
+def get_code_executor():
+    """The code executor every session runs code with (each run passes its session_id)"""
+    return CodeExecutor()
@@ -0,0 +1,270 @@
+"""
+Lesson search
+An inverted index over each lesson's title, description, text, code examples
+and exercise questions and hints. A query word matches the same word, words
+it starts ("func" finds "function"), and words one typo away ("fucntion").
+Lessons matching more of the query's words rank first, then by score (how
+often and where the words appear, rarer words counting more).
+
+Reading every lesson to build the index would undo lazy loading, so the index
+is saved next to the pack's manifest as search_index.json and read from there
+while the pack's files are unchanged. The saved copy is not checked in, so the
+first search after a fresh deploy (or any lesson edit) reads every lesson.
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+import re
+from collections import defaultdict, namedtuple
+
+import numpy as np
+
+INDEX_FILE = 'search_index.json'
+INDEX_FORMAT = 1
+
+# How much a word counts in each part of a lesson
+FIELD_WEIGHTS = {'title': 5.0, 'description': 3.0, 'question': 2.0, 'text': 1.0, 'hint': 1.0, 'code': 0.5}
+
+# Words too common to tell lessons apart
+STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'be', 'can', 'it', 'its', 'of', 'our', 'that', 'the', 'this', 'to', 'we', 'with', 'you', 'your'
+})
+
+# Query words shorter than this only match whole words
+MIN_PREFIX_CHARS = 2
+# Query words shorter than this must be spelled right
+MIN_TYPO_CHARS = 4
+# Most words one query word may stand for as a prefix
+MAX_PREFIX_WORDS = 50
+
+# Score factors for the ways a query word can match
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.7
+TYPO_MATCH = 0.5
+
+SearchResult = namedtuple('SearchResult', ['lesson_id', 'score', 'matched_words'])
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9_]+")
+
+
+def _stem(word):
+    """Plural to singular, roughly ("loops" -> "loop", "dictionaries" -> "dictionary")"""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def words(text):
+    """The searchable words of some text (identifiers like total_cost also give total and cost)"""
+    found = []
+    for word in _WORD.findall(text.lower()):
+        parts = [word] + [part for part in word.split('_') if part and part != word] if '_' in word else [word]
+        found.extend(_stem(part) for part in parts if part not in STOP_WORDS)
+    return found
+
+
+def lesson_fields(lesson):
+    """Yield (field, text) for the searchable parts of a lesson"""
+    yield 'title', lesson.get('title', '')
+    yield 'description', lesson.get('description', '')
+    for section in lesson.get('content', []):
+        if section.get('type') == 'text':
+            yield 'text', section.get('content', '')
+        if section.get('code'):
+            yield 'code', section['code']
+        if section.get('explanation'):
+            yield 'text', section['explanation']
+    for exercise in lesson.get('exercises', []):
+        yield 'question', exercise.get('question', '')
+        if exercise.get('hint'):
+            yield 'hint', exercise['hint']
+        for option in exercise.get('options', []):
+            yield 'text', option
+
+
+def _deletes(word):
+    """The word with each one of its letters left out"""
+    return {word[:index] + word[index + 1:] for index in range(len(word))}
+
+
+def _one_edit_apart(first, second):
+    """Whether two different words are one insert, delete, change or swap of neighbours apart"""
+    if abs(len(first) - len(second)) > 1 or first == second:
+        return False
+    if len(first) > len(second):
+        first, second = second, first
+    start = 0
+    while start < len(first) and first[start] == second[start]:
+        start += 1
+    if len(first) < len(second):
+        return first[start:] == second[start + 1:]
+    if first[start + 1:] == second[start + 1:]:
+        return True
+    # Two neighbouring letters swapped
+    return (start + 1 < len(first) and first[start] == second[start + 1]
+            and first[start + 1] == second[start] and first[start + 2:] == second[start + 2:])
+
+
+class SearchIndex:
+    """Ranked word search over lessons
+
+    Lessons are numbered by position in lesson_ids. postings maps each word to
+    two arrays, the positions of the lessons it appears in and its weight in
+    each: the field weights of its appearances, damped so a word repeated in
+    code does not drown out one word in a title. Scoring runs on whole arrays,
+    so a word that appears in every one of thousands of lessons stays cheap.
+    """
+
+    def __init__(self, lesson_ids, postings):
+        self.lesson_ids = list(lesson_ids)
+        self.postings = postings
+        # The pack files it was built from (set by load_search_index)
+        self.signature = None
+        documents = len(self.lesson_ids)
+        # A word's weights times how rare it is
+        self._scores = {
+            word: (positions, weights * math.log(1 + documents / len(positions)))
+            for word, (positions, weights) in postings.items()
+        }
+        self._vocabulary = sorted(postings)
+        # A word with one letter left out -> the words it came from
+        self._typos = defaultdict(list)
+        for word in self._vocabulary:
+            if len(word) >= MIN_TYPO_CHARS - 1:
+                for variant in _deletes(word):
+                    self._typos[variant].append(word)
+
+    @classmethod
+    def build(cls, lessons):
+        """Index an iterable of lessons"""
+        lesson_ids = []
+        postings = defaultdict(lambda: ([], []))
+        for position, lesson in enumerate(lessons):
+            lesson_ids.append(lesson['id'])
+            counts = defaultdict(float)
+            for field, text in lesson_fields(lesson):
+                for word in words(text):
+                    counts[word] += FIELD_WEIGHTS[field]
+            for word, weight in counts.items():
+                positions, weights = postings[word]
+                positions.append(position)
+                weights.append(1 + math.log(weight) if weight >= 1 else weight)
+        return cls(lesson_ids, {
+            word: (np.array(positions, dtype=np.int32), np.array(weights, dtype=np.float32))
+            for word, (positions, weights) in postings.items()
+        })
+
+    def _matches(self, word):
+        """{indexed word: match factor} for one query word"""
+        matches = {}
+        if word in self.postings:
+            matches[word] = EXACT_MATCH
+        if len(word) >= MIN_PREFIX_CHARS:
+            start = bisect.bisect_left(self._vocabulary, word)
+            for indexed in self._vocabulary[start:start + MAX_PREFIX_WORDS + 1]:
+                if not indexed.startswith(word):
+                    break
+                matches.setdefault(indexed, PREFIX_MATCH)
+        if len(word) >= MIN_TYPO_CHARS and word not in self.postings:
+            candidates = set(self._typos.get(word, ()))
+            for variant in _deletes(word):
+                if variant in self.postings:
+                    candidates.add(variant)
+                candidates.update(self._typos.get(variant, ()))
+            for indexed in candidates:
+                if _one_edit_apart(word, indexed):
+                    matches.setdefault(indexed, TYPO_MATCH)
+        return matches
+
+    def search(self, query, limit=10):
+        """The best matching lessons for a query, best first, as SearchResults"""
+        count = len(self.lesson_ids)
+        scores = np.zeros(count)
+        matched_words = np.zeros(count, dtype=np.int32)
+        for word in dict.fromkeys(words(query)):
+            # Each query word counts once per lesson, through its best match there
+            best = np.zeros(count)
+            for indexed, factor in self._matches(word).items():
+                positions, word_scores = self._scores[indexed]
+                best[positions] = np.maximum(best[positions], word_scores * factor)
+            scores += best
+            matched_words += best > 0
+        found = np.flatnonzero(matched_words)
+        if len(found) > limit:
+            # More matched words first, then the higher score
+            rank = matched_words[found] * (scores.max() + 1) + scores[found]
+            found = found[np.argpartition(-rank, limit)[:limit]]
+        found = sorted(found, key=lambda position: (-matched_words[position], -scores[position], position))
+        return [
+            SearchResult(self.lesson_ids[position], round(float(scores[position]), 3), int(matched_words[position]))
+            for position in found
+        ]
+
+    def to_json(self):
+        return {
+            'format': INDEX_FORMAT,
+            'lesson_ids': self.lesson_ids,
+            'postings': {
+                word: [positions.tolist(), [round(weight, 4) for weight in weights.tolist()]]
+                for word, (positions, weights) in self.postings.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['lesson_ids'], {
+            word: (np.array(positions, dtype=np.int32), np.array(weights, dtype=np.float32))
+            for word, (positions, weights) in data['postings'].items()
+        })
+
+
+def _signature(pack):
+    """What the saved index was built from: the manifest and every lesson file, with their sizes and times"""
+    files = [pack.manifest_path] + [pack.lesson_path(entry['id']) for entry in pack.lessons()]
+    signature = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+            signature.append([os.path.relpath(path, pack.path), stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            signature.append([os.path.relpath(path, pack.path), None, None])
+    return signature
+
+
+def search_index_is_current(index, pack):
+    """Whether the pack's manifest and lesson files are still what index was built from"""
+    return index.signature is not None and index.signature == _signature(pack)
+
+
+def load_search_index(pack):
+    """The pack's search index, read from its saved copy if the pack is unchanged, else built and saved"""
+    path = os.path.join(pack.path, INDEX_FILE)
+    signature = _signature(pack)
+    try:
+        with open(path, encoding='utf-8') as source:
+            saved = json.load(source)
+        if saved.get('format') == INDEX_FORMAT and saved.get('signature') == signature:
+            index = SearchIndex.from_json(saved)
+            index.signature = signature
+            return index
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    index = SearchIndex.build(pack.read_lesson(entry['id']) for entry in pack.lessons())
+    index.signature = signature
+    try:
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as out:
+            json.dump(dict(index.to_json(), signature=signature), out, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temporary, path)
+    except OSError as e:
+        # A read-only deployment builds the index at each start instead
+        logger.warning(f"Could not save the search index of {pack.path}: {e}")
+    return index
@@ -0,0 +1,227 @@
+"""
+Bounded output buffer for kids' code
+Keeps the first and last part of the output in memory and spills the full log
+to a temp file, so a runaway print loop cannot fill up the server's memory
+"""
+
+import contextlib
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+
+SPILL_DIR = os.path.join(tempfile.gettempdir(), 'python_adventure_output')
+SPILL_MAX_AGE = 3600
+
+_capturing = threading.local()
+_install_lock = threading.Lock()
+
+
+def cleanup_spill_files(max_age=SPILL_MAX_AGE):
+    """Delete spilled logs older than max_age seconds"""
+    try:
+        entries = list(os.scandir(SPILL_DIR))
+    except FileNotFoundError:
+        return
+    cutoff = time.time() - max_age
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def read_output_page(path, page, page_size=500):
+    """Read one page (a list of lines) from a spilled log"""
+    try:
+        with open(path, encoding='utf-8', errors='replace') as log:
+            start = page * page_size
+            return [line.rstrip('\n') for line in itertools.islice(log, start, start + page_size)]
+    except OSError:
+        return []
+
+
+def read_output_file(path):
+    """Read a whole spilled log for download"""
+    try:
+        with open(path, 'rb') as log:
+            return log.read()
+    except OSError:
+        return b''
+
+
+class _ThreadStdout:
+    """sys.stdout stand-in that sends each thread's writes to the sink it captures into
+
+    Threads that are not capturing write to the stream that was there before.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def _target(self):
+        return getattr(_capturing, 'sink', None) or self.fallback
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+
+@contextlib.contextmanager
+def capture_stdout(sink):
+    """Send this thread's sys.stdout writes to sink until the block ends
+
+    Unlike contextlib.redirect_stdout this leaves other threads alone, so
+    library output (df.info(), help()) is captured for in-process runs without
+    mixing up runs happening at the same time.
+    """
+    if not isinstance(sys.stdout, _ThreadStdout):
+        with _install_lock:
+            if not isinstance(sys.stdout, _ThreadStdout):
+                sys.stdout = _ThreadStdout(sys.stdout)
+    previous = getattr(_capturing, 'sink', None)
+    _capturing.sink = sink
+    try:
+        yield sink
+    finally:
+        _capturing.sink = previous
+
+
+class OutputSink:
+    """File-like output buffer with character and line caps
+
+    The first half of each cap is kept as the head, the last half as a rolling
+    tail. Once the head is full, everything is also written to a spill file, up
+    to max_spill_chars, so the full log can still be downloaded. If a listener
+    is given it is called with every piece of text as it is written.
+    """
+
+    def __init__(self, max_chars=100_000, max_lines=2_000, max_spill_chars=20_000_000, listener=None):
+        self.listener = listener
+        self.head_chars = max_chars // 2
+        self.head_lines = max_lines // 2
+        self.tail_chars = max_chars - self.head_chars
+        self.tail_lines = max_lines - self.head_lines
+        self.max_spill_chars = max_spill_chars
+
+        self._head = []
+        self._head_size = 0
+        self._head_line_count = 0
+        self._head_full = False
+        self._tail = ''
+
+        self.total_chars = 0
+        self.total_bytes = 0
+        self.total_lines = 0
+        self.spill_path = None
+        self.spill_truncated = False
+        self._spill = None
+        self._spill_size = 0
+
+    def write(self, text):
+        """Add text to the output"""
+        if not text:
+            return 0
+        if self.listener is not None:
+            self.listener(text)
+        self.total_chars += len(text)
+        self.total_bytes += len(text) if text.isascii() else len(text.encode('utf-8', errors='replace'))
+        self.total_lines += text.count('\n')
+
+        if not self._head_full:
+            room = self.head_chars - self._head_size
+            lines_left = self.head_lines - self._head_line_count
+            if len(text) <= room and text.count('\n') < lines_left:
+                self._head.append(text)
+                self._head_size += len(text)
+                self._head_line_count += text.count('\n')
+                return len(text)
+            # Keep whatever part of a very long line still fits in the head
+            if room > 0 and '\n' not in text[:room]:
+                self._head.append(text[:room])
+                self._head_size += room
+                text = text[room:]
+            self._head_full = True
+            self._open_spill()
+
+        self._write_spill(text)
+        self._tail += text
+        # Trim now and then rather than on every write
+        if len(self._tail) > 2 * self.tail_chars:
+            self._tail = self._tail[-self.tail_chars:]
+        return len(text)
+
+    def flush(self):
+        """Flush the spill file, if there is one"""
+        if self._spill is not None:
+            self._spill.flush()
+
+    def _open_spill(self):
+        """Start the spill file with everything kept in the head so far"""
+        cleanup_spill_files()
+        try:
+            os.makedirs(SPILL_DIR, exist_ok=True)
+            fd, self.spill_path = tempfile.mkstemp(prefix='output_', suffix='.log', dir=SPILL_DIR)
+            self._spill = os.fdopen(fd, 'w', encoding='utf-8', errors='replace')
+        except OSError:
+            self._spill = None
+            self.spill_path = None
+            return
+        for chunk in self._head:
+            self._write_spill(chunk)
+
+    def _write_spill(self, text):
+        """Append to the spill file until it reaches max_spill_chars"""
+        if self._spill is None or self.spill_truncated:
+            return
+        if self._spill_size + len(text) > self.max_spill_chars:
+            text = text[:self.max_spill_chars - self._spill_size]
+            self.spill_truncated = True
+        self._spill.write(text)
+        self._spill_size += len(text)
+
+    @property
+    def truncated(self):
+        """Whether some of the output was left out of getvalue()"""
+        return self._head_full
+
+    def _tail_text(self):
+        """The tail trimmed to its caps, starting at a line boundary"""
+        tail = self._tail[-self.tail_chars:]
+        lines = tail.split('\n')
+        if len(lines) > 1 and (len(tail) < len(self._tail) or len(lines) > self.tail_lines):
+            # Drop the first (partial) line, then keep at most tail_lines
+            lines = lines[1:][-self.tail_lines:]
+        return '\n'.join(lines)
+
+    def getvalue(self):
+        """The output to show: everything, or the head and tail when it was too long"""
+        head = ''.join(self._head)
+        if not self._head_full:
+            return head
+        tail = self._tail_text()
+        hidden_lines = max(self.total_lines - head.count('\n') - tail.count('\n'), 0)
+        return f"{head}\n... ✂️ {hidden_lines:,} lines hidden ...\n\n{tail}"
+
+    def close(self):
+        """Finish the spill file"""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def summary(self):
+        """Output size and truncation details to add to an execution result"""
+        return {
+            'truncated': self.truncated,
+            'output_chars': self.total_chars,
+            'output_lines': self.total_lines,
+            'output_file': self.spill_path,
+        }
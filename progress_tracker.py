@@ -0,0 +1,161 @@
+"""
+Learner progress for the Python Adventure apps
+Completed lessons and exercises, stars, streaks and badges of one session
+"""
+
+from datetime import datetime
+
+# Badges every course has (an app may add its own on top)
+BADGES = {
+    "first_lesson": {
+        "name": "First Steps",
+        "description": "Completed your first lesson!",
+        "emoji": "👶",
+        "condition": lambda progress: len(progress['completed_lessons']) >= 1
+    },
+    "three_lessons": {
+        "name": "Getting Started",
+        "description": "Completed 3 lessons!",
+        "emoji": "🚀",
+        "condition": lambda progress: len(progress['completed_lessons']) >= 3
+    },
+    "five_lessons": {
+        "name": "Dedicated Learner",
+        "description": "Completed 5 lessons!",
+        "emoji": "📚",
+        "condition": lambda progress: len(progress['completed_lessons']) >= 5
+    },
+    "star_collector": {
+        "name": "Star Collector",
+        "description": "Earned 10 stars!",
+        "emoji": "⭐",
+        "condition": lambda progress: progress['total_stars'] >= 10
+    }
+}
+
+# ===== PROGRESS TRACKER CLASS =====
+class ProgressTracker:
+    """One learner's progress; badges are the definitions of the app's badges, shared by every session"""
+    
+    def __init__(self, badges=BADGES):
+        self.user_progress = self._get_default_progress()
+        self.badges = badges
+        self._completed_lessons = set()
+        # Lessons this user can open, and the LessonManager version they were worked out for
+        self._unlocked_lessons = None
+        self._unlocked_version = None
+    
+    def _get_default_progress(self):
+        """Get default progress structure"""
+        return {
+            "user_name": "",
+            "completed_lessons": [],
+            "completed_exercises": [],
+            "total_stars": 0,
+            "current_streak": 0,
+            "lesson_history": [],
+            "badges": [],
+            "last_active": ""
+        }
+    
+    def set_user(self, name):
+        """Set the user name"""
+        self.user_progress['user_name'] = name
+        self._update_last_active()
+    
+    def get_progress(self):
+        """Get current progress"""
+        return self.user_progress.copy()
+    
+    def get_completed_lessons(self):
+        """IDs of the completed lessons, as a set (do not change it)"""
+        return self._completed_lessons
+    
+    def get_unlocked_lessons(self, lesson_manager):
+        """IDs of the lessons this user can open, as a set (do not change it)
+        
+        Worked out from the prerequisites once, then kept up to date by
+        complete_lesson; worked out again only if the lessons change.
+        """
+        if self._unlocked_lessons is None or self._unlocked_version != lesson_manager.version:
+            self._unlocked_lessons = lesson_manager.unlocked_lessons(self._completed_lessons)
+            self._unlocked_version = lesson_manager.version
+        return self._unlocked_lessons
+    
+    def complete_lesson(self, lesson_id, lesson_manager=None):
+        """Mark a lesson as completed (pass the lesson_manager to unlock the lessons that need it)"""
+        if lesson_id not in self._completed_lessons:
+            self.user_progress['completed_lessons'].append(lesson_id)
+            self._completed_lessons.add(lesson_id)
+            if self._unlocked_lessons is not None:
+                if lesson_manager is not None and self._unlocked_version == lesson_manager.version:
+                    self._unlocked_lessons |= lesson_manager.newly_unlocked_lessons(lesson_id, self._completed_lessons)
+                else:
+                    self._unlocked_lessons = None
+            self.user_progress['total_stars'] += 1
+            
+            # Add to history
+            self.user_progress['lesson_history'].append({
+                'lesson_id': lesson_id,
+                'completed_at': datetime.now().isoformat(),
+                'stars_earned': 1
+            })
+            
+            self._update_streak()
+            return True
+        return False
+    
+    def complete_exercise(self, lesson_id, exercise_id):
+        """Mark an exercise as completed"""
+        exercise_key = f"ex_{lesson_id}_{exercise_id}"
+        if exercise_key not in self.user_progress['completed_exercises']:
+            self.user_progress['completed_exercises'].append(exercise_key)
+            self.user_progress['total_stars'] += 1
+            self._update_last_active()
+            return True
+        return False
+    
+    def _update_streak(self):
+        """Update the learning streak"""
+        today = datetime.now().date()
+        last_active_str = self.user_progress.get('last_active', '')
+        
+        if last_active_str:
+            try:
+                last_active = datetime.fromisoformat(last_active_str).date()
+                days_diff = (today - last_active).days
+                
+                if days_diff == 1:
+                    self.user_progress['current_streak'] += 1
+                elif days_diff == 0:
+                    pass
+                else:
+                    self.user_progress['current_streak'] = 1
+            except ValueError:
+                self.user_progress['current_streak'] = 1
+        else:
+            self.user_progress['current_streak'] = 1
+    
+    def _update_last_active(self):
+        """Update last active timestamp"""
+        self.user_progress['last_active'] = datetime.now().isoformat()
+    
+    def check_badges(self):
+        """Check for newly earned badges"""
+        earned_badge_names = [badge['name'] for badge in self.user_progress['badges']]
+        new_badges = []
+        
+        for badge_id, badge_info in self.badges.items():
+            if badge_info['name'] not in earned_badge_names:
+                if badge_info['condition'](self.user_progress):
+                    new_badge = {
+                        'id': badge_id,
+                        'name': badge_info['name'],
+                        'description': badge_info['description'],
+                        'emoji': badge_info['emoji'],
+                        'earned_at': datetime.now().strftime("%Y-%m-%d")
+                    }
+                    self.user_progress['badges'].append(new_badge)
+                    new_badges.append(new_badge)
+        
+        return new_badges
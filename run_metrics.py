@@ -0,0 +1,216 @@
+"""
+Execution metrics for kids' code
+Every run reports its parse/compile/exec time, CPU time, peak memory, output
+size and figure count. Runs are also added to process-wide histograms per
+lesson or exercise, which can be dumped as Prometheus text or a JSON snapshot
+along with gauges such as the scheduler's queue depth.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+METRIC_PREFIX = 'python_adventure'
+UNLABELED = 'unlabeled'
+
+# Set this to a .prom or .json path to have the histograms written there
+METRICS_FILE_ENV = 'PYTHON_ADVENTURE_METRICS_FILE'
+DUMP_INTERVAL = 15
+
+_SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+_BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000, 1_000_000_000)
+_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20)
+
+# Metric name -> (histogram buckets, help text)
+HISTOGRAMS = {
+    'parse_seconds': (_SECONDS_BUCKETS, "Time spent parsing and checking code"),
+    'compile_seconds': (_SECONDS_BUCKETS, "Time spent compiling code"),
+    'exec_seconds': (_SECONDS_BUCKETS, "Wall time spent running code"),
+    'cpu_seconds': (_SECONDS_BUCKETS, "CPU time spent running code"),
+    'total_seconds': (_SECONDS_BUCKETS, "Wall time of the whole request, sandbox round trip included"),
+    'queue_wait_seconds': (_SECONDS_BUCKETS, "Time spent waiting for a free run slot"),
+    'peak_memory_bytes': (_BYTES_BUCKETS, "Peak memory allocated while running code (sampled runs)"),
+    'output_bytes': (_BYTES_BUCKETS, "Bytes of text output"),
+    'figures': (_COUNT_BUCKETS, "Plotly figures created"),
+}
+
+
+def empty_metrics():
+    """A metrics block with nothing measured yet"""
+    return {
+        'parse_seconds': 0.0,
+        'compile_seconds': 0.0,
+        'exec_seconds': 0.0,
+        'cpu_seconds': 0.0,
+        'total_seconds': 0.0,
+        'queue_wait_seconds': 0.0,
+        'peak_memory_bytes': None,
+        'output_bytes': 0,
+        'figures': 0,
+        'cached': False,
+        'busy': False,
+    }
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def snapshot(self):
+        return {
+            'buckets': dict(zip((str(bound) for bound in self.buckets), self.counts)),
+            'count': self.count,
+            'sum': self.sum,
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe histograms of run metrics, one set per label"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._outcomes = {}
+        self._gauges = {}
+        self._last_dump = 0
+
+    def observe(self, label, metrics, success=True):
+        """Add one run's metrics block to the histograms for its label"""
+        label = label or UNLABELED
+        with self._lock:
+            outcomes = self._outcomes.setdefault(label, {'success': 0, 'error': 0, 'cached': 0, 'busy': 0})
+            outcomes['success' if success else 'error'] += 1
+            if metrics.get('cached') or metrics.get('busy'):
+                # A cache hit or a run turned away did no work, so it would only skew the timings
+                outcomes['cached' if metrics.get('cached') else 'busy'] += 1
+            else:
+                histograms = self._histograms.setdefault(label, {})
+                for name, (buckets, _) in HISTOGRAMS.items():
+                    value = metrics.get(name)
+                    if value is None:
+                        continue
+                    if name not in histograms:
+                        histograms[name] = Histogram(buckets)
+                    histograms[name].observe(value)
+        self._maybe_dump()
+
+    def register_gauge(self, name, help_text, read):
+        """Report a current value on every dump; read() returns {label: value}"""
+        with self._lock:
+            self._gauges[name] = (help_text, read)
+    
+    def _read_gauges(self):
+        with self._lock:
+            gauges = dict(self._gauges)
+        return {name: (help_text, read()) for name, (help_text, read) in gauges.items()}
+    
+    def clear(self):
+        """Drop every histogram"""
+        with self._lock:
+            self._histograms.clear()
+            self._outcomes.clear()
+
+    def snapshot(self):
+        """All histograms, run counts and gauges as plain data, ready for json.dumps"""
+        gauges = self._read_gauges()
+        with self._lock:
+            return {
+                'generated_at': time.time(),
+                'gauges': {name: values for name, (_, values) in gauges.items()},
+                'labels': {
+                    label: {
+                        'runs': dict(outcomes),
+                        'histograms': {name: histogram.snapshot() for name, histogram in self._histograms.get(label, {}).items()},
+                    }
+                    for label, outcomes in sorted(self._outcomes.items())
+                },
+            }
+
+    def to_prometheus(self):
+        """All histograms and gauges in the Prometheus text exposition format"""
+        lines = []
+        for name, (help_text, values) in self._read_gauges().items():
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for label, value in sorted(values.items()):
+                lines.append(f'{metric}{{label="{_escape(label)}"}} {value}')
+        with self._lock:
+            lines.append(f"# HELP {METRIC_PREFIX}_runs_total Code runs by outcome")
+            lines.append(f"# TYPE {METRIC_PREFIX}_runs_total counter")
+            for label, outcomes in sorted(self._outcomes.items()):
+                for outcome in ('success', 'error'):
+                    lines.append(f'{METRIC_PREFIX}_runs_total{{label="{_escape(label)}",outcome="{outcome}"}} {outcomes[outcome]}')
+            lines.append(f"# HELP {METRIC_PREFIX}_cache_hits_total Code runs answered from the result cache")
+            lines.append(f"# TYPE {METRIC_PREFIX}_cache_hits_total counter")
+            for label, outcomes in sorted(self._outcomes.items()):
+                lines.append(f'{METRIC_PREFIX}_cache_hits_total{{label="{_escape(label)}"}} {outcomes["cached"]}')
+            lines.append(f"# HELP {METRIC_PREFIX}_busy_total Code runs turned away because the server or the session was busy")
+            lines.append(f"# TYPE {METRIC_PREFIX}_busy_total counter")
+            for label, outcomes in sorted(self._outcomes.items()):
+                lines.append(f'{METRIC_PREFIX}_busy_total{{label="{_escape(label)}"}} {outcomes["busy"]}')
+
+            for name, (buckets, help_text) in HISTOGRAMS.items():
+                metric = f"{METRIC_PREFIX}_{name}"
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for label, histograms in sorted(self._histograms.items()):
+                    histogram = histograms.get(name)
+                    if histogram is None:
+                        continue
+                    tag = f'label="{_escape(label)}"'
+                    for bound, count in zip(buckets, histogram.counts):
+                        lines.append(f'{metric}_bucket{{{tag},le="{bound}"}} {count}')
+                    lines.append(f'{metric}_bucket{{{tag},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{metric}_sum{{{tag}}} {histogram.sum}")
+                    lines.append(f"{metric}_count{{{tag}}} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """Write the histograms to path: JSON for .json, Prometheus text otherwise
+
+        The file is replaced in one step so collectors never read half of it.
+        """
+        if path.endswith('.json'):
+            text = json.dumps(self.snapshot(), indent=2)
+        else:
+            text = self.to_prometheus()
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as out:
+            out.write(text)
+        os.replace(temp_path, path)
+
+    def _maybe_dump(self):
+        """Write the metrics file named by the environment every DUMP_INTERVAL seconds"""
+        path = os.environ.get(METRICS_FILE_ENV)
+        now = time.monotonic()
+        if not path or now - self._last_dump < DUMP_INTERVAL:
+            return
+        self._last_dump = now
+        try:
+            self.dump(path)
+        except OSError:
+            pass
+
+
+def _escape(label):
+    return str(label).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared by every session in this process
+registry = MetricsRegistry()
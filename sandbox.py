@@ -0,0 +1,450 @@
+"""
+Process pool sandbox for running kids' code
+Runs each submission in a pre-forked worker process so a runaway loop can be
+killed without taking down the Streamlit server. Workers come from a warm
+forkserver that has pandas and plotly imported already
+"""
+
+import multiprocessing
+import multiprocessing.spawn
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict
+
+# Modules every submission can use; the forkserver imports them once so
+# workers start with them already in memory
+PRELOAD_MODULES = [
+    'pandas',
+    'plotly.express',
+    'plotly.graph_objects',
+    'math',
+    'random',
+    'statistics',
+    'executor',
+]
+
+
+# Process name prefix that marks our workers (see _preparation_data)
+WORKER_NAME = 'sandbox-worker'
+
+
+class SandboxError(Exception):
+    """Raised when a worker process could not finish a job"""
+
+
+class SandboxTimeout(SandboxError):
+    """Raised when a job runs past its deadline"""
+
+
+def _worker_main(conn, runner_factory):
+    """Worker loop: build the runner once, then serve jobs until told to stop
+
+    Each job is (stream, args). Streaming jobs may send ('chunk', value)
+    messages while they run; every job ends with one ('result', value).
+    """
+    # Ctrl+C on the server should not kill workers mid-job; the pool shuts them down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    runner = runner_factory()
+
+    def emit(value):
+        conn.send(('chunk', value))
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+
+        stream, args = job
+        try:
+            result = runner(*args, emit=emit if stream else None)
+        except BaseException as e:
+            result = SandboxError(f"{type(e).__name__}: {str(e)}")
+
+        try:
+            conn.send(('result', result))
+        except Exception as e:
+            # The result could not be pickled (e.g. an odd object in the plots)
+            conn.send(('result', SandboxError(f"{type(e).__name__}: {str(e)}")))
+
+
+_get_preparation_data = multiprocessing.spawn.get_preparation_data
+
+
+def _preparation_data(name):
+    """Stop workers from re-running the parent's __main__
+
+    Under `streamlit run` the app script itself is __main__, and a forkserver or
+    spawn child would execute the whole app again before starting the worker.
+    Workers only need the modules in PRELOAD_MODULES, so skip that step for them.
+    """
+    data = _get_preparation_data(name)
+    if name.startswith(WORKER_NAME):
+        data.pop('init_main_from_path', None)
+        data.pop('init_main_from_name', None)
+    return data
+
+
+multiprocessing.spawn.get_preparation_data = _preparation_data
+
+
+class _Worker:
+    """A single worker process and the parent end of its pipe"""
+
+    def __init__(self, context, runner_factory):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, runner_factory),
+            name=WORKER_NAME,
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+        self.last_used = time.monotonic()
+
+    def kill(self):
+        """Stop the process right away"""
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+    def stop(self):
+        """Ask the process to exit, killing it if it does not"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+
+def _converse(worker, job, timeout, stream):
+    """Send a job to a worker and yield its messages, ending with ('result', value)
+
+    Raises SandboxTimeout past the deadline and SandboxError if the worker dies;
+    either way the worker cannot be used again.
+    """
+    try:
+        worker.conn.send((stream, job))
+        deadline = time.monotonic() + timeout
+        while True:
+            if not worker.conn.poll(max(deadline - time.monotonic(), 0)):
+                raise SandboxTimeout(f"Code ran for more than {timeout} seconds")
+            kind, value = worker.conn.recv()
+            yield kind, value
+            if kind == 'result':
+                return
+    except (EOFError, OSError) as e:
+        # The worker died (crashed, or was killed by the OS)
+        raise SandboxError(f"The worker process stopped unexpectedly: {str(e)}")
+
+
+def _default_context(preload):
+    """Use a forkserver with the heavy modules preloaded where the platform has one"""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # Only takes effect before the forkserver starts, i.e. for the first pool
+        context.set_forkserver_preload(list(preload))
+        return context
+    return multiprocessing.get_context()
+
+
+class SandboxPool:
+    """A warm pool of worker processes that run jobs with a deadline
+
+    Workers are forked from a server that already imported PRELOAD_MODULES, so
+    a new worker starts in milliseconds. The pool keeps min_size workers warm,
+    grows up to max_size under load, retires extra workers after idle_timeout
+    seconds and recycles each worker after max_runs_per_worker jobs.
+    
+    session() hands out a SandboxSession with a worker of its own. At most
+    max_sessions of those workers are kept; the least recently used one (or
+    one idle for session_idle_timeout seconds) is stopped to make room.
+    """
+
+    def __init__(self, runner_factory, min_size=None, max_size=None,
+                 max_runs_per_worker=200, idle_timeout=60,
+                 max_sessions=8, session_idle_timeout=600,
+                 preload=PRELOAD_MODULES, context=None):
+        self.runner_factory = runner_factory
+        self.max_size = max_size or os.cpu_count() or 1
+        if min_size is None:
+            min_size = max(1, self.max_size // 2)
+        self.min_size = min(min_size, self.max_size)
+        self.max_runs_per_worker = max_runs_per_worker
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.session_idle_timeout = session_idle_timeout
+        self.context = context or _default_context(preload)
+
+        self._cond = threading.Condition()
+        self._idle = []
+        self._workers = set()
+        self._starting = 0
+        self._closed = False
+        # Sessions that have a worker, least recently used first
+        self._sessions = OrderedDict()
+        self._counters = {
+            'jobs': 0,
+            'timeouts': 0,
+            'crashes': 0,
+            'spawned': 0,
+            'recycled': 0,
+            'retired': 0,
+            'session_evictions': 0,
+        }
+
+        self._top_up()
+
+    def _spawn(self):
+        """Start a new worker; the caller must have reserved a slot in _starting"""
+        try:
+            worker = _Worker(self.context, self.runner_factory)
+        finally:
+            with self._cond:
+                self._starting -= 1
+        with self._cond:
+            self._workers.add(worker)
+            self._counters['spawned'] += 1
+        return worker
+
+    def _top_up(self):
+        """Start workers until min_size are running"""
+        while True:
+            with self._cond:
+                if self._closed or len(self._workers) + self._starting >= self.min_size:
+                    return
+                self._starting += 1
+            worker = self._spawn()
+            with self._cond:
+                self._idle.append(worker)
+                self._cond.notify()
+
+    def _retire_idle(self):
+        """Stop workers above min_size that have been idle too long"""
+        now = time.monotonic()
+        retired = []
+        with self._cond:
+            for worker in list(self._idle):
+                if len(self._workers) <= self.min_size:
+                    break
+                if now - worker.last_used > self.idle_timeout:
+                    self._idle.remove(worker)
+                    self._workers.discard(worker)
+                    self._counters['retired'] += 1
+                    retired.append(worker)
+        for worker in retired:
+            worker.stop()
+
+    def _acquire(self):
+        """Take an idle worker, starting a new one if the pool can still grow"""
+        self._retire_idle()
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise SandboxError("The sandbox pool has been shut down")
+                if self._idle:
+                    return self._idle.pop()
+                if len(self._workers) + self._starting < self.max_size:
+                    self._starting += 1
+                    break
+                self._cond.wait()
+        return self._spawn()
+
+    def _release(self, worker):
+        """Put a worker back, recycling it once it has run enough jobs"""
+        worker.runs += 1
+        worker.last_used = time.monotonic()
+        with self._cond:
+            recycle = self._closed or worker.runs >= self.max_runs_per_worker
+            if recycle:
+                self._workers.discard(worker)
+                if not self._closed:
+                    self._counters['recycled'] += 1
+            else:
+                self._idle.append(worker)
+            self._cond.notify()
+        if recycle:
+            worker.stop()
+            self._top_up()
+
+    def _discard(self, worker):
+        """Kill a broken or stuck worker and keep the pool warm"""
+        with self._cond:
+            self._workers.discard(worker)
+            self._cond.notify()
+        worker.kill()
+        self._top_up()
+
+    def _exchange(self, job, timeout, stream):
+        """Send a job to a worker and yield its messages until the result arrives"""
+        worker = self._acquire()
+        finished = False
+        try:
+            for kind, value in _converse(worker, job, timeout, stream):
+                if kind == 'result':
+                    finished = True
+                    break
+                yield kind, value
+        except SandboxError as e:
+            with self._cond:
+                self._counters['timeouts' if isinstance(e, SandboxTimeout) else 'crashes'] += 1
+            raise
+        finally:
+            # A worker that timed out, crashed or was abandoned mid-stream
+            # cannot be reused
+            if not finished:
+                self._discard(worker)
+
+        with self._cond:
+            self._counters['jobs'] += 1
+        self._release(worker)
+        if isinstance(value, SandboxError):
+            raise value
+        yield 'result', value
+
+    def session(self):
+        """Get a SandboxSession whose jobs all go to one worker of its own"""
+        return SandboxSession(self)
+
+    def _start_session_worker(self, session):
+        """Start a worker for a session, stopping old session workers to make room"""
+        now = time.monotonic()
+        evicted = []
+        with self._cond:
+            if self._closed:
+                raise SandboxError("The sandbox pool has been shut down")
+            for other, last_used in list(self._sessions.items()):
+                full = len(self._sessions) - len(evicted) >= self.max_sessions
+                if not full and now - last_used <= self.session_idle_timeout:
+                    break
+                evicted.append(other)
+            self._counters['spawned'] += 1
+        for other in evicted:
+            # A session busy with a job is left alone
+            if other._drop_worker(wait=False):
+                with self._cond:
+                    self._counters['session_evictions'] += 1
+        worker = _Worker(self.context, self.runner_factory)
+        with self._cond:
+            self._sessions[session] = time.monotonic()
+        return worker
+
+    def _touch_session(self, session):
+        with self._cond:
+            if session in self._sessions:
+                self._sessions[session] = time.monotonic()
+                self._sessions.move_to_end(session)
+
+    def _forget_session(self, session):
+        with self._cond:
+            self._sessions.pop(session, None)
+
+    def run(self, *job, timeout=5):
+        """Run a job on the next free worker and return the runner's result"""
+        for kind, value in self._exchange(job, timeout, stream=False):
+            if kind == 'result':
+                return value
+
+    def stream(self, *job, timeout=5):
+        """Run a job and yield ('chunk', value) messages, then ('result', value)"""
+        yield from self._exchange(job, timeout, stream=True)
+
+    def stats(self):
+        """Get a snapshot of the pool size and job counters"""
+        with self._cond:
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'workers': len(self._workers),
+                'idle': len(self._idle),
+                'busy': len(self._workers) - len(self._idle),
+                'starting': self._starting,
+                'sessions': len(self._sessions),
+                **self._counters,
+            }
+
+    def shutdown(self):
+        """Stop every worker"""
+        with self._cond:
+            self._closed = True
+            workers = list(self._workers)
+            sessions = list(self._sessions)
+            self._workers.clear()
+            self._idle.clear()
+            self._cond.notify_all()
+        for worker in workers:
+            worker.stop()
+        for session in sessions:
+            session._drop_worker()
+
+
+class SandboxSession:
+    """A worker kept for one user, so state can live in it between jobs
+
+    The worker can be lost at any time (a timeout, a crash, or the pool making
+    room for other sessions); the next job then starts a fresh worker, so jobs
+    must carry everything needed to rebuild the state.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def run(self, *job, timeout=5):
+        """Run a job on this session's worker and return the runner's result"""
+        with self._lock:
+            if self._worker is None:
+                self._worker = self.pool._start_session_worker(self)
+            else:
+                self.pool._touch_session(self)
+
+            finished = False
+            try:
+                for kind, value in _converse(self._worker, job, timeout, stream=False):
+                    finished = kind == 'result'
+            except SandboxError as e:
+                with self.pool._cond:
+                    self.pool._counters['timeouts' if isinstance(e, SandboxTimeout) else 'crashes'] += 1
+                raise
+            finally:
+                if not finished:
+                    self._stop_worker(kill=True)
+
+        with self.pool._cond:
+            self.pool._counters['jobs'] += 1
+        if isinstance(value, SandboxError):
+            raise value
+        return value
+
+    def _stop_worker(self, kill=False):
+        """Stop the worker; the caller must hold the lock"""
+        worker, self._worker = self._worker, None
+        self.pool._forget_session(self)
+        if worker is not None:
+            worker.kill() if kill else worker.stop()
+
+    def _drop_worker(self, wait=True):
+        """Stop the worker unless (with wait=False) a job is running; returns whether it stopped"""
+        if not self._lock.acquire(blocking=wait):
+            return False
+        try:
+            self._stop_worker()
+        finally:
+            self._lock.release()
+        return True
+
+    def close(self):
+        """Stop this session's worker"""
+        self._drop_worker()
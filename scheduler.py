@@ -0,0 +1,194 @@
+"""
+Fair-share scheduler for kids' code
+Sits in front of the sandbox pool: runs wait for one of a fixed number of
+slots, lesson demos and exercise checks go ahead of Playground runs, and among
+runs of the same kind the session that used the least CPU lately goes first.
+A session that used more than its CPU quota over the last window is told to
+wait a moment instead of being queued.
+"""
+
+import contextlib
+import itertools
+import threading
+import time
+from collections import deque
+
+# Run priorities (lower runs first)
+PRIORITY_LESSON = 0
+PRIORITY_PLAYGROUND = 1
+PRIORITY_NAMES = {PRIORITY_LESSON: 'lesson', PRIORITY_PLAYGROUND: 'playground'}
+
+# The session lesson demos are built as. A cold start builds every lesson's
+# demos at once, so it is not held to the CPU quota
+BUILD_SESSION_ID = 'lesson-build'
+
+
+class SchedulerBusy(Exception):
+    """Raised when a run cannot be started now; retry_after is a hint in seconds"""
+
+    def __init__(self, message, retry_after, over_quota=False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.over_quota = over_quota
+
+
+def priority_for(label):
+    """Priority of a run from its metrics label (Playground runs go last)"""
+    return PRIORITY_PLAYGROUND if (label or '').startswith('playground') else PRIORITY_LESSON
+
+
+class _Ticket:
+    """One run, from the moment it asks for a slot until it gives it back"""
+
+    def __init__(self, session_id, priority, order):
+        self.session_id = session_id
+        self.priority = priority
+        self.order = order
+        self.queued_at = time.monotonic()
+        self.started_at = None
+        self.cpu_seconds = None
+
+    @property
+    def wait_seconds(self):
+        return (self.started_at or time.monotonic()) - self.queued_at
+
+    def charge(self, cpu_seconds):
+        """Record the CPU time the run used (otherwise its wall time is charged)"""
+        self.cpu_seconds = cpu_seconds
+
+
+class FairScheduler:
+    """Gives out run slots by priority and recent CPU use per session
+
+    slots is how many runs may go at once (the sandbox pool size). Each
+    session may use cpu_quota CPU-seconds per window seconds (None for no
+    quota), except the sessions in quota_exempt. A run waits at
+    most max_wait[priority] seconds for a slot, and at most max_queue runs wait
+    at a time; past either limit the caller gets SchedulerBusy.
+    """
+
+    def __init__(self, slots, window=60, cpu_quota=20,
+                 max_wait=None, max_queue=100, quota_exempt=(BUILD_SESSION_ID,)):
+        self.slots = slots
+        self.window = window
+        self.cpu_quota = cpu_quota
+        self.quota_exempt = frozenset(quota_exempt)
+        self.max_wait = {PRIORITY_LESSON: 30, PRIORITY_PLAYGROUND: 10, **(max_wait or {})}
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._order = itertools.count()
+        self._waiting = []
+        self._running = 0
+        # session id -> deque of (finished at, CPU-seconds)
+        self._usage = {}
+        self._counters = {'started': 0, 'busy': 0, 'over_quota': 0}
+
+    def _recent_cpu(self, session_id, now):
+        """CPU-seconds a session used within the window (older entries are dropped)"""
+        usage = self._usage.get(session_id)
+        if not usage:
+            return 0.0
+        while usage and usage[0][0] < now - self.window:
+            usage.popleft()
+        if not usage:
+            del self._usage[session_id]
+            return 0.0
+        return sum(cpu for _, cpu in usage)
+
+    def _over_quota(self, session_id, now):
+        """Whether a session used up its CPU quota for the window"""
+        if self.cpu_quota is None or session_id in self.quota_exempt:
+            return False
+        return self._recent_cpu(session_id, now) >= self.cpu_quota
+
+    def _quota_frees_in(self, session_id, now):
+        """Seconds until a session's recent CPU use drops back under the quota"""
+        total = self._recent_cpu(session_id, now)
+        for finished_at, cpu in self._usage.get(session_id, ()):
+            total -= cpu
+            if total < self.cpu_quota:
+                return max(finished_at + self.window - now, 1)
+        return 1
+
+    def _next(self, now):
+        """The waiting ticket that should get the next free slot"""
+        return min(
+            self._waiting,
+            key=lambda ticket: (ticket.priority, self._recent_cpu(ticket.session_id, now), ticket.order)
+        )
+
+    def acquire(self, session_id, priority):
+        """Wait for a slot and return its ticket, or raise SchedulerBusy"""
+        with self._cond:
+            now = time.monotonic()
+            if self._over_quota(session_id, now):
+                self._counters['busy'] += 1
+                self._counters['over_quota'] += 1
+                retry_after = self._quota_frees_in(session_id, now)
+                raise SchedulerBusy(
+                    f"You've been running lots of code! 🏃 Take a little break - your code can run again in about {retry_after:.0f} seconds.",
+                    retry_after,
+                    over_quota=True
+                )
+            if len(self._waiting) >= self.max_queue:
+                self._counters['busy'] += 1
+                raise SchedulerBusy("Lots of coders are running code right now! 🚦 Try again in a moment.", 5)
+
+            ticket = _Ticket(session_id, priority, next(self._order))
+            self._waiting.append(ticket)
+            deadline = now + self.max_wait[priority]
+            try:
+                while self._running >= self.slots or self._next(time.monotonic()) is not ticket:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['busy'] += 1
+                        raise SchedulerBusy("Lots of coders are running code right now! 🚦 Try again in a moment.", 5)
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting.remove(ticket)
+                # Whoever is next in line may be able to go now
+                self._cond.notify_all()
+            self._running += 1
+            self._counters['started'] += 1
+            ticket.started_at = time.monotonic()
+            return ticket
+
+    def release(self, ticket):
+        """Give the slot back and charge the session for the run"""
+        finished_at = time.monotonic()
+        cpu = ticket.cpu_seconds if ticket.cpu_seconds is not None else finished_at - ticket.started_at
+        with self._cond:
+            self._running -= 1
+            self._usage.setdefault(ticket.session_id, deque()).append((finished_at, cpu))
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, session_id, priority):
+        """Hold a slot for one run (use as a context manager); yields the ticket"""
+        ticket = self.acquire(session_id, priority)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def queue_depth(self):
+        """Waiting runs by priority name"""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for ticket in self._waiting:
+                depth[PRIORITY_NAMES[ticket.priority]] += 1
+            return depth
+
+    def stats(self):
+        """Current queue depth, running runs and counters"""
+        depth = self.queue_depth()
+        with self._cond:
+            now = time.monotonic()
+            return {
+                'slots': self.slots,
+                'running': self._running,
+                'queued': depth,
+                'sessions_over_quota': sum(self._over_quota(session_id, now) for session_id in list(self._usage)),
+                **self._counters,
+            }
+
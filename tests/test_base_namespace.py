@@ -0,0 +1,48 @@
+"""
+Regression tests for the modules and built-ins every run shares
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import CodeExecutor
+
+
+def run(session_id, code):
+    return CodeExecutor(use_sandbox=False).execute_code(code, session_id=session_id)
+
+
+def test_one_session_cannot_change_modules_for_another():
+    attempts = [
+        'math.pi = 3',
+        'del math.pi',
+        'm = math\nm.pi = 3',
+        'p = px\np.bar = None',
+        'pd.DataFrame.sum = None',
+        'api = pd.api\napi.types = None',
+        'plotly.express = None',
+    ]
+    for code in attempts:
+        assert not run('first', code)['success'], code
+    result = run('second', 'print(math.pi)\nprint(px.bar is not None)\nprint(pd.DataFrame({"a": [1, 2]})["a"].sum())')
+    assert result['success'], result['error']
+    assert result['output'] == '3.141592653589793\nTrue\n3\n'
+
+
+def test_seeding_random_does_not_reach_other_sessions():
+    seeded = run('first', 'random.seed(42)\nprint(random.random())')
+    assert seeded['output'] == f'{random.Random(42).random()}\n'
+    drawn = [run('second', f'print(random.random())  # draw {n}')['output'] for n in range(3)]
+    assert seeded['output'] not in drawn
+    assert len(set(drawn)) == 3
+
+
+def test_cells_keep_their_seeded_random():
+    executor = CodeExecutor(use_sandbox=False)
+    session = executor.new_cell_session()
+    code = 'random.seed(7)\n# %%\nprint(random.randint(1, 10**9))\n'
+    result = executor.run_cells(code, session)
+    assert result['cells'][1]['output'] == f'{random.Random(7).randint(1, 10**9)}\n'
@@ -0,0 +1,53 @@
+"""
+Regression tests for planning which cells run again after an edit
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cell_deps import CellRun, cell_names, dropped_names, plan_reruns
+from executor import CodeExecutor
+
+
+def cells_of(*sources):
+    return [CellRun(source, cell_names(source), None) for source in sources]
+
+
+def run_twice(first, second):
+    executor = CodeExecutor(use_sandbox=False)
+    session = executor.new_cell_session()
+    executor.run_cells(first, session)
+    return executor.run_cells(second, session)['cells']
+
+
+def test_calling_a_function_counts_as_its_in_place_changes():
+    previous = cells_of('lst = []\n', 'def add(v):\n    lst.append(v)\n', 'add(1)\n', 'print(lst)\n')
+    cells = cells_of('lst = []\n', 'def add(v):\n    lst.append(v)\n', 'add(1)  # again\n', 'print(lst)\n')
+    assert plan_reruns(previous, cells) == [0, 1, 2, 3]
+
+
+def test_function_effects_reach_through_other_functions():
+    previous = cells_of('lst = []\n', 'def add(v):\n    lst.append(v)\n\ndef twice(v):\n    add(v)\n    add(v)\n', 'twice(1)\n')
+    cells = previous[:2] + cells_of('twice(2)\n')
+    assert 0 in plan_reruns(previous, cells)
+
+
+def test_editing_a_cell_after_a_call_does_not_repeat_it():
+    first = 'lst = []\n# %%\ndef add(v):\n    lst.append(v)\n# %%\nadd(1)\n# %%\nprint(lst)\n'
+    cells = run_twice(first, first.replace('add(1)\n', 'add(1)\nprint("added")\n'))
+    assert cells[3]['output'] == '[1]\n'
+
+
+def test_removed_definitions_are_not_left_behind():
+    assert dropped_names(cells_of('x = 1\n', 'print(x)\n'), cells_of('print(x)\n')) == {'x'}
+    assert dropped_names(cells_of('x = 1\n', 'print(x)\n'), cells_of('x = 2\n', 'print(x)\n')) == set()
+    cells = run_twice('x = 1\n# %%\nprint(x)\n', '# %%\nprint(x)\n')
+    assert not cells[0]['success']
+    assert 'NameError' in cells[0]['error']
+
+
+def test_renamed_definition_is_not_left_behind():
+    cells = run_twice('x = 1\n# %%\nprint(x)\n', 'y = 1\n# %%\nprint(x)\n')
+    assert not cells[1]['success']
@@ -0,0 +1,134 @@
+"""
+Regression tests for the safety check on kids' code
+"""
+
+import ast
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_safety import check_tree
+from executor import CodeExecutor
+
+# Reached os through an alias of getattr and print's __globals__
+ALIAS_ESCAPE = (
+    'g = getattr; G = g(print, "__glo"+"bals__"); imp = G["__builtins__"]["__imp"+"ort__"]; '
+    'o = imp("os"); g(o, "get"+"cwd")()'
+)
+
+
+def problems(code):
+    return [message for _, message in check_tree(ast.parse(code)).problems]
+
+
+def test_getattr_alias_is_rejected():
+    assert problems('g = getattr')
+    assert problems('h = hasattr')
+    assert problems('fs = [getattr, hasattr]')
+    assert problems('f = lambda: getattr')
+    assert problems(ALIAS_ESCAPE)
+
+
+def test_getattr_needs_a_safe_quoted_name():
+    assert problems('getattr(print, "__glo" + "bals__")')
+    assert problems('getattr(print, "__globals__")')
+    assert problems('getattr(print, name)')
+    assert problems('getattr(*["x", "__class__"])')
+    assert problems('hasattr(print, "_secret")')
+
+
+def test_direct_getattr_with_a_plain_name_is_allowed():
+    assert not problems('getattr("hi", "upper")()')
+    assert not problems('hasattr([], "append")')
+    assert not problems('getattr(3, "real", 0)')
+
+
+def test_alias_escape_does_not_run():
+    result = CodeExecutor(use_sandbox=False).execute_code(ALIAS_ESCAPE)
+    assert not result['success']
+    assert os.getcwd() not in result['output']
+
+
+def test_each_run_gets_its_own_built_ins():
+    code = compile('print(range(3))', '<test>', 'exec')
+    builtins = CodeExecutor.base_namespace.prepare(code)
+    builtins['range'] = len
+    del builtins['abs']
+    fresh = CodeExecutor.base_namespace.prepare(code)
+    assert fresh['range'] is range and fresh['abs'] is abs
+
+
+# Walked from print's closure to the server's environment inside a format string
+FORMAT_ESCAPE = "'{0.keywords[file].write.__func__.__globals__[os].environ[SECRET_TOKEN]}'.format(print)"
+
+
+def test_format_fields_cannot_walk_attributes_or_indexes():
+    assert problems(FORMAT_ESCAPE)
+    assert problems("'{0.real}'.format(1)")
+    assert problems("'{0[0]}'.format([1])")
+    assert problems("'{_x}'.format(_x=1)")
+    assert problems("'{0:{1.real}}'.format(1, 2)")
+    assert problems("'{a.b}'.format_map({'a': 1})")
+
+
+def test_format_is_only_called_on_a_string_in_quotes():
+    assert problems("s = '{0.x}'\ns.format(print)")
+    assert problems("f = '{}'.format")
+    assert problems("str.format('{0.x}', print)")
+    assert problems("getattr('{0.x}', 'format')(print)")
+    assert problems("string.Formatter().format('{0.x}', print)")
+
+
+def test_plain_format_strings_are_allowed():
+    assert not problems("'{} is {age:>{width}}'.format('Sam', age=9, width=3)")
+    assert not problems("'{0}{0!r}'.format('hi')")
+    assert not problems("'{name}'.format_map({'name': 'Sam'})")
+
+
+def test_format_escape_does_not_run_and_print_hides_the_server():
+    executor = CodeExecutor(use_sandbox=False)
+    result = executor.execute_code(FORMAT_ESCAPE)
+    assert not result['success']
+    result = executor.execute_code('print(print.__closure__)')
+    assert not result['success']
+    result = executor.execute_code("print('a', 'b', sep='-', end='!')\nprint(1, file=None)")
+    assert result['output'] == 'a-b!1\n'
+
+
+def test_exporters_cannot_write_files():
+    for exporter in ('to_json', 'to_html', 'to_string', 'to_latex', 'to_markdown', 'to_xml'):
+        assert problems(f"df.{exporter}('out.txt')"), exporter
+        assert problems(f"df.{exporter}(buf='out.txt')"), exporter
+        assert problems(f"df.{exporter}(path_or_buf='out.txt')"), exporter
+        assert problems(f"df.{exporter}(**options)"), exporter
+        assert problems(f"save = df.{exporter}"), exporter
+        assert problems(f"df.style.{exporter}('out.txt')"), exporter
+    for exporter in ('to_csv', 'to_excel', 'to_clipboard', 'to_pickle', 'to_parquet', 'to_hdf'):
+        assert problems(f"df.{exporter}()"), exporter
+        assert problems(f"df.style.{exporter}()"), exporter
+        assert problems(f"getattr(df, '{exporter}')"), exporter
+    assert problems("fig.write_html('chart.html')")
+
+
+def test_exporters_can_return_text_and_values():
+    assert not problems("print(df.to_string())")
+    assert not problems("text = df.to_json(orient='records')")
+    assert not problems("df.style.to_html()")
+    assert not problems("rows = df.to_dict('records')")
+    assert not problems("values = df['a'].to_list()")
+
+
+def test_show_takes_no_renderer():
+    assert problems("fig.show(renderer='browser')")
+    assert problems("fig.show('browser')")
+    assert problems("pio.renderers.default = 'browser'")
+    assert not problems("fig.show()")
+
+
+def test_exporter_writing_a_file_does_not_run(tmp_path):
+    target = tmp_path / 'leak.json'
+    code = f"df = pd.DataFrame({{'a': [1]}})\ndf.to_json({str(target)!r})"
+    result = CodeExecutor(use_sandbox=False).execute_code(code)
+    assert not result['success']
+    assert not target.exists()
@@ -0,0 +1,62 @@
+"""
+Regression tests for shrinking kids' figures
+"""
+
+import os
+import sys
+
+import numpy as np
+import plotly.express as px
+import plotly.io as pio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from figure_shrink import MAX_TRACE_POINTS, _decode, shrink_figure
+
+
+def test_big_histogram_is_sent_as_its_counts():
+    spec = shrink_figure(px.histogram(x=[i % 10 for i in range(60000)]).to_dict())
+    trace = spec['data'][0]
+    assert trace['type'] == 'bar'
+    assert list(_decode(trace['x'])) == list(range(10))
+    assert set(_decode(trace['y'])) == {6000}
+
+
+def test_histogram_split_by_color_shares_its_bins():
+    samples = np.random.default_rng(1).normal(size=100000)
+    spec = shrink_figure(px.histogram(x=samples, color=np.where(samples > 0, 'up', 'down')).to_dict())
+    first, second = spec['data']
+    assert list(_decode(first['x'])) == list(_decode(second['x']))
+    assert _decode(first['y']).sum() + _decode(second['y']).sum() == 100000
+
+
+def test_small_histogram_is_left_to_plotly():
+    spec = shrink_figure(px.histogram(x=list(range(100))).to_dict())
+    assert spec['data'][0]['type'] == 'histogram'
+
+
+def test_million_point_histogram_and_bar_payloads_are_small():
+    samples = np.random.default_rng(2).normal(size=1_000_000)
+    histogram = pio.to_json(shrink_figure(px.histogram(x=samples).to_dict()), validate=False)
+    bar = pio.to_json(shrink_figure(px.bar(x=np.arange(1_000_000), y=samples).to_dict()), validate=False)
+    assert len(histogram) < 50_000
+    assert len(bar) < 150_000
+
+
+def test_big_bar_is_cut_with_a_note():
+    spec = shrink_figure(px.bar(x=list(range(100000)), y=list(range(100000))).to_dict())
+    assert len(_decode(spec['data'][0]['y'])) == MAX_TRACE_POINTS
+    notes = [note['text'] for note in spec['layout']['annotations']]
+    assert notes == [f"Showing the first {MAX_TRACE_POINTS:,} of 100,000 bars"]
+
+
+def test_pie_keeps_every_slice():
+    spec = shrink_figure(px.pie(values=list(range(1, 10001)), names=[f"slice {i}" for i in range(10000)]).to_dict())
+    assert len(_decode(spec['data'][0]['values'])) == 10000
+
+
+def test_long_line_is_shrunk():
+    spec = shrink_figure(px.line(x=list(range(100000)), y=list(range(100000))).to_dict())
+    trace = spec['data'][0]
+    assert trace['type'] == 'scattergl'
+    assert len(_decode(trace['y'])) == MAX_TRACE_POINTS
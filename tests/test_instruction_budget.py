@@ -0,0 +1,43 @@
+"""
+Regression tests for the step budget on kids' code
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import CodeExecutor
+
+
+def small_budget_executor():
+    executor = CodeExecutor(use_sandbox=False)
+    executor.instruction_budget = 1000
+    return executor
+
+
+def test_caught_budget_error_keeps_stopping_the_code():
+    code = 'try:\n    while True:\n        pass\nexcept:\n    pass\nfor i in range(3):\n    print(i)\n'
+    result = small_budget_executor().execute_code(code)
+    assert not result['success']
+    assert 'steps' in result['error']
+
+
+def test_default_budget_lets_ordinary_loops_finish():
+    result = CodeExecutor(use_sandbox=False).execute_code('total = 0\nfor i in range(1, 1000001):\n    total += i\nprint(total)')
+    assert result['success']
+    assert result['output'] == '500000500000\n'
+
+
+def test_printing_endless_loop_stops_before_the_timeout_with_its_output():
+    # Each round prints, so the step budget alone would take minutes to run out
+    executor = CodeExecutor()
+    try:
+        result = executor.execute_code('i = 0\nwhile i < 10:\n    print(i)\n', timeout=5)
+    finally:
+        CodeExecutor.get_pool().shutdown()
+        CodeExecutor._pool = None
+    assert not result['success']
+    assert 'steps' in result['error']
+    assert 'seconds' not in result['error']
+    assert result['output'].startswith('0\n0\n0\n')
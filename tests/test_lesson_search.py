@@ -0,0 +1,42 @@
+"""
+Regression tests for keeping lesson search in step with lesson edits
+"""
+
+import json
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lesson_manager import LessonManager
+
+PACK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'content', 'adventure')
+
+
+def copy_pack(tmp_path):
+    target = tmp_path / 'pack'
+    shutil.copytree(PACK, target, ignore=shutil.ignore_patterns('search_index.json'))
+    return str(target)
+
+
+def test_starting_up_does_not_build_the_search_index(tmp_path):
+    manager = LessonManager(copy_pack(tmp_path))
+    assert manager.search_index is None
+    assert manager.pack.loaded_count() == 0
+
+
+def test_edited_lesson_shows_up_in_search(tmp_path):
+    path = copy_pack(tmp_path)
+    manager = LessonManager(path)
+    assert manager.search('zebracorn') == []
+
+    lesson_file = os.path.join(path, 'lessons', 'lesson_02.json')
+    with open(lesson_file, encoding='utf-8') as source:
+        lesson = json.load(source)
+    lesson['description'] += ' A zebracorn appears!'
+    with open(lesson_file, 'w', encoding='utf-8') as out:
+        json.dump(lesson, out)
+    os.utime(lesson_file, ns=(os.stat(lesson_file).st_atime_ns, os.stat(lesson_file).st_mtime_ns + 10**9))
+
+    assert [entry['id'] for entry, _ in manager.search('zebracorn')] == [2]
@@ -0,0 +1,47 @@
+"""
+Regression tests for capturing kids' output when runs happen at the same time
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import CodeExecutor
+
+
+def run_code(run_id):
+    return f"print('run {run_id}')\nfor i in range(200):\n    print({run_id}, i)\n"
+
+
+def expected_output(run_id):
+    return f'run {run_id}\n' + ''.join(f'{run_id} {i}\n' for i in range(200))
+
+
+def test_concurrent_runs_keep_their_own_output():
+    executor = CodeExecutor(use_sandbox=False)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda run_id: executor.execute_code(run_code(run_id)), range(64)))
+    for run_id, result in enumerate(results):
+        assert result['success'], result['error']
+        assert result['output'] == expected_output(run_id)
+
+
+def test_library_output_is_captured_in_process():
+    code = "df = pd.DataFrame({'a': [1, 2, 3]})\ndf.info()\n"
+    result = CodeExecutor(use_sandbox=False).execute_code(code)
+    assert result['success'], result['error']
+    assert 'RangeIndex: 3 entries' in result['output']
+
+
+def test_concurrent_library_output_stays_with_its_run():
+    executor = CodeExecutor(use_sandbox=False)
+    code = "df = pd.DataFrame({{'c{0}': [1, 2]}})\nprint('run {0}')\ndf.info()\n"
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda run_id: executor.execute_code(code.format(run_id)), range(32)))
+    for run_id, result in enumerate(results):
+        assert result['success'], result['error']
+        assert result['output'].startswith(f'run {run_id}\n')
+        assert f'c{run_id} ' in result['output']
+        assert result['output'].count('RangeIndex') == 1